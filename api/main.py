@@ -1,42 +1,145 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 import httpx
 import logging
-from typing import Dict, Any
+import os
+import time
+from typing import Dict, Any, Optional
+
+from gmsec_service.common.metrics import CONTENT_TYPE, REGISTRY
 
-app = FastAPI()
 PUBLISHER_URL = "http://iss.publisher:9000"
 REQUEST_TIMEOUT = 30.0  # seconds
 
+# Connection pool settings for the shared publisher client
+MAX_CONNECTIONS = int(os.getenv("GATEWAY_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("GATEWAY_MAX_KEEPALIVE_CONNECTIONS", "20"))
+KEEPALIVE_EXPIRY = float(os.getenv("GATEWAY_KEEPALIVE_EXPIRY", "30"))  # seconds
+CONNECT_TIMEOUT = float(os.getenv("GATEWAY_CONNECT_TIMEOUT", "5"))  # seconds
+READ_TIMEOUT = float(os.getenv("GATEWAY_READ_TIMEOUT", str(REQUEST_TIMEOUT)))  # seconds
+HTTP2 = os.getenv("GATEWAY_HTTP2", "false").lower() == "true"
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+http_client: Optional[httpx.AsyncClient] = None
+requests_in_flight = 0
+peak_requests_in_flight = 0
+
+PROXY_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PROXY_REQUESTS = REGISTRY.counter("iss_gateway_requests_total", "Requests proxied to the publisher", ("route", "status"))
+PROXY_REQUEST_SECONDS = REGISTRY.histogram(
+    "iss_gateway_request_seconds", "Latency of requests proxied to the publisher", ("route",), buckets=PROXY_LATENCY_BUCKETS
+)
+REGISTRY.gauge("iss_gateway_requests_in_flight", "Requests currently being proxied").set_function(
+    lambda: requests_in_flight
+)
+
+
+def build_http_client() -> httpx.AsyncClient:
+    """Creates the long-lived, pooled client used for every proxied request."""
+    http2 = HTTP2
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("GATEWAY_HTTP2 is enabled but the 'h2' package is not installed; using HTTP/1.1")
+            http2 = False
+
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(REQUEST_TIMEOUT, connect=CONNECT_TIMEOUT, read=READ_TIMEOUT),
+        http2=http2,
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global http_client
+    if http_client is None:
+        http_client = build_http_client()
+    return http_client
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global http_client
+    http_client = build_http_client()
+    yield
+    await http_client.aclose()
+    http_client = None
+
+
+app = FastAPI(lifespan=lifespan)
+
 
 @app.get("/health", tags=["Health"])
 async def health_check():
     return JSONResponse(status_code=200, content={"status": "ok"})
 
 
-async def proxy_request(endpoint: str, data: Dict[Any, Any]) -> JSONResponse:
+@app.get("/health/pool", tags=["Health"])
+async def pool_health():
+    """Reports the configured publisher pool limits and how many requests are using them."""
+    return {
+        "max_connections": MAX_CONNECTIONS,
+        "max_keepalive_connections": MAX_KEEPALIVE_CONNECTIONS,
+        "keepalive_expiry": KEEPALIVE_EXPIRY,
+        "requests_in_flight": requests_in_flight,
+        "peak_requests_in_flight": peak_requests_in_flight,
+    }
+
+
+async def proxy_request(endpoint: str, data: Optional[Dict[Any, Any]] = None, method: str = "POST") -> JSONResponse:
     """Generic proxy function to handle requests to publisher service."""
+    global requests_in_flight, peak_requests_in_flight
+    client = get_http_client()
+    route = endpoint.split("/")[0] if method == "GET" else endpoint
+    started = time.perf_counter()
+    status_code = 500
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{PUBLISHER_URL}/{endpoint}", json=data, timeout=REQUEST_TIMEOUT
-            )
+        requests_in_flight += 1
+        peak_requests_in_flight = max(peak_requests_in_flight, requests_in_flight)
+        try:
+            if method == "GET":
+                response = await client.get(f"{PUBLISHER_URL}/{endpoint}")
+            else:
+                response = await client.post(f"{PUBLISHER_URL}/{endpoint}", json=data)
+        finally:
+            requests_in_flight -= 1
 
-        # Return the same status code and response from the publisher
-        return JSONResponse(status_code=response.status_code, content=response.json())
+        # Return the same status code and response from the publisher, keeping backpressure hints
+        headers = {}
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            headers["Retry-After"] = retry_after
+        json_response = JSONResponse(status_code=response.status_code, content=response.json(), headers=headers)
+        status_code = response.status_code
+        return json_response
     except httpx.TimeoutException:
         logger.error(f"Timeout when proxying to {endpoint}")
+        status_code = 504
         raise HTTPException(status_code=504, detail="Gateway timeout")
     except httpx.RequestError as e:
         logger.error(f"Error proxying request to {endpoint}: {str(e)}")
+        status_code = 503
         raise HTTPException(status_code=503, detail=f"Service unavailable: {str(e)}")
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
+    finally:
+        PROXY_REQUESTS.labels(route=route, status=status_code).inc()
+        PROXY_REQUEST_SECONDS.labels(route=route).observe(time.perf_counter() - started)
+
+
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
 
 
 @app.post("/product")
@@ -52,6 +155,20 @@ async def proxy_product(request: Request):
     return await proxy_request("product", data)
 
 
+@app.post("/products/batch")
+async def proxy_products_batch(request: Request):
+    """Proxy /products/batch POST requests to the iss.publisher service."""
+    try:
+        data = await request.json()
+    except Exception as e:
+        logger.warning(f"Failed to parse JSON body: {e}")
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+
+    products = data.get("products") if isinstance(data, dict) else None
+    logger.info(f"Received product batch request with {len(products or [])} products")
+    return await proxy_request("products/batch", data)
+
+
 @app.post("/log")
 async def proxy_log(request: Request):
     """Proxy /log POST requests to the iss.publisher service."""
@@ -63,3 +180,9 @@ async def proxy_log(request: Request):
 
     logger.info(f"Received log request: {data}")
     return await proxy_request("log", data)
+
+
+@app.get("/publish/{tracking_id}")
+async def proxy_publish_status(tracking_id: str):
+    """Proxy queued publish status lookups to the iss.publisher service."""
+    return await proxy_request(f"publish/{tracking_id}", method="GET")
@@ -3,9 +3,10 @@ Unit tests for the API proxy service.
 This test suite covers all endpoints and error handling paths.
 """
 
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
 from fastapi.testclient import TestClient
+from api import main
 from api.main import app
 import sys
 import httpx
@@ -43,25 +44,26 @@ def mock_gmsec_connection():
         yield mock_connection
 
 
-# Mock the HTTPX AsyncClient to prevent actual external HTTP calls
+# Mock the shared HTTPX AsyncClient to prevent actual external HTTP calls
 @pytest.fixture
 def mock_httpx_async_client():
     """
-    Create a mock httpx.AsyncClient that returns a controlled response.
+    Create a mock of the shared httpx.AsyncClient that returns a controlled response.
     This prevents actual HTTP requests to external services.
     """
     # Create mock response for the httpx post method
     mock_response = MagicMock()
     mock_response.status_code = 200
+    mock_response.headers = httpx.Headers()
     mock_response.json.return_value = {"status": "success"}
 
     # Create mock client with post method returning our mock response
-    mock_client = MagicMock()
-    mock_client.__aenter__.return_value.post.return_value = mock_response
+    mock_client = AsyncMock()
+    mock_client.post.return_value = mock_response
 
-    # Patch httpx.AsyncClient to return our mock client
-    with patch("httpx.AsyncClient", return_value=mock_client):
-        yield mock_client.__aenter__.return_value
+    # Patch the shared client getter to return our mock client
+    with patch("api.main.get_http_client", return_value=mock_client):
+        yield mock_client
 
 
 # Test the /health endpoint
@@ -171,14 +173,14 @@ def test_publisher_service_timeout(client, mock_gmsec_connection):
 
     # Configure mock to raise a TimeoutException
     # Important: The exception must be a proper httpx.TimeoutException for the correct handler to trigger
-    mock_client = MagicMock()
+    mock_client = AsyncMock()
     timeout_exception = httpx.TimeoutException("Connection timed out")
     # Ensure it's recognized as a TimeoutException and not caught by the generic RequestError handler
     timeout_exception.__class__ = httpx.TimeoutException
-    mock_client.__aenter__.return_value.post.side_effect = timeout_exception
+    mock_client.post.side_effect = timeout_exception
 
-    # Patch httpx.AsyncClient to return our mocked client that raises an exception
-    with patch("httpx.AsyncClient", return_value=mock_client):
+    # Patch the shared client getter to return our mocked client that raises an exception
+    with patch("api.main.get_http_client", return_value=mock_client):
         response = client.post("/log", json=log_data)
 
         assert response.status_code == 504
@@ -196,13 +198,13 @@ def test_publisher_service_connection_error(client, mock_gmsec_connection):
     }
 
     # Configure mock to raise a RequestError
-    mock_client = MagicMock()
-    mock_client.__aenter__.return_value.post.side_effect = httpx.RequestError(
+    mock_client = AsyncMock()
+    mock_client.post.side_effect = httpx.RequestError(
         "Connection refused", request=None
     )
 
-    # Patch httpx.AsyncClient to return our mocked client that raises an exception
-    with patch("httpx.AsyncClient", return_value=mock_client):
+    # Patch the shared client getter to return our mocked client that raises an exception
+    with patch("api.main.get_http_client", return_value=mock_client):
         response = client.post("/product", json=product_data)
 
         assert response.status_code == 503
@@ -219,14 +221,81 @@ def test_unexpected_exception(client, mock_gmsec_connection):
         "uris": ["s3://example-bucket/file.p"],
     }
 
-    mock_client = MagicMock()
-    mock_client.__aenter__.return_value.post.side_effect = ValueError(
+    mock_client = AsyncMock()
+    mock_client.post.side_effect = ValueError(
         "Unexpected error"
     )
 
-    # Patch httpx.AsyncClient to return our mocked client that raises an exception
-    with patch("httpx.AsyncClient", return_value=mock_client):
+    # Patch the shared client getter to return our mocked client that raises an exception
+    with patch("api.main.get_http_client", return_value=mock_client):
         response = client.post("/product", json=product_data)
 
         assert response.status_code == 500
         assert "Internal server error" in response.json()["detail"]
+
+
+# Test for /products/batch endpoint with success response
+def test_proxy_products_batch_success(client, mock_gmsec_connection, mock_httpx_async_client):
+    """Test successful product batch forwarding."""
+
+    batch_data = {
+        "products": [
+            {"job_id": "job-1", "concept_id": "example_collection", "uris": ["s3://example-bucket/file1.p"]},
+            {"job_id": "job-2", "concept_id": "example_collection", "uris": ["s3://example-bucket/file2.p"]},
+        ]
+    }
+
+    mock_response = mock_httpx_async_client.post.return_value
+    mock_response.status_code = 200
+    mock_response.json.return_value = {"published": 2, "failed": 0, "results": []}
+
+    response = client.post("/products/batch", json=batch_data)
+
+    assert response.status_code == 200
+    assert response.json()["published"] == 2
+
+    mock_httpx_async_client.post.assert_called_once()
+    call_args = mock_httpx_async_client.post.call_args
+    assert call_args[0][0] == "http://iss.publisher:9000/products/batch"
+    assert call_args[1]["json"] == batch_data
+
+
+# Test that backpressure responses keep their Retry-After header
+def test_proxy_log_queue_full(client, mock_gmsec_connection, mock_httpx_async_client):
+    """Test that a full publish queue is reported with Retry-After."""
+
+    mock_response = mock_httpx_async_client.post.return_value
+    mock_response.status_code = 503
+    mock_response.headers = httpx.Headers({"Retry-After": "5"})
+    mock_response.json.return_value = {"detail": "Publish queue is full"}
+
+    response = client.post("/log", json={"level": "INFO", "msg_body": "test"})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
+
+
+# Test that one pooled client is shared across requests
+def test_shared_client_reused():
+    """Test that the lifespan-managed client is created once and reused."""
+    with TestClient(app) as lifespan_client:
+        shared = main.get_http_client()
+        assert main.get_http_client() is shared
+        assert shared.timeout.connect == main.CONNECT_TIMEOUT
+
+        response = lifespan_client.get("/health/pool")
+        assert response.status_code == 200
+        assert response.json()["requests_in_flight"] == 0
+        assert response.json()["max_connections"] == main.MAX_CONNECTIONS
+
+
+# Test the /metrics endpoint
+def test_metrics_report_proxied_requests(client, mock_gmsec_connection, mock_httpx_async_client):
+    """Test that proxied requests show up in the Prometheus metrics."""
+    client.post("/log", json={"level": "INFO", "msg_body": "test"})
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert 'iss_gateway_requests_total{route="log",status="200"}' in response.text
+    assert 'iss_gateway_request_seconds_count{route="log"}' in response.text
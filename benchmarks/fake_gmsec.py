@@ -0,0 +1,642 @@
+"""
+In-process stand-in for the parts of `libgmsec_python3` used by gmsec_service.
+
+Connections created in one process share a FakeBus, so publish, subscribe, receive, request and
+reply work end to end without middleware. Call install() before importing any gmsec_service
+module to make `import libgmsec_python3 as lp` resolve to this module.
+"""
+
+import itertools
+import queue
+import re
+import sys
+import threading
+import time
+import xml.etree.ElementTree as ET
+from typing import Optional
+
+
+# Error classes reported by GmsecError.get_error_class()
+NO_ERROR_CLASS = 0
+MSG_ERROR = 4
+CONNECTION_ERROR = 6
+MIDDLEWARE_ERROR = 13
+
+
+class GmsecError(Exception):
+    def __init__(self, message: str = "", error_class: int = NO_ERROR_CLASS):
+        super().__init__(message)
+        self.error_class = error_class
+
+    def get_error_class(self) -> int:
+        return self.error_class
+
+
+# Logging
+
+
+class Log:
+    LEVELS = ("none", "error", "secure", "warning", "info", "verbose", "debug")
+    reporting_level = 4
+
+    @staticmethod
+    def from_string(level: str) -> int:
+        level = level.lower()
+        return Log.LEVELS.index(level) if level in Log.LEVELS else 4
+
+    @staticmethod
+    def set_reporting_level(level: int):
+        Log.reporting_level = level
+
+
+def _log(level: int, text: str):
+    if Log.reporting_level >= level:
+        print(f"[{Log.LEVELS[level].upper()}] {text}", file=sys.stderr)
+
+
+def log_error(text: str):
+    _log(1, text)
+
+
+def log_warning(text: str):
+    _log(3, text)
+
+
+def log_info(text: str):
+    _log(4, text)
+
+
+def log_verbose(text: str):
+    _log(5, text)
+
+
+def log_debug(text: str):
+    _log(6, text)
+
+
+# Configuration
+
+
+class Config:
+    def __init__(self, values: Optional[dict] = None):
+        self.values = dict(values or {})
+
+    def get_value(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        return self.values.get(name, default)
+
+    def add_value(self, name: str, value: str):
+        self.values[name] = value
+
+
+class SubscriptionEntry:
+    def __init__(self, name: str, pattern: str, excluded_patterns: tuple = ()):
+        self.name = name
+        self.pattern = pattern
+        self.excluded_patterns = excluded_patterns
+
+    def get_name(self) -> str:
+        return self.name
+
+    def get_pattern(self) -> str:
+        return self.pattern
+
+
+class ConfigFile:
+    """
+    Reads the GMSEC XML config format. When `path_override` is set, every load() reads that file
+    instead, so services with hard-coded config paths can be pointed at a benchmark config.
+    `overrides` replaces parameter values in every loaded config.
+    """
+
+    path_override: Optional[str] = None
+    overrides: dict[str, str] = {}
+
+    def __init__(self):
+        self.configs: dict[str, Config] = {}
+        self.subscriptions: dict[str, SubscriptionEntry] = {}
+
+    def load(self, path: str):
+        try:
+            root = ET.parse(self.path_override or path).getroot()
+        except (OSError, ET.ParseError) as e:
+            raise GmsecError(f"Unable to load config file {path}: {e}") from e
+
+        for config in root.iter("CONFIG"):
+            values = {param.get("NAME"): (param.text or "").strip() for param in config.iter("PARAMETER")}
+            values.update(self.overrides)
+            self.configs[config.get("NAME")] = Config(values)
+        for subscription in root.iter("SUBSCRIPTION"):
+            excluded = tuple(exclude.get("PATTERN") for exclude in subscription.iter("EXCLUDE"))
+            self.subscriptions[subscription.get("NAME")] = SubscriptionEntry(
+                subscription.get("NAME"), subscription.get("PATTERN"), excluded
+            )
+
+    def lookup_config(self, name: str) -> Config:
+        if name not in self.configs:
+            raise GmsecError(f"Config {name} not found")
+        return self.configs[name]
+
+    def lookup_subscription_entry(self, name: str) -> SubscriptionEntry:
+        if name not in self.subscriptions:
+            raise GmsecError(f"Subscription entry {name} not found")
+        return self.subscriptions[name]
+
+
+# Fields and messages
+
+
+class Field:
+    def __init__(self, name: str, value, header: bool = False):
+        self.name = name
+        self.value = value
+        self.header = header
+
+    def get_name(self) -> str:
+        return self.name
+
+    def get_string_value(self) -> str:
+        return str(self.value)
+
+    def get_integer_value(self) -> int:
+        return int(self.value)
+
+    def get_double_value(self) -> float:
+        return float(self.value)
+
+    def is_header(self) -> bool:
+        return self.header
+
+    def get_type(self) -> str:
+        return type(self).__name__
+
+    def copy(self) -> "Field":
+        return type(self)(self.name, self.value, self.header)
+
+
+class StringField(Field):
+    pass
+
+
+class I16Field(Field):
+    pass
+
+
+class U16Field(Field):
+    pass
+
+
+class I32Field(Field):
+    pass
+
+
+class U32Field(Field):
+    pass
+
+
+class F32Field(Field):
+    pass
+
+
+class BooleanField(Field):
+    pass
+
+
+class FieldList(list):
+    def push_back(self, field: Field):
+        self.append(field)
+
+
+class FieldIterator:
+    def __init__(self, fields):
+        self._fields = list(fields)
+        self._index = 0
+
+    def has_next(self) -> bool:
+        return self._index < len(self._fields)
+
+    def next(self) -> Field:
+        field = self._fields[self._index]
+        self._index += 1
+        return field
+
+
+class Message:
+    def __init__(self, other: Optional["Message"] = None):
+        self.subject = ""
+        self.fields: dict[str, Field] = {}
+        self.reply_token: Optional[int] = None
+        self.acknowledged = False
+        if other is not None:
+            self.subject = other.subject
+            self.fields = {name: field.copy() for name, field in other.fields.items()}
+            self.reply_token = other.reply_token
+
+    @staticmethod
+    def destroy(msg: "Message"):
+        pass
+
+    def set_subject(self, subject: str):
+        self.subject = subject
+
+    def get_subject(self) -> str:
+        return self.subject
+
+    def add_field(self, field: Field) -> bool:
+        replaced = field.name in self.fields
+        self.fields[field.name] = field.copy()
+        return replaced
+
+    def add_fields(self, fields):
+        for field in fields:
+            self.add_field(field)
+
+    def clear_field(self, name: str) -> bool:
+        return self.fields.pop(name, None) is not None
+
+    def has_field(self, name: str) -> bool:
+        return name in self.fields
+
+    def get_field(self, name: str) -> Optional[Field]:
+        return self.fields.get(name)
+
+    def get_field_count(self) -> int:
+        return len(self.fields)
+
+    def get_string_value(self, name: str) -> str:
+        if name not in self.fields:
+            raise GmsecError(f"Message does not contain field {name}")
+        return self.fields[name].get_string_value()
+
+    def get_integer_value(self, name: str) -> int:
+        if name not in self.fields:
+            raise GmsecError(f"Message does not contain field {name}")
+        return self.fields[name].get_integer_value()
+
+    def get_field_iterator(self) -> FieldIterator:
+        return FieldIterator(self.fields.values())
+
+    def acknowledge(self):
+        self.acknowledged = True
+
+    def get_schema_id(self) -> str:
+        parts = [self.fields[name].get_string_value() for name in ("MESSAGE-TYPE", "MESSAGE-SUBTYPE") if name in self.fields]
+        return ".".join(parts)
+
+    def is_compliant(self) -> "Status":
+        """No message-spec templates are loaded, so every message is compliant"""
+        return Status()
+
+    def to_xml(self) -> str:
+        fields = "".join(
+            f'<FIELD NAME="{field.name}" TYPE="{type(field).__name__}">{field.value}</FIELD>'
+            for field in self.fields.values()
+        )
+        return f'<MESSAGE SUBJECT="{self.subject}">{fields}</MESSAGE>'
+
+
+class FieldSpecification:
+    def __init__(self, name: str, field_type: str, value: str = "", pattern: str = ""):
+        self.name = name
+        self.type = field_type
+        self.value = value
+        self.pattern = pattern
+
+    def get_name(self) -> str:
+        return self.name
+
+    def get_type(self) -> str:
+        return self.type
+
+    def get_value(self) -> str:
+        return self.value
+
+    def get_pattern(self) -> str:
+        return self.pattern
+
+
+class MessageSpecification:
+    def __init__(self, schema_id: str, field_specs: list[FieldSpecification]):
+        self.schema_id = schema_id
+        self.field_specs = field_specs
+
+    def get_schema_id(self) -> str:
+        return self.schema_id
+
+    def get_field_specifications(self) -> list[FieldSpecification]:
+        return list(self.field_specs)
+
+
+class Specification:
+    """Message-spec templates; `templates` maps schema ids to their field specifications"""
+
+    templates: dict[str, list[FieldSpecification]] = {}
+
+    def get_message_specifications(self) -> list[MessageSpecification]:
+        return [MessageSpecification(schema_id, specs) for schema_id, specs in self.templates.items()]
+
+
+class MessageFactory:
+    def __init__(self, config: Optional[Config] = None):
+        self.config = config
+        self.standard_fields: list[Field] = []
+
+    def get_specification(self) -> Specification:
+        return Specification()
+
+    def set_standard_fields(self, fields):
+        self.standard_fields = [field.copy() for field in fields]
+
+    def clear_standard_fields(self):
+        self.standard_fields = []
+
+    def create_message(self, schema_id: Optional[str] = None) -> Message:
+        msg = Message()
+        for field in self.standard_fields:
+            msg.add_field(field)
+        if schema_id:
+            message_type, _, subtype = schema_id.partition(".")
+            msg.add_field(StringField("MESSAGE-TYPE", message_type, True))
+            if subtype:
+                msg.add_field(StringField("MESSAGE-SUBTYPE", subtype, True))
+        return msg
+
+
+# Bus and connections
+
+
+def subject_regex(pattern: str) -> "re.Pattern":
+    """
+    Translates a GMSEC subscription pattern: `*` matches one subject element, `>` one or more
+    trailing elements and `+` zero or more trailing elements. The regex expects the subject with
+    a leading '.', so every element is matched the same way.
+    """
+    regex = ""
+    for element in pattern.split("."):
+        if element == ">":
+            regex += r"(\.[^.]+)+"
+        elif element == "+":
+            regex += r"(\.[^.]+)*"
+        elif element == "*":
+            regex += r"\.[^.]+"
+        else:
+            regex += r"\." + re.escape(element)
+    return re.compile("^" + regex + "$")
+
+
+class _Subscription:
+    def __init__(self, connection: "Connection", pattern: str, callback=None):
+        self.connection = connection
+        self.pattern = pattern
+        self.regex = subject_regex(pattern)
+        self.callback = callback
+
+    def matches(self, subject: str) -> bool:
+        return bool(self.regex.match("." + subject))
+
+
+class FakeBus:
+    """
+    Shared in-process message bus. Published messages are copied to every matching subscription;
+    replies are routed back to the connection blocked in request().
+
+    Attributes:
+        published (int): Messages published.
+        delivered (int): Message copies delivered to subscribers.
+        replies (int): Replies sent.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions: list[_Subscription] = []
+        self._pending_replies: dict[int, "queue.Queue[Message]"] = {}
+        self._tokens = itertools.count(1)
+        self.closed = threading.Event()
+        self.published = 0
+        self.delivered = 0
+        self.replies = 0
+
+    def subscribe(self, subscription: _Subscription):
+        with self._lock:
+            self._subscriptions.append(subscription)
+
+    def unsubscribe(self, connection: "Connection", pattern: Optional[str] = None):
+        with self._lock:
+            self._subscriptions = [
+                s
+                for s in self._subscriptions
+                if not (s.connection is connection and (pattern is None or s.pattern == pattern))
+            ]
+
+    def publish(self, msg: Message, sender: Optional["Connection"] = None):
+        with self._lock:
+            subscriptions = [s for s in self._subscriptions if s.matches(msg.subject)]
+            self.published += 1
+            self.delivered += len(subscriptions)
+        for subscription in subscriptions:
+            subscription.connection._deliver(Message(msg), subscription)
+
+    def open_request(self) -> "tuple[int, queue.Queue]":
+        token = next(self._tokens)
+        replies: queue.Queue = queue.Queue(maxsize=1)
+        with self._lock:
+            self._pending_replies[token] = replies
+        return token, replies
+
+    def close_request(self, token: int):
+        with self._lock:
+            self._pending_replies.pop(token, None)
+
+    def reply(self, token: Optional[int], msg: Message):
+        with self._lock:
+            replies = self._pending_replies.get(token)
+            self.replies += 1
+        if replies is not None:
+            replies.put_nowait(Message(msg))
+
+    def close(self):
+        """Shuts the bus down; connections blocked in receive() stop as if interrupted"""
+        self.closed.set()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"published": self.published, "delivered": self.delivered, "replies": self.replies}
+
+
+bus = FakeBus()
+
+
+def reset_bus() -> FakeBus:
+    global bus
+    bus = FakeBus()
+    return bus
+
+
+class Callback:
+    """Base class for subscription callbacks, as in the GMSEC API"""
+
+    def on_message(self, conn: "Connection", msg: Message):
+        pass
+
+
+class EventCallback:
+    """Base class for connection event callbacks, as in the GMSEC API"""
+
+    def on_event(self, conn: "Connection", status: "Status", event: int):
+        pass
+
+
+class Status:
+    def __init__(self, reason: str = "", error: bool = False):
+        self.reason = reason
+        self.error = error
+
+    def get_reason(self) -> str:
+        return self.reason
+
+    def has_error(self) -> bool:
+        return self.error
+
+
+class Connection:
+    """
+    Connection to the shared FakeBus. Received messages are queued per connection;
+    receive(timeout) takes the next one, or the subscription callback is invoked when
+    auto-dispatch is running.
+    """
+
+    Event_ALL_EVENTS = 0
+    Event_CONNECTION_EXCEPTION_EVENT = 1
+
+    def __init__(self, config: Optional[Config] = None, factory: Optional[MessageFactory] = None):
+        self.config = config
+        self.bus = bus
+        self.message_factory = factory or MessageFactory(config)
+        self.connected = False
+        self.event_callbacks: list[tuple[int, EventCallback]] = []
+        self._inbox: queue.Queue = queue.Queue()
+        self._dispatching = threading.Event()
+        self._dispatcher: Optional[threading.Thread] = None
+
+    @staticmethod
+    def get_api_version() -> str:
+        return "GMSEC API (fake in-process bus)"
+
+    def get_library_version(self) -> str:
+        return "fake-bus"
+
+    def get_message_factory(self) -> MessageFactory:
+        return self.message_factory
+
+    def connect(self):
+        self.connected = True
+
+    def disconnect(self):
+        self.stop_auto_dispatch()
+        self.bus.unsubscribe(self)
+        self.connected = False
+
+    def register_event_callback(self, event: int, callback: EventCallback):
+        self.event_callbacks.append((event, callback))
+
+    def simulate_failure(self, reason: str = "Connection lost"):
+        """
+        Drops the connection as the middleware would: later calls raise GmsecError and registered
+        connection exception callbacks are notified.
+        """
+        self.connected = False
+        for event, callback in self.event_callbacks:
+            if event in (self.Event_ALL_EVENTS, self.Event_CONNECTION_EXCEPTION_EVENT):
+                callback.on_event(self, Status(reason), self.Event_CONNECTION_EXCEPTION_EVENT)
+
+    def _check_connected(self):
+        if not self.connected:
+            raise GmsecError("Connection has not been initialized", CONNECTION_ERROR)
+
+    def subscribe(self, pattern: str, callback: Optional[Callback] = None) -> SubscriptionEntry:
+        self._check_connected()
+        self.bus.subscribe(_Subscription(self, pattern, callback))
+        return SubscriptionEntry(pattern, pattern)
+
+    def unsubscribe(self, entry: SubscriptionEntry):
+        self.bus.unsubscribe(self, entry.get_pattern())
+
+    def publish(self, msg: Message):
+        self._check_connected()
+        self.bus.publish(msg, self)
+
+    def request(self, msg: Message, timeout: int, republish_ms: int = 0) -> Optional[Message]:
+        """Publishes a request and waits up to `timeout` milliseconds for its reply"""
+        self._check_connected()
+        token, replies = self.bus.open_request()
+        request_msg = Message(msg)
+        request_msg.reply_token = token
+        try:
+            self.bus.publish(request_msg, self)
+            try:
+                return replies.get(timeout=None if timeout < 0 else timeout / 1000)
+            except queue.Empty:
+                return None
+        finally:
+            self.bus.close_request(token)
+
+    def reply(self, request: Message, reply: Message):
+        self._check_connected()
+        self.bus.reply(request.reply_token, reply)
+
+    def _deliver(self, msg: Message, subscription: _Subscription):
+        self._inbox.put((msg, subscription))
+
+    def receive(self, timeout: int = -1) -> Optional[Message]:
+        """
+        Returns the next received message, or None after `timeout` milliseconds. Raises
+        KeyboardInterrupt once the bus is closed so receive loops take their normal exit path.
+        """
+        self._check_connected()
+        deadline = None if timeout < 0 else time.monotonic() + timeout / 1000
+        while not self.bus.closed.is_set():
+            wait = 0.05 if deadline is None else min(0.05, deadline - time.monotonic())
+            if wait <= 0:
+                return None
+            try:
+                msg, _ = self._inbox.get(timeout=wait)
+                return msg
+            except queue.Empty:
+                continue
+        raise KeyboardInterrupt
+
+    def start_auto_dispatch(self) -> bool:
+        self._check_connected()
+        if self._dispatcher is not None:
+            return False
+        self._dispatching.set()
+        self._dispatcher = threading.Thread(target=self._dispatch, name="fake-auto-dispatch", daemon=True)
+        self._dispatcher.start()
+        return True
+
+    def stop_auto_dispatch(self, wait_for_completion: bool = True) -> bool:
+        if self._dispatcher is None:
+            return False
+        self._dispatching.clear()
+        if wait_for_completion:
+            self._dispatcher.join()
+        self._dispatcher = None
+        return True
+
+    def _dispatch(self):
+        while self._dispatching.is_set():
+            try:
+                msg, subscription = self._inbox.get(timeout=0.05)
+            except queue.Empty:
+                continue
+            if subscription.callback is not None:
+                subscription.callback.on_message(self, msg)
+
+
+def install(config_path: Optional[str] = None, overrides: Optional[dict[str, str]] = None):
+    """
+    Registers this module as `libgmsec_python3`. When config_path is given, every
+    ConfigFile.load() reads it instead of the requested path; overrides replace config values.
+    """
+    ConfigFile.path_override = config_path
+    ConfigFile.overrides = dict(overrides or {})
+    sys.modules["libgmsec_python3"] = sys.modules[__name__]
@@ -0,0 +1,217 @@
+"""
+Local stand-in for the MAAP DPS API with configurable latency and error distributions.
+
+FakeMaapServer serves job submission and job status over HTTP on localhost. FakeMaap is a
+drop-in for the maap-py MAAP object that talks to it through a MaapClient's pooled session, so
+the client's pooling, timeouts and metrics are exercised as in production.
+"""
+
+import json
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from gmsec_service.common.maap_client import MaapClient
+
+
+class LatencyModel:
+    """
+    Response delay distribution, parsed from "<kind>:<params>" with values in milliseconds:
+        constant:20         always 20ms
+        uniform:10,50       uniformly between 10ms and 50ms
+        lognormal:20,0.5    median 20ms with log-space sigma 0.5 (long right tail)
+    """
+
+    KINDS = ("constant", "uniform", "lognormal")
+
+    def __init__(self, kind: str = "constant", params: tuple = (0.0,), rng: Optional[random.Random] = None):
+        if kind not in self.KINDS:
+            raise ValueError(f"Invalid latency model '{kind}'. Must be one of {', '.join(self.KINDS)}")
+        self.kind = kind
+        self.params = params
+        self.rng = rng or random.Random()
+
+    @classmethod
+    def parse(cls, spec: str, rng: Optional[random.Random] = None) -> "LatencyModel":
+        kind, _, raw_params = spec.partition(":")
+        params = tuple(float(param) for param in raw_params.split(",") if param.strip()) or (0.0,)
+        return cls(kind.strip(), params, rng)
+
+    def sample(self) -> float:
+        """Returns a delay in seconds"""
+        if self.kind == "constant":
+            delay_ms = self.params[0]
+        elif self.kind == "uniform":
+            delay_ms = self.rng.uniform(self.params[0], self.params[1])
+        else:
+            median_ms, sigma = self.params[0], self.params[1] if len(self.params) > 1 else 0.5
+            delay_ms = median_ms * self.rng.lognormvariate(0, sigma)
+        return max(delay_ms, 0.0) / 1000
+
+    def __str__(self) -> str:
+        return f"{self.kind}:{','.join(f'{param:g}' for param in self.params)}"
+
+
+class FakeMaapServer:
+    """
+    Serves a minimal DPS API:
+        POST /api/dps/job                  submits a job, returns {"job_id", "status"}
+        GET  /api/dps/job/<job-id>/status  returns {"status"}
+
+    Submitted jobs report Accepted, then Running, then Succeeded as `job_duration` seconds pass;
+    unknown job ids report Succeeded. Each request is delayed by a sample from `latency` and fails
+    with HTTP 500 with probability `error_rate`.
+
+    Attributes:
+        requests (int): Requests served.
+        errors (int): Requests answered with an injected error.
+    """
+
+    def __init__(
+        self,
+        latency: Optional[LatencyModel] = None,
+        error_rate: float = 0.0,
+        job_duration: float = 5.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: Optional[int] = None,
+    ):
+        self.rng = random.Random(seed)
+        self.latency = latency or LatencyModel()
+        self.latency.rng = self.rng
+        self.error_rate = error_rate
+        self.job_duration = job_duration
+        self.requests = 0
+        self.errors = 0
+
+        self._lock = threading.Lock()
+        self._jobs: dict[str, float] = {}
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeMaapServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-maap", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _next_response(self) -> bool:
+        """Sleeps for the sampled latency and returns whether this request should fail"""
+        with self._lock:
+            self.requests += 1
+            delay = self.latency.sample()
+            failed = self.rng.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        time.sleep(delay)
+        return failed
+
+    def submit_job(self) -> dict:
+        job_id = str(uuid.uuid4())
+        with self._lock:
+            self._jobs[job_id] = time.monotonic()
+        return {"job_id": job_id, "status": "success"}
+
+    def job_status(self, job_id: str) -> dict:
+        with self._lock:
+            submitted_at = self._jobs.get(job_id)
+        if submitted_at is None:
+            return {"status": "Succeeded"}
+        progress = (time.monotonic() - submitted_at) / self.job_duration if self.job_duration else 1
+        if progress < 0.2:
+            return {"status": "Accepted"}
+        if progress < 1:
+            return {"status": "Running"}
+        return {"status": "Succeeded"}
+
+    def _handler_class(self):
+        fake = self
+
+        class FakeMaapHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _send(self, status: int, body: dict):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _read_body(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+
+            def do_GET(self):
+                parts = self.path.strip("/").split("/")
+                if len(parts) != 5 or parts[:3] != ["api", "dps", "job"] or parts[4] != "status":
+                    self._send(404, {"error": "not found"})
+                elif fake._next_response():
+                    self._send(500, {"error": "injected failure"})
+                else:
+                    self._send(200, fake.job_status(parts[3]))
+
+            def do_POST(self):
+                self._read_body()
+                if self.path.rstrip("/") != "/api/dps/job":
+                    self._send(404, {"error": "not found"})
+                elif fake._next_response():
+                    self._send(500, {"error": "injected failure"})
+                else:
+                    self._send(200, fake.submit_job())
+
+            def log_message(self, format, *args):
+                pass
+
+        return FakeMaapHandler
+
+
+@dataclass
+class FakeDPSJob:
+    id: str
+    status: str
+
+
+class FakeMaap:
+    """
+    The subset of the maap-py MAAP interface used by MaapClient, backed by FakeMaapServer
+    """
+
+    def __init__(self, base_url: str, client: MaapClient):
+        self.base_url = base_url.rstrip("/")
+        self.client = client
+
+    def getJobStatus(self, job_id: str) -> str:
+        response = self.client.session.get(
+            f"{self.base_url}/api/dps/job/{job_id}/status", timeout=self.client.current_timeout()
+        )
+        response.raise_for_status()
+        return response.json()["status"]
+
+    def submitJob(self, **job_args) -> FakeDPSJob:
+        response = self.client.session.post(
+            f"{self.base_url}/api/dps/job", json=job_args, timeout=self.client.current_timeout()
+        )
+        response.raise_for_status()
+        body = response.json()
+        return FakeDPSJob(id=body["job_id"], status=body["status"])
+
+
+def build_maap_client(base_url: str, pool_size: int = 10, timeout: float = 30.0) -> MaapClient:
+    """Creates a MaapClient whose MAAP instance talks to a FakeMaapServer at base_url"""
+    client = MaapClient(pool_size=pool_size, timeout=timeout, maap_factory=lambda: FakeMaap(base_url, client))
+    return client
@@ -0,0 +1,105 @@
+"""
+Stand-in environments for driving the ISS services offline. Shared by the benchmark runner and
+the trace replay tool; fake_gmsec.install() must be called before any of these are used.
+"""
+
+import itertools
+import json
+import threading
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from benchmarks import fake_gmsec
+
+REQUEST_SUBJECT = "ESDT.CZDT.CMSS.REQ.DIR.PRODUCT-INGEST.BENCH"
+PUBLISH_TARGETS = ("publisher", "gateway")
+
+
+class ListenerHarness:
+    """
+    Runs a GmsecListener on the fake bus, backed by a FakeMaapServer, and sends it directives as
+    CMSS would.
+    """
+
+    def __init__(self, maap_latency: str = "lognormal:20,0.5", maap_error_rate: float = 0.0, seed: Optional[int] = None):
+        self.maap_latency = maap_latency
+        self.maap_error_rate = maap_error_rate
+        self.seed = seed
+        self._request_ids = itertools.count(1)
+
+    def start(self) -> "ListenerHarness":
+        import libgmsec_python3 as lp
+        from benchmarks.fake_maap import FakeMaapServer, LatencyModel, build_maap_client
+        from gmsec_service.common import job_cache, maap_client
+        from gmsec_service.services.listener import GmsecListener
+
+        self.bus = fake_gmsec.reset_bus()
+        job_cache.job_status_cache = None
+
+        self.server = FakeMaapServer(
+            latency=LatencyModel.parse(self.maap_latency), error_rate=self.maap_error_rate, seed=self.seed
+        ).start()
+        self.maap_client = maap_client.maap_client = build_maap_client(self.server.url)
+
+        self.listener = GmsecListener("PROD")
+        self.listener_thread = threading.Thread(target=self.listener.run, name="bench-listener", daemon=True)
+        self.listener_thread.start()
+
+        self.conn = lp.Connection(self.listener.gmsec.config)
+        self.conn.connect()
+        return self
+
+    def request(self, fields: dict[str, str], timeout: float = 60):
+        """Sends a REQ.DIR message with the given string fields and returns the reply, or None on timeout"""
+        import libgmsec_python3 as lp
+
+        request_msg = self.conn.get_message_factory().create_message("REQ.DIR")
+        request_msg.set_subject(REQUEST_SUBJECT)
+        request_msg.add_field(lp.U16Field("REQUEST-ID", next(self._request_ids) % 65535))
+        request_msg.add_field(lp.StringField("COMPONENT", "CMSS-BENCH"))
+        for name, value in fields.items():
+            request_msg.add_field(lp.StringField(name, value))
+        return self.conn.request(request_msg, int(timeout * 1000))
+
+    def stop(self):
+        self.listener.stop()
+        self.listener_thread.join(timeout=30)
+        self.bus.close()
+        self.conn.disconnect()
+        self.maap_client.close()
+        self.server.stop()
+
+
+def directive_fields(keyword: str, directive_string: dict) -> dict[str, str]:
+    return {"DIRECTIVE-KEYWORD": keyword, "DIRECTIVE-STRING": json.dumps(directive_string)}
+
+
+@asynccontextmanager
+async def publish_target(target: str = "publisher"):
+    """
+    Yields the ASGI app that publish requests should be sent to: the publisher API publishing to
+    the fake bus, or the gateway proxying to it in-process.
+    """
+    import httpx
+    from gmsec_service.api import publisher_api
+    from gmsec_service.common.connection_pool import GmsecConnectionPool
+
+    if target not in PUBLISH_TARGETS:
+        raise ValueError(f"Invalid publish target '{target}'. Must be one of {', '.join(PUBLISH_TARGETS)}")
+
+    publisher_api.connection_pool = GmsecConnectionPool.from_config_file("config/config-prod.xml")
+    try:
+        if target == "publisher":
+            yield publisher_api.app
+        else:
+            from api import main as gateway
+
+            gateway.http_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=publisher_api.app))
+            try:
+                yield gateway.app
+            finally:
+                await gateway.http_client.aclose()
+                gateway.http_client = None
+    finally:
+        publisher_api.connection_pool.close()
+        publisher_api.connection_pool = None
@@ -0,0 +1,185 @@
+"""
+Replays captured directive and publish traffic against the services on stand-in backends.
+
+Traces are written by the listener (`listener-trace-path`) and the publisher API
+(`publisher-trace-path`). Requests are sent at their captured offsets, scaled by --speed, or as
+fast as --concurrency allows with `--speed max`. Several traces are merged on their capture
+timestamps, so listener and publisher captures from the same night replay together.
+
+    python -m benchmarks.replay listener-trace.jsonl.gz publisher-trace.jsonl.gz --speed 10
+    python -m benchmarks.replay trace.jsonl --speed max --save before.json
+    python -m benchmarks.replay trace.jsonl --speed max --compare before.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from benchmarks import fake_gmsec
+from benchmarks.harness import PUBLISH_TARGETS, ListenerHarness, publish_target
+from benchmarks.run import (
+    BENCH_CONFIG,
+    OUTPUT_PATH,
+    REPO_ROOT,
+    format_report,
+    latency_summary,
+    load_baselines,
+    parse_overrides,
+    percentile,
+)
+
+PUBLISH_PATHS = {"product": "/product", "log": "/log", "batch": "/products/batch"}
+
+
+def load_events(paths: list[str]) -> list[tuple[float, str, dict]]:
+    """Merges traces into (offset from the first request, kind, data), ordered by capture time"""
+    from gmsec_service.common.trace import read_trace
+
+    events = sorted(
+        ((at, kind, data) for path in paths for at, _, kind, data in read_trace(path)), key=lambda event: event[0]
+    )
+    if not events:
+        return []
+    first = events[0][0]
+    return [(at - first, kind, data) for at, kind, data in events]
+
+
+def parse_speed(raw: str) -> Optional[float]:
+    """Returns the replay speed multiplier, or None for as fast as possible"""
+    if raw.lower() == "max":
+        return None
+    speed = float(raw.lower().rstrip("x"))
+    if speed <= 0:
+        raise argparse.ArgumentTypeError("speed must be positive or 'max'")
+    return speed
+
+
+async def replay(events: list[tuple[float, str, dict]], args) -> dict[str, dict[str, float]]:
+    import httpx
+
+    speed = parse_speed(args.speed)
+    kinds = {kind for _, kind, _ in events}
+    unknown = kinds - set(PUBLISH_PATHS) - {"directive"}
+    if unknown:
+        raise ValueError(f"Trace contains unknown request kinds: {', '.join(sorted(unknown))}")
+
+    harness = None
+    if "directive" in kinds:
+        harness = ListenerHarness(args.maap_latency, args.maap_error_rate, args.seed).start()
+    executor = ThreadPoolExecutor(max_workers=args.concurrency, thread_name_prefix="replay")
+
+    latencies: dict[str, list[float]] = {kind: [] for kind in kinds}
+    failures: dict[str, int] = {kind: 0 for kind in kinds}
+    lateness: list[float] = []
+    semaphore = asyncio.Semaphore(args.concurrency)
+    loop = asyncio.get_running_loop()
+
+    async with publish_target(args.target) as app:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://replay") as client:
+
+            async def send(kind: str, data: dict):
+                try:
+                    started = time.perf_counter()
+                    if kind == "directive":
+                        reply = await loop.run_in_executor(executor, harness.request, data, args.reply_timeout)
+                        ok = reply is not None
+                    else:
+                        response = await client.post(PUBLISH_PATHS[kind], json=data)
+                        ok = response.status_code < 400
+                    if ok:
+                        latencies[kind].append(time.perf_counter() - started)
+                    else:
+                        failures[kind] += 1
+                finally:
+                    semaphore.release()
+
+            tasks = []
+            started = time.perf_counter()
+            for offset, kind, data in events:
+                due = started + (offset / speed if speed else 0)
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                await semaphore.acquire()
+                lateness.append(max(0.0, time.perf_counter() - due))
+                tasks.append(asyncio.create_task(send(kind, data)))
+            await asyncio.gather(*tasks)
+            elapsed = time.perf_counter() - started
+
+    if harness is not None:
+        harness.stop()
+    executor.shutdown()
+
+    results = {}
+    for kind in sorted(kinds):
+        results[kind] = latency_summary("", latencies[kind], elapsed, "rps")
+        results[kind]["failed"] = failures[kind]
+    results["replay"] = {
+        "requests": len(events),
+        "duration_s": elapsed,
+        "p99_lateness_ms": percentile(lateness, 99) * 1000,
+        "max_lateness_ms": max(lateness, default=0.0) * 1000,
+    }
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Replay captured ISS traffic against stand-in backends")
+    parser.add_argument("traces", nargs="+", help="Trace files written by the listener or publisher API")
+    parser.add_argument("--speed", default="1", help="Replay speed multiplier (1, 10, 10x) or 'max'")
+    parser.add_argument("--concurrency", type=int, default=64, help="Maximum requests in flight")
+    parser.add_argument("--target", choices=PUBLISH_TARGETS, default="publisher", help="Where publish requests are sent")
+    parser.add_argument("--reply-timeout", type=float, default=60, help="Seconds to wait for a directive reply")
+    parser.add_argument("--maap-latency", default="lognormal:20,0.5", help="Fake MAAP latency model, e.g. constant:20")
+    parser.add_argument("--maap-error-rate", type=float, default=0.0, help="Fraction of fake MAAP requests that fail")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the fake MAAP latency and error draws")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Relative change reported as a regression")
+    parser.add_argument("--save", help="Write the replay results to this JSON file")
+    parser.add_argument("--compare", help="Compare against results saved by an earlier replay")
+    parser.add_argument("--output", default=OUTPUT_PATH, help="File the report is written to")
+    parser.add_argument(
+        "--config", action="append", default=[], metavar="NAME=VALUE", help="Override a service config parameter"
+    )
+    parser.add_argument("--log-level", default="critical", help="Python log level for the services under test")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    traces = [os.path.abspath(path) for path in args.traces]
+
+    # Configure logging and the fakes before any service module is imported
+    logging.basicConfig(level=getattr(logging, args.log_level.upper()))
+    fake_gmsec.install(BENCH_CONFIG, parse_overrides(args.config))
+    os.environ.setdefault("INGEST_CONFIG_PATH", os.path.join(REPO_ROOT, "gmsec_service/handlers/ingest_config.example.yaml"))
+    os.chdir(REPO_ROOT)
+
+    events = load_events(traces)
+    if not events:
+        print("No requests found in the given traces", file=sys.stderr)
+        return 1
+    print(f"Replaying {len(events)} requests spanning {events[-1][0]:.1f}s at speed {args.speed}", file=sys.stderr)
+
+    results = asyncio.run(replay(events, args))
+
+    settings = {"traces": " ".join(args.traces), "speed": args.speed, "target": args.target, "concurrency": args.concurrency}
+    report, _ = format_report(results, load_baselines(args.compare) if args.compare else {}, args.tolerance, settings)
+    print(report)
+    with open(args.output, "w") as f:
+        f.write(report)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"settings": settings, **results}, f, indent=2, sort_keys=True)
+            f.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,367 @@
+"""
+Offline benchmark suite for the ISS GMSEC services.
+
+Runs the directive listener, publisher API and gateway in one process against an in-process fake
+GMSEC bus (benchmarks/fake_gmsec.py) and a local fake MAAP server (benchmarks/fake_maap.py), then
+reports throughput, latency percentiles and peak traced memory, compared against stored baselines.
+
+    python -m benchmarks.run
+    python -m benchmarks.run --scenario directives --directives 50 --maap-latency lognormal:40,0.6
+    python -m benchmarks.run --update-baselines
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Callable, Optional
+
+from benchmarks import fake_gmsec
+from benchmarks.harness import ListenerHarness, directive_fields, publish_target
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+BENCH_CONFIG = os.path.join(BENCH_DIR, "config-bench.xml")
+BASELINES_PATH = os.path.join(BENCH_DIR, "baselines.json")
+OUTPUT_PATH = os.path.join(REPO_ROOT, "bench_output.txt")
+
+
+# Metrics where a lower value is better; everything else is better when higher
+LOWER_IS_BETTER = ("_ms", "_kib", "duration_s", "timeouts", "failed")
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def latency_summary(prefix: str, latencies: list[float], elapsed: float, rate_name: str) -> dict[str, float]:
+    return {
+        f"{prefix}{rate_name}": len(latencies) / elapsed if elapsed else 0.0,
+        f"{prefix}p50_ms": percentile(latencies, 50) * 1000,
+        f"{prefix}p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def with_peak_memory(run: Callable[[], dict], measure_memory: bool) -> dict:
+    """
+    Runs a scenario and, when measure_memory is set, runs it a second time under tracemalloc and
+    adds its peak traced memory. Timings always come from the untraced run.
+    """
+    results = run()
+    if measure_memory:
+        tracemalloc.start()
+        try:
+            run()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        results["peak_memory_kib"] = peak / 1024
+    return results
+
+
+# Directive listener
+
+
+def build_directive(index: int, keyword: str, job_ids: list[str]) -> dict[str, str]:
+    if keyword == "JOB-STATUS":
+        return directive_fields(keyword, {"job-id": job_ids[index % len(job_ids)]})
+    return directive_fields(
+        keyword,
+        {
+            "concept_id": "C0000000001-BENCH",
+            "products": [f"s3://bench-bucket/products/product-{index}.nc"],
+            "format": "nc",
+        },
+    )
+
+
+def run_directives(args) -> dict[str, float]:
+    """
+    Sends JOB-STATUS and SUBMIT-JOB directives through the bus to a running GmsecListener from
+    `--concurrency` requester threads, timing each request until its reply arrives.
+    """
+    harness = ListenerHarness(args.maap_latency, args.maap_error_rate, args.seed).start()
+    job_ids = [f"bench-job-{i}" for i in range(args.job_ids)]
+    keywords = ["SUBMIT-JOB" if i % 100 < args.submit_percent else "JOB-STATUS" for i in range(args.directives)]
+
+    latencies: list[float] = []
+    timeouts = 0
+    lock = threading.Lock()
+    next_index = iter(range(args.directives))
+
+    def requester():
+        nonlocal timeouts
+        for index in next_index:
+            started = time.perf_counter()
+            reply = harness.request(build_directive(index, keywords[index], job_ids), args.reply_timeout)
+            elapsed = time.perf_counter() - started
+            with lock:
+                if reply is None:
+                    timeouts += 1
+                else:
+                    latencies.append(elapsed)
+
+    started = time.perf_counter()
+    requesters = [threading.Thread(target=requester, daemon=True) for _ in range(args.concurrency)]
+    for thread in requesters:
+        thread.start()
+    for thread in requesters:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    harness.stop()
+
+    results = latency_summary("", latencies, elapsed, "throughput_per_s")
+    results["timeouts"] = timeouts
+    results["startup_ms"] = sum(harness.listener.gmsec.startup_timings.values()) * 1000
+    return results
+
+
+# Publisher API and gateway
+
+
+async def drive_http(app, path: str, payload: dict, count: int, concurrency: int) -> tuple[list[float], float, int]:
+    """Posts payload to path `count` times with `concurrency` requests in flight over ASGI"""
+    import httpx
+
+    latencies: list[float] = []
+    failures = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+
+        async def one():
+            nonlocal failures
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post(path, json=payload)
+                if response.status_code >= 400:
+                    failures += 1
+                else:
+                    latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(count)))
+        elapsed = time.perf_counter() - started
+
+    return latencies, elapsed, failures
+
+
+PRODUCT_PAYLOAD = {
+    "job_id": "bench-job",
+    "concept_id": "C0000000001-BENCH",
+    "ogc": "http://titiler.bench/stac/collections/bench/items",
+    "uris": ["s3://bench-bucket/products/file1.zarr", "s3://bench-bucket/products/file2.zarr"],
+}
+LOG_PAYLOAD = {"level": "INFO", "msg_body": "benchmark log message"}
+# Rounds of the messages scenario; the best rate of each is reported
+MESSAGE_ROUNDS = 5
+
+
+def run_publish(target: str, args) -> dict[str, float]:
+    """Calls /product and /log on the publisher API or the gateway, publishing to the fake bus"""
+
+    async def run():
+        results: dict[str, float] = {}
+        fake_gmsec.reset_bus()
+        async with publish_target(target) as app:
+            for name, path, payload in (("product_", "/product", PRODUCT_PAYLOAD), ("log_", "/log", LOG_PAYLOAD)):
+                latencies, elapsed, failures = await drive_http(app, path, payload, args.requests, args.concurrency)
+                if failures:
+                    print(f"WARNING: {failures} {path} requests failed", file=sys.stderr)
+                results.update(latency_summary(name, latencies, elapsed, "rps"))
+        return results
+
+    return asyncio.run(run())
+
+
+# Message construction
+
+
+def run_messages(args) -> dict[str, float]:
+    """
+    Builds PROD, LOG and RESP.DIR messages from the message factory each time, and from the
+    cached prototypes, reporting messages built per second for both
+    """
+    from gmsec_service.common.connection import GmsecConnection
+    from gmsec_service.common.job import JobState
+    from gmsec_service.common.message_templates import MessageTemplateCache
+    from gmsec_service.services.listener import GmsecListener
+    from gmsec_service.services.publisher import GmsecLog, GmsecProduct
+
+    fake_gmsec.reset_bus()
+    gmsec = GmsecConnection("config/config-prod.xml")
+    product = GmsecProduct(
+        PRODUCT_PAYLOAD["job_id"], PRODUCT_PAYLOAD["concept_id"], "default", PRODUCT_PAYLOAD["ogc"], PRODUCT_PAYLOAD["uris"], gmsec
+    )
+    log = GmsecLog(LOG_PAYLOAD["level"], LOG_PAYLOAD["msg_body"], gmsec)
+    # build_response only needs the listener's connection
+    listener = GmsecListener.__new__(GmsecListener)
+    listener.gmsec = gmsec
+    job_status = JobState.from_maap_status("Succeeded", "bench-job")
+    request_id = fake_gmsec.U16Field("REQUEST-ID", 1)
+
+    builders = (
+        ("product_", product._construct_product_message),
+        ("log_", log._construct_log_message),
+        ("resp_", lambda: listener.build_response(job_status, request_id)),
+    )
+    modes = (("factory", MessageTemplateCache(gmsec.msg_factory, enabled=False)), ("template", gmsec.templates))
+    results: dict[str, float] = {}
+    # Alternate the modes over several rounds and keep each one's best rate, so warm-up and
+    # whichever mode happens to run first don't decide the comparison
+    for _ in range(MESSAGE_ROUNDS):
+        for name, build in builders:
+            for mode, templates in modes:
+                gmsec.templates = templates
+                started = time.perf_counter()
+                for _ in range(args.messages):
+                    build()
+                rate = args.messages / (time.perf_counter() - started)
+                key = f"{name}{mode}_per_s"
+                results[key] = max(results.get(key, 0.0), rate)
+    gmsec.teardown()
+    return results
+
+
+SCENARIOS: dict[str, Callable] = {
+    "directives": run_directives,
+    "publisher_api": lambda args: run_publish("publisher", args),
+    "gateway": lambda args: run_publish("gateway", args),
+    "messages": run_messages,
+}
+
+
+# Reporting
+
+
+def load_baselines(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(scenario: str, metric: str, value: float, baselines: dict, tolerance: float) -> tuple[Optional[float], bool]:
+    """Returns the relative change against the baseline and whether it is a regression"""
+    baseline = baselines.get(scenario, {}).get(metric)
+    if not baseline:
+        return None, False
+    change = (value - baseline) / baseline
+    lower_is_better = metric.endswith(LOWER_IS_BETTER)
+    regressed = change > tolerance if lower_is_better else change < -tolerance
+    return change, regressed
+
+
+def format_report(results: dict, baselines: dict, tolerance: float, settings: dict) -> tuple[str, list[str]]:
+    lines = [
+        "ISS GMSEC service benchmarks",
+        "Settings: " + ", ".join(f"{name}={value}" for name, value in settings.items()),
+        "",
+        f"{'scenario':<16}{'metric':<22}{'value':>12}{'baseline':>12} {'change':>11}",
+    ]
+    regressions = []
+    for scenario, metrics in results.items():
+        for metric, value in metrics.items():
+            baseline = baselines.get(scenario, {}).get(metric)
+            change, regressed = compare(scenario, metric, value, baselines, tolerance)
+            change_text = f"{change:+.1%}" if change is not None else "-"
+            if regressed:
+                change_text += " !"
+                regressions.append(f"{scenario}.{metric}")
+            baseline_text = f"{baseline:.2f}" if baseline is not None else "-"
+            lines.append(f"{scenario:<16}{metric:<22}{value:>12.2f}{baseline_text:>12} {change_text:>11}")
+    lines.append("")
+    if regressions:
+        lines.append(f"Regressions beyond {tolerance:.0%}: {', '.join(regressions)}")
+    else:
+        lines.append(f"No regressions beyond {tolerance:.0%}")
+    return "\n".join(lines) + "\n", regressions
+
+
+def parse_overrides(raw: list[str]) -> dict[str, str]:
+    overrides = {}
+    for entry in raw:
+        name, sep, value = entry.partition("=")
+        if not sep:
+            raise SystemExit(f"Invalid config override '{entry}'. Expected NAME=VALUE")
+        overrides[name.strip()] = value.strip()
+    return overrides
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the ISS GMSEC services")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Scenario to run (repeatable, default all)")
+    parser.add_argument("--directives", type=int, default=200, help="Directives sent to the listener")
+    parser.add_argument("--requests", type=int, default=500, help="Requests sent to each HTTP endpoint")
+    parser.add_argument("--messages", type=int, default=20000, help="Messages built per kind and round by the messages scenario")
+    parser.add_argument("--concurrency", type=int, default=4, help="Requests in flight at once")
+    parser.add_argument("--submit-percent", type=int, default=20, help="Percent of directives that are SUBMIT-JOB")
+    parser.add_argument("--job-ids", type=int, default=50, help="Distinct job ids queried by JOB-STATUS")
+    parser.add_argument("--reply-timeout", type=float, default=60, help="Seconds to wait for a directive reply")
+    parser.add_argument("--maap-latency", default="lognormal:20,0.5", help="Fake MAAP latency model, e.g. constant:20")
+    parser.add_argument("--maap-error-rate", type=float, default=0.0, help="Fraction of fake MAAP requests that fail")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the fake MAAP latency and error draws")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Relative change reported as a regression")
+    parser.add_argument("--baselines", default=BASELINES_PATH, help="Baselines file to compare against")
+    parser.add_argument("--update-baselines", action="store_true", help="Store these results as the new baselines")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit non-zero when a metric regresses")
+    parser.add_argument("--output", default=OUTPUT_PATH, help="File the report is written to")
+    parser.add_argument(
+        "--config", action="append", default=[], metavar="NAME=VALUE", help="Override a service config parameter"
+    )
+    parser.add_argument("--log-level", default="critical", help="Python log level for the services under test")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    # Configure logging and the fakes before any service module is imported
+    logging.basicConfig(level=getattr(logging, args.log_level.upper()))
+    fake_gmsec.install(BENCH_CONFIG, parse_overrides(args.config))
+    os.environ.setdefault("INGEST_CONFIG_PATH", os.path.join(REPO_ROOT, "gmsec_service/handlers/ingest_config.example.yaml"))
+    os.chdir(REPO_ROOT)
+
+    settings = {
+        name: getattr(args, name)
+        for name in ("directives", "requests", "concurrency", "submit_percent", "maap_latency", "maap_error_rate")
+    }
+    if args.config:
+        settings["config"] = " ".join(args.config)
+    results = {}
+    for scenario in args.scenario or list(SCENARIOS):
+        print(f"Running {scenario}...", file=sys.stderr)
+        results[scenario] = with_peak_memory(lambda: SCENARIOS[scenario](args), not args.no_memory)
+
+    baselines = load_baselines(args.baselines)
+    report, regressions = format_report(results, baselines, args.tolerance, settings)
+    print(report)
+    with open(args.output, "w") as f:
+        f.write(report)
+
+    if args.update_baselines:
+        baselines.update(
+            {scenario: {metric: round(value, 2) for metric, value in metrics.items()} for scenario, metrics in results.items()}
+        )
+        baselines["settings"] = settings
+        with open(args.baselines, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Updated baselines in {args.baselines}", file=sys.stderr)
+
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+import logging
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Optional
+
+logger = logging.getLogger("publisher_api")
+
+# Publish callables return (status message, published, stored in the outbox for replay)
+PublishFn = Callable[[], tuple[str, bool, bool]]
+
+
+class PublishQueueFull(Exception):
+    """Raised when the publish queue cannot accept more messages"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Publish queue is full")
+        self.retry_after = retry_after
+
+
+class PublishQueue:
+    """
+    Bounded in-memory queue of pending publishes drained by background worker threads.
+
+    Each accepted publish gets a tracking id whose outcome can be looked up with `status` until it
+    ages out of the most recent `max_tracked` entries. The outcome is "published", "outboxed" for
+    a message stored in the outbox to be replayed later, or "failed".
+
+    Attributes:
+        max_size (int): Maximum number of publishes waiting in the queue.
+        workers (int): Number of background publisher threads.
+        retry_after (int): Seconds clients are told to wait when the queue is full.
+    """
+
+    def __init__(self, max_size: int = 1000, workers: int = 1, max_tracked: int = 10000, retry_after: int = 5):
+        self.max_size = max_size
+        self.workers = workers
+        self.max_tracked = max_tracked
+        self.retry_after = retry_after
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max_size)
+        self._statuses: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads: list[threading.Thread] = []
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"publisher-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Started publish queue with {self.workers} workers (max size {self.max_size})")
+
+    def stop(self, timeout: Optional[float] = None):
+        """Publishes everything already queued, then stops the workers"""
+        for _ in self._threads:
+            self._queue.put(None)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        self._threads = []
+
+    def submit(self, kind: str, publish: PublishFn) -> str:
+        tracking_id = str(uuid.uuid4())
+        self._set_status(tracking_id, {"tracking_id": tracking_id, "kind": kind, "status": "queued"})
+        try:
+            self._queue.put_nowait((tracking_id, publish))
+        except queue.Full:
+            with self._lock:
+                self._statuses.pop(tracking_id, None)
+            raise PublishQueueFull(self.retry_after)
+        return tracking_id
+
+    def status(self, tracking_id: str) -> Optional[dict]:
+        with self._lock:
+            status = self._statuses.get(tracking_id)
+            return dict(status) if status else None
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def _set_status(self, tracking_id: str, status: dict):
+        with self._lock:
+            self._statuses[tracking_id] = status
+            self._statuses.move_to_end(tracking_id)
+            while len(self._statuses) > self.max_tracked:
+                self._statuses.popitem(last=False)
+
+    def _update_status(self, tracking_id: str, **fields):
+        with self._lock:
+            if tracking_id in self._statuses:
+                self._statuses[tracking_id].update(fields)
+
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            tracking_id, publish = item
+            try:
+                detail, published, outboxed = publish()
+            except Exception as e:
+                logger.exception(f"Queued publish {tracking_id} failed: {e}")
+                detail, published, outboxed = f"Error publishing message: {e}", False, False
+
+            if published:
+                status = "published"
+            elif outboxed:
+                status = "outboxed"
+            else:
+                status = "failed"
+            self._update_status(tracking_id, status=status, detail=detail)
@@ -1,13 +1,19 @@
 import logging
 
-from typing import List, Optional, Annotated
-from fastapi import FastAPI, Depends
+from typing import Iterator, List, Optional, Annotated
+from fastapi import FastAPI, Depends, HTTPException, Request
+from fastapi.responses import JSONResponse, Response
 from contextlib import asynccontextmanager
 
 from pydantic import BaseModel, StringConstraints, model_validator, field_validator, Field
 
-from gmsec_service.services.publisher import GmsecProduct, GmsecLog
+from gmsec_service.services.publisher import GmsecProduct, GmsecLog, publish_outbox_message
+from gmsec_service.services.outbox import Outbox, OutboxReplayer
 from gmsec_service.common.connection import GmsecConnection
+from gmsec_service.common.connection_pool import ConnectionPoolExhausted, GmsecConnectionPool
+from gmsec_service.common.metrics import CONTENT_TYPE, REGISTRY
+from gmsec_service.common.trace import TraceRecorder
+from gmsec_service.api.publish_queue import PublishQueue, PublishQueueFull
 
 logging.basicConfig(
     level=logging.INFO,
@@ -16,7 +22,17 @@ logging.basicConfig(
 )
 logger = logging.getLogger("publisher_api")
 
-gmsec_connection: Optional[GmsecConnection] = None
+connection_pool: Optional[GmsecConnectionPool] = None
+publish_queue: Optional[PublishQueue] = None
+outbox: Optional[Outbox] = None
+outbox_replayer: Optional[OutboxReplayer] = None
+trace_recorder: Optional[TraceRecorder] = None
+pool_retry_after = 5
+
+PUBLISH_QUEUE_DEPTH = REGISTRY.gauge("iss_publish_queue_depth", "Publishes waiting in the publish queue")
+OUTBOX_DEPTH = REGISTRY.gauge("iss_outbox_depth", "Messages waiting in the outbox for replay")
+OUTBOX_OLDEST_AGE = REGISTRY.gauge("iss_outbox_oldest_age_seconds", "Age of the oldest message waiting in the outbox")
+POOL_IN_USE = REGISTRY.gauge("iss_gmsec_pool_in_use", "Pooled GMSEC connections checked out")
 
 NonEmptyStr = Annotated[str, StringConstraints(strip_whitespace=True, min_length=1)]
 
@@ -70,38 +86,212 @@ class ProductRequest(BaseModel):
         logger.error("Invalid OGC in request: must be a string, list of strings, or omitted")
         raise ValueError("ogc must be a string, list of strings, or omitted")
 
+class BatchProductRequest(BaseModel):
+    products: List[ProductRequest] = Field(min_length=1, max_length=1000)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global gmsec_connection
-    gmsec_connection = GmsecConnection("config/config-prod.xml")
+    global connection_pool, publish_queue, outbox, outbox_replayer, trace_recorder, pool_retry_after
+    connection_pool = GmsecConnectionPool.from_config_file("config/config-prod.xml", on_reconnect)
+    pool_retry_after = int(connection_pool.config.get_value("publisher-pool-retry-after", "5"))
+    POOL_IN_USE.set_function(connection_pool.in_use)
+    trace_recorder = TraceRecorder.from_config(connection_pool.config, "publisher-trace-path", "publisher")
+    if trace_recorder:
+        logger.info(f"Capturing publish request trace to {trace_recorder.path}")
+    outbox, outbox_replayer = build_outbox(connection_pool)
+    if outbox_replayer:
+        outbox_replayer.start()
+        OUTBOX_DEPTH.set_function(outbox.depth)
+        OUTBOX_OLDEST_AGE.set_function(outbox.oldest_age)
+    publish_queue = build_publish_queue(connection_pool.config)
+    if publish_queue:
+        publish_queue.start()
+        PUBLISH_QUEUE_DEPTH.set_function(publish_queue.depth)
     yield
-    if gmsec_connection:
-        gmsec_connection.conn.disconnect()
+    if publish_queue:
+        publish_queue.stop(timeout=30)
+    if outbox_replayer:
+        outbox_replayer.stop(timeout=10)
+    if outbox:
+        outbox.close()
+    if trace_recorder:
+        trace_recorder.close()
+    if connection_pool:
+        connection_pool.close()
+
+
+def on_reconnect(reason: str):
+    logger.info(f"GMSEC connection restored after error: {reason}")
+    # Replay anything that failed while the connection was down without waiting out the backoff
+    if outbox_replayer:
+        outbox_replayer.wake()
+
+
+def build_outbox(pool: GmsecConnectionPool) -> tuple[Optional[Outbox], Optional[OutboxReplayer]]:
+    """
+    Opens the durable outbox configured by publisher-outbox-path, if any, and its replayer
+    """
+    config = pool.config
+    path = config.get_value("publisher-outbox-path", "")
+    if not path:
+        return None, None
+
+    durable_outbox = Outbox(path, int(config.get_value("publisher-outbox-order-window", "100")))
+    logger.info(f"Using outbox {path} with {durable_outbox.depth()} pending messages")
+    replayer = OutboxReplayer(
+        durable_outbox,
+        lambda kind, payload: with_pooled_connection(publish_outbox_message, kind, payload),
+        rate=float(config.get_value("publisher-outbox-replay-rate", "20")),
+        batch_size=int(config.get_value("publisher-outbox-batch-size", "50")),
+        max_attempts=int(config.get_value("publisher-outbox-max-attempts", "5")),
+    )
+    return durable_outbox, replayer
+
+
+def build_publish_queue(config) -> Optional[PublishQueue]:
+    """
+    Builds the publish queue from the publisher config. A queue size of 0 keeps /product and
+    /log synchronous.
+    """
+    max_size = int(config.get_value("publisher-queue-size", "0"))
+    if max_size <= 0:
+        return None
+    return PublishQueue(
+        max_size=max_size,
+        workers=int(config.get_value("publisher-queue-workers", "1")),
+        retry_after=int(config.get_value("publisher-queue-retry-after", "5")),
+    )
+
+
+def with_pooled_connection(publish, *args):
+    """Calls publish(*args, gmsec) on a connection checked out of the pool for the duration of the call"""
+    if not connection_pool:
+        logger.error("GMSEC connection pool is not initialized")
+        raise RuntimeError("GMSEC connection pool is not initialized")
+    with connection_pool.connection() as gmsec:
+        return publish(*args, gmsec)
+
+
+def capture_request(kind: str, request: BaseModel):
+    """Records a publish request in the capture trace, if one is configured"""
+    if trace_recorder:
+        trace_recorder.record(kind, request.model_dump())
+
+
+def enqueue_publish(kind: str, publish) -> JSONResponse:
+    try:
+        tracking_id = publish_queue.submit(kind, publish)
+    except PublishQueueFull as e:
+        logger.warning(f"Rejecting {kind} publish: queue is full")
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Publish queue is full"},
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    return JSONResponse(status_code=202, content={"tracking_id": tracking_id, "status": "queued"})
+
+
+def build_product(product: ProductRequest, gmsec: GmsecConnection) -> GmsecProduct:
+    return GmsecProduct(product.job_id, product.concept_id, product.provenance, product.ogc, product.uris, gmsec, outbox)
+
+
+def publish_product_request(product: ProductRequest, gmsec: GmsecConnection) -> tuple[str, bool, bool]:
+    gmsec_product = build_product(product, gmsec)
+    publish_status = gmsec_product.publish_product()
+    return publish_status, bool(gmsec_product.published), gmsec_product.queued
+
+
+def publish_log_request(log: LogRequest, gmsec: GmsecConnection) -> tuple[str, bool, bool]:
+    gmsec_log = GmsecLog(log.level, log.msg_body, gmsec, outbox)
+    publish_status = gmsec_log.publish_log()
+    return publish_status, bool(gmsec_log.published), gmsec_log.queued
 
 
 app = FastAPI(lifespan=lifespan)
 
 
-def get_gmsec_connection() -> GmsecConnection:
-    if not gmsec_connection:
-        logger.error("GMSEC connection is not initialized")
-        raise RuntimeError("GMSEC connection is not initialized")
-    return gmsec_connection
+def get_gmsec_connection() -> Iterator[GmsecConnection]:
+    """Checks a connection out of the pool for the duration of a request"""
+    if not connection_pool:
+        logger.error("GMSEC connection pool is not initialized")
+        raise RuntimeError("GMSEC connection pool is not initialized")
+    with connection_pool.connection() as gmsec:
+        yield gmsec
+
+
+@app.exception_handler(ConnectionPoolExhausted)
+def connection_pool_exhausted(request: Request, exc: ConnectionPoolExhausted) -> JSONResponse:
+    logger.warning(f"Rejecting {request.url.path} request: {exc}")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "No GMSEC connection available"},
+        headers={"Retry-After": str(pool_retry_after)},
+    )
+
+
+@app.get("/metrics")
+def metrics():
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
 
 
 @app.post("/product")
-def publish_product(product: ProductRequest, gmsec: GmsecConnection = Depends(get_gmsec_connection)):
+def publish_product(product: ProductRequest):
     logger.info(f"Received /product request: {product.json()}")
-    gmsec_product = GmsecProduct(
-        product.job_id, product.concept_id, product.provenance, product.ogc, product.uris, gmsec
-    )
-    publish_status = gmsec_product.publish_product()
+    capture_request("product", product)
+    if publish_queue:
+        # Queued publishes check out their own connection when they run
+        return enqueue_publish("product", lambda: with_pooled_connection(publish_product_request, product))
+    publish_status, _, _ = with_pooled_connection(publish_product_request, product)
     return {"status": publish_status}
 
 
 @app.post("/log")
-def log_message(log: LogRequest, gmsec: GmsecConnection = Depends(get_gmsec_connection)):
+def log_message(log: LogRequest):
     logger.info(f"Received /log request: {log.json()}")
-    gmsec_log = GmsecLog(log.level, log.msg_body, gmsec)
-    publish_status = gmsec_log.publish_log()
+    capture_request("log", log)
+    if publish_queue:
+        # Queued publishes check out their own connection when they run
+        return enqueue_publish("log", lambda: with_pooled_connection(publish_log_request, log))
+    publish_status, _, _ = with_pooled_connection(publish_log_request, log)
     return {"status": publish_status}
+
+
+@app.get("/publish/{tracking_id}")
+def get_publish_status(tracking_id: str):
+    if not publish_queue:
+        raise HTTPException(status_code=404, detail="Publish queue is not enabled")
+    status = publish_queue.status(tracking_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Unknown tracking id {tracking_id}")
+    return status
+
+
+@app.post("/products/batch")
+def publish_products(batch: BatchProductRequest, gmsec: GmsecConnection = Depends(get_gmsec_connection)):
+    logger.info(f"Received /products/batch request with {len(batch.products)} products")
+    capture_request("batch", batch)
+    results = []
+    for product in batch.products:
+        gmsec_product = build_product(product, gmsec)
+        publish_status = gmsec_product.publish_product()
+        results.append(
+            {
+                "job_id": product.job_id,
+                "published": bool(gmsec_product.published),
+                "queued": gmsec_product.queued,
+                "status": publish_status,
+            }
+        )
+
+    # Messages stored in the outbox will be replayed, so they are not counted as failed
+    published = sum(1 for result in results if result["published"])
+    queued = sum(1 for result in results if result["queued"])
+    return {"published": published, "queued": queued, "failed": len(results) - published - queued, "results": results}
+
+
+@app.get("/outbox")
+def outbox_status():
+    if not outbox:
+        raise HTTPException(status_code=404, detail="Outbox is not enabled")
+    return outbox.stats()
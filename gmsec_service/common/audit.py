@@ -0,0 +1,184 @@
+import json
+import os
+import queue
+import random
+import threading
+import time
+from typing import Optional
+
+import libgmsec_python3 as lp
+
+
+class AuditWriter:
+    """
+    Background thread that writes audit records as JSON lines to `path`, or to the GMSEC log when
+    `path` is None. One writer is shared by every MessageAudit in the process that writes to the
+    same place, so pooled connections don't each hold their own handle on the file. If the writer
+    falls behind, records beyond `max_pending` are dropped and counted.
+    """
+
+    def __init__(self, path: Optional[str], max_pending: int = 10000):
+        self.path = path
+        self.dropped = 0
+        self.users = 0
+
+        self._pending: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._write_records, name="message-audit", daemon=True)
+        self._thread.start()
+
+    def submit(self, record: dict):
+        try:
+            self._pending.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _write_records(self):
+        out = open(self.path, "a") if self.path else None
+        try:
+            while True:
+                record = self._pending.get()
+                if record is None:
+                    return
+                line = json.dumps(record, separators=(",", ":"))
+                if out:
+                    out.write(line + "\n")
+                    if self._pending.empty():
+                        out.flush()
+                else:
+                    lp.log_info("AUDIT " + line)
+        finally:
+            if out:
+                out.close()
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """
+        Writes out pending records and stops the writer thread, waiting up to `timeout` seconds.
+        A writer thread that has died, or is still behind a full queue once the timeout is up,
+        is abandoned with its pending records.
+        """
+        if not self._thread.is_alive():
+            return
+        try:
+            self._pending.put(None, timeout=timeout)
+        except queue.Full:
+            lp.log_warning(f"Audit writer for {self.path or 'the GMSEC log'} did not drain; dropping pending records")
+            return
+        self._thread.join(timeout)
+
+
+audit_writers: dict[Optional[str], AuditWriter] = {}
+audit_writers_lock = threading.Lock()
+
+
+def acquire_audit_writer(path: Optional[str], max_pending: int = 10000) -> AuditWriter:
+    """Returns the process-wide writer for `path`, starting it for its first user"""
+    key = os.path.abspath(path) if path else None
+    with audit_writers_lock:
+        writer = audit_writers.get(key)
+        if writer is None:
+            writer = audit_writers[key] = AuditWriter(key, max_pending)
+        writer.users += 1
+        return writer
+
+
+def release_audit_writer(writer: AuditWriter, timeout: Optional[float] = 5.0):
+    """Stops the writer once its last user has released it"""
+    with audit_writers_lock:
+        writer.users -= 1
+        if writer.users > 0:
+            return
+        if audit_writers.get(writer.path) is writer:
+            del audit_writers[writer.path]
+    writer.close(timeout)
+
+
+class MessageAudit:
+    """
+    Records sent and received GMSEC messages without serializing them on the hot path.
+
+    Modes:
+        off: nothing is recorded.
+        sampled: a `sample_rate` fraction of messages is recorded with key fields only.
+        full: every message is recorded with all of its fields.
+
+    Selected fields are copied off the message by the caller; encoding and writing happen on the
+    AuditWriter shared by every MessageAudit with the same `path`.
+    """
+
+    MODES = ("off", "sampled", "full")
+
+    KEY_FIELDS = (
+        "MESSAGE-TYPE",
+        "MESSAGE-SUBTYPE",
+        "REQUEST-ID",
+        "DIRECTIVE-KEYWORD",
+        "DIRECTIVE-STRING",
+        "RESPONSE-STATUS",
+        "DATA-STRING",
+        "PROD-NAME",
+        "JOB-ID",
+        "NUM-OF-FILES",
+        "SEVERITY",
+        "MSG-TEXT",
+        "COMPONENT-STATUS",
+        "COUNTER",
+    )
+
+    def __init__(self, mode: str = "sampled", sample_rate: float = 0.01, path: Optional[str] = None, max_pending: int = 10000):
+        if mode not in self.MODES:
+            raise ValueError(f"Invalid message audit mode '{mode}'. Must be one of {', '.join(self.MODES)}")
+        self.mode = mode
+        self.sample_rate = sample_rate
+        self.path = path
+        self._writer: Optional[AuditWriter] = None
+        if mode != "off":
+            self._writer = acquire_audit_writer(path, max_pending)
+
+    @classmethod
+    def from_config(cls, config: lp.Config) -> "MessageAudit":
+        return cls(
+            mode=config.get_value("message-audit-mode", "sampled").lower(),
+            sample_rate=float(config.get_value("message-audit-sample-rate", "0.01")),
+            path=config.get_value("message-audit-path", "") or None,
+        )
+
+    @property
+    def dropped(self) -> int:
+        """Records dropped by the shared writer, for every MessageAudit using it"""
+        return self._writer.dropped if self._writer else 0
+
+    def should_record(self) -> bool:
+        if self.mode == "full":
+            return True
+        return self.mode == "sampled" and random.random() < self.sample_rate
+
+    def record(self, direction: str, msg: lp.Message):
+        """Records a message if the audit mode selects it. `direction` is e.g. 'sent' or 'received'."""
+        if not self.should_record():
+            return
+
+        record = {
+            "ts": time.time(),
+            "direction": direction,
+            "subject": msg.get_subject(),
+            "fields": self._all_fields(msg) if self.mode == "full" else self._key_fields(msg),
+        }
+        self._writer.submit(record)
+
+    def _key_fields(self, msg: lp.Message) -> dict[str, str]:
+        return {name: msg.get_string_value(name) for name in self.KEY_FIELDS if msg.has_field(name)}
+
+    def _all_fields(self, msg: lp.Message) -> dict[str, str]:
+        fields = {}
+        field_iter = msg.get_field_iterator()
+        while field_iter.has_next():
+            field = field_iter.next()
+            fields[field.get_name()] = field.get_string_value()
+        return fields
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """Releases the shared writer, which writes out pending records once its last user closes"""
+        if self._writer is None:
+            return
+        release_audit_writer(self._writer, timeout)
+        self._writer = None
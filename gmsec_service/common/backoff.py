@@ -0,0 +1,30 @@
+import random
+from typing import Optional
+
+
+class ExponentialBackoff:
+    """
+    Exponential backoff with jitter.
+
+    Attempt n (from 0) waits a random delay between half and all of
+    min(max_delay, initial_delay * multiplier**n), so services retrying after the same outage
+    spread out instead of retrying in lockstep.
+    """
+
+    def __init__(
+        self,
+        initial_delay: float = 1.0,
+        max_delay: float = 30.0,
+        multiplier: float = 2.0,
+        rng: Optional[random.Random] = None,
+    ):
+        if initial_delay <= 0 or max_delay < initial_delay:
+            raise ValueError("initial_delay must be positive and no larger than max_delay")
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.rng = rng or random.Random()
+
+    def delay(self, attempt: int) -> float:
+        ceiling = min(self.max_delay, self.initial_delay * self.multiplier ** min(attempt, 64))
+        return self.rng.uniform(ceiling / 2, ceiling)
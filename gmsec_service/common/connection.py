@@ -1,4 +1,50 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
 import libgmsec_python3 as lp
+from gmsec_service.common.audit import MessageAudit
+from gmsec_service.common.backoff import ExponentialBackoff
+from gmsec_service.common.message_templates import MessageTemplateCache
+from gmsec_service.common.metrics import REGISTRY
+from gmsec_service.common.validation import VALIDATION_MODES, ValidationCache
+
+PUBLISH_SECONDS = REGISTRY.histogram("iss_gmsec_publish_seconds", "Latency of GMSEC publish and reply calls", ("kind",))
+PUBLISH_ERRORS = REGISTRY.counter("iss_gmsec_publish_errors_total", "Failed GMSEC publish and reply calls", ("kind",))
+RECONNECTS = REGISTRY.counter("iss_gmsec_reconnects_total", "GMSEC reconnection attempts", ("outcome",))
+CONNECT_SECONDS = REGISTRY.histogram(
+    "iss_gmsec_connect_seconds", "Time spent in each phase of GMSEC startup and reconnection", ("phase",)
+)
+
+
+def is_connection_error(e: Exception) -> bool:
+    """
+    Whether a GmsecError means the middleware connection is gone, as opposed to a rejected
+    message such as a content-validation failure. Errors that carry no error class are treated
+    as connection errors.
+    """
+    if not isinstance(e, lp.GmsecError):
+        return False
+    get_error_class = getattr(e, "get_error_class", None)
+    if get_error_class is None:
+        return True
+    connection_classes = {getattr(lp, name, None) for name in ("CONNECTION_ERROR", "MIDDLEWARE_ERROR")}
+    return get_error_class() in connection_classes - {None}
+
+
+def build_event_callback(gmsec: "GmsecConnection", generation: int):
+    """
+    Creates the event callback that reports a connection failure to the supervisor. The
+    generation ties it to one middleware connection, so late events from a replaced connection
+    are ignored.
+    """
+
+    class ConnectionEventCallback(lp.EventCallback):
+        def on_event(self, conn, status, event):
+            gmsec.connection_lost(status.get_reason(), generation)
+
+    return ConnectionEventCallback()
 
 
 class GmsecConnection(object):
@@ -6,10 +52,23 @@ class GmsecConnection(object):
     A class to manage a GMSEC connection. Handles setting up, tearing down, and maintaining
     the connection to the GMSEC Bus.
 
+    The connection is supervised: when the middleware reports a connection exception, a
+    background thread reconnects with jittered exponential backoff, re-establishes the
+    subscriptions, event callbacks and auto-dispatch set up through this class, and then
+    notifies the reconnect listeners. Reconnects are warm: the parsed config and the message
+    factory, with its loaded message-spec templates and standard fields, are kept and only the
+    middleware connection is rebuilt.
+
     Attributes:
         config (lp.ConfigFile): The loaded configuration file.
         conn (lp.Connection): The connection instance to GMSEC Bus.
         subscription (lp.SubscriptionEntry): The subscription details.
+        audit (MessageAudit): Audit recorder for messages sent and received on this connection.
+        state (str): One of CONNECTION_STATES.
+        last_error (str): Reason given for the most recent connection loss.
+        startup_timings (dict): Seconds spent in each startup phase, in the order they ran.
+        templates (MessageTemplateCache): Prototype messages built from msg_factory.
+        validator (ValidationCache): Validates outbound messages in the "cached" validation mode.
     """
 
     SYSTEM = "CZDT"
@@ -17,6 +76,12 @@ class GmsecConnection(object):
     FACILITY = "JPL"
     COMPONENT = "PRODUCT-INGEST"
 
+    CONNECTED = "connected"
+    RECONNECTING = "reconnecting"
+    FAILED = "failed"
+    CLOSED = "closed"
+    CONNECTION_STATES = (CONNECTED, RECONNECTING, FAILED, CLOSED)
+
     config: lp.Config
     subscription: lp.SubscriptionEntry
     conn: lp.Connection
@@ -29,34 +94,270 @@ class GmsecConnection(object):
             config_fp (str): The relative path to the configuration file.
             subscription_name (str): The name of the subscritption.
         """
+        self.startup_timings: dict[str, float] = {}
+
         # Load config from file
-        config_file = lp.ConfigFile()
-        config_file.load(config_fp)
-        self.config = config_file.lookup_config("config")
-        self.config_file = config_file
+        with self.startup_phase("load_config"):
+            config_file = lp.ConfigFile()
+            config_file.load(config_fp)
+            self.config = config_file.lookup_config("config")
+            self.config_file = config_file
 
         # Initialize log level
         level = lp.Log.from_string(self.config.get_value("loglevel", "info"))
         lp.Log.set_reporting_level(level)
         lp.log_info(f"Using config file --> {config_fp}")
 
-        # Create connection instance
-        self.conn = lp.Connection(self.config)
+        self.audit = MessageAudit.from_config(self.config)
+
+        # Supervisor state; subscriptions and callbacks are replayed onto each new connection
+        self.state = self.CONNECTED
+        self.last_error: Optional[str] = None
+        self.backoff = ExponentialBackoff(
+            float(self.config.get_value("reconnect-initial-delay", "1")),
+            float(self.config.get_value("reconnect-max-delay", "30")),
+        )
+        self.max_reconnect_attempts = int(self.config.get_value("reconnect-max-attempts", "0"))
+        self._subscriptions: list[tuple[str, Optional[lp.Callback]]] = []
+        self._event_callbacks: list[tuple[int, lp.EventCallback]] = []
+        self._reconnect_listeners: list[Callable[[str], None]] = []
+        self._auto_dispatch = False
+        self._generation = 0
+        self._state_lock = threading.Lock()
+        self._reconnect_lock = threading.Lock()
+        self._closed = threading.Event()
 
-        self.msg_factory: lp.MessageFactory = self.conn.get_message_factory()
+        # The factory loads the message-spec templates from gmsec-schema-path; it is reused by
+        # every connection this object opens.
+        with self.startup_phase("message_factory"):
+            self.msg_factory: lp.MessageFactory = lp.MessageFactory(self.config)
 
-        # Set up standard fields within the MessageFactory associated with the connection object.
-        self.set_standard_fields(self.msg_factory)
+            # Set up standard fields within the MessageFactory associated with the connection object.
+            self.set_standard_fields(self.msg_factory)
+            self.templates = MessageTemplateCache(self.msg_factory)
+            self.validator = self.build_validator()
 
-        # Establish connection to the GMSEC Bus.
-        self.conn.connect()
+        # In full mode the middleware validates every send, so this must be set before the first
+        # connection is created; cached mode validates in publish() and reply() instead.
+        self.config.add_value("gmsec-msg-content-validate-send", "true" if self.validator is None else "false")
+
+        # Create connection instance and establish connection to the GMSEC Bus.
+        with self.startup_phase("connect"):
+            self.open_connection()
 
         # Log connection details (API version and library version)
         lp.log_info(lp.Connection.get_api_version())
         lp.log_info("Middleware version = " + self.conn.get_library_version())
 
-        # Enforce message content validation prior to send
-        self.config.add_value("gmsec-msg-content-validate-send", "true")
+    def build_validator(self) -> Optional[ValidationCache]:
+        """
+        "full" validates every outbound message in the middleware. "cached" fully validates the
+        first message of each structure and only checks field values on the rest.
+        """
+        mode = self.config.get_value("message-validation-mode", "full").lower()
+        if mode not in VALIDATION_MODES:
+            raise ValueError(f"Invalid message-validation-mode '{mode}'. Must be one of {', '.join(VALIDATION_MODES)}")
+        if mode == "full":
+            return None
+        return ValidationCache(
+            self.msg_factory.get_specification(), int(self.config.get_value("message-validation-cache-size", "1024"))
+        )
+
+    def open_connection(self):
+        """
+        Creates and connects a new middleware connection on the existing config and message
+        factory, then restores the tracked event callbacks, subscriptions and auto-dispatch on it
+        """
+        conn = lp.Connection(self.config, self.msg_factory)
+
+        generation = self._generation + 1
+        self._supervisor_callback = build_event_callback(self, generation)
+        conn.register_event_callback(lp.Connection.Event_CONNECTION_EXCEPTION_EVENT, self._supervisor_callback)
+        for event, callback in self._event_callbacks:
+            conn.register_event_callback(event, callback)
+
+        conn.connect()
+
+        for pattern, callback in self._subscriptions:
+            if callback is None:
+                conn.subscribe(pattern)
+            else:
+                conn.subscribe(pattern, callback)
+        if self._auto_dispatch:
+            conn.start_auto_dispatch()
+
+        self.conn = conn
+        self._generation = generation
+
+    @contextmanager
+    def startup_phase(self, phase: str) -> Iterator[None]:
+        """Times a startup phase into startup_timings; services add their own phases too"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.startup_timings[phase] = self.startup_timings.get(phase, 0.0) + elapsed
+            CONNECT_SECONDS.labels(phase=phase).observe(elapsed)
+
+    def startup_summary(self) -> str:
+        phases = ", ".join(f"{phase} {seconds * 1000:.1f}ms" for phase, seconds in self.startup_timings.items())
+        return f"{sum(self.startup_timings.values()) * 1000:.1f}ms ({phases})"
+
+    @property
+    def connected(self) -> bool:
+        return self.state == self.CONNECTED
+
+    @property
+    def generation(self) -> int:
+        """Counts the middleware connections opened; pass it to connection_lost() with an error"""
+        return self._generation
+
+    @property
+    def healthy(self) -> bool:
+        """False once the supervisor has given up or the connection was torn down"""
+        return self.state not in (self.FAILED, self.CLOSED)
+
+    def subscribe(self, pattern: str, callback: Optional[lp.Callback] = None):
+        """Subscribes to `pattern` and re-subscribes after every reconnect"""
+        if callback is None:
+            self.conn.subscribe(pattern)
+        else:
+            self.conn.subscribe(pattern, callback)
+        self._subscriptions.append((pattern, callback))
+
+    def register_event_callback(self, event: int, callback: lp.EventCallback):
+        """Registers an event callback that is carried over to every new connection"""
+        self.conn.register_event_callback(event, callback)
+        self._event_callbacks.append((event, callback))
+
+    def start_auto_dispatch(self):
+        """
+        Starts auto-dispatch, which is restarted on every new connection. While the supervisor is
+        reconnecting, it is left for the new connection to start.
+        """
+        with self._reconnect_lock:
+            self._auto_dispatch = True
+            if self.connected:
+                self.conn.start_auto_dispatch()
+
+    def stop_auto_dispatch(self):
+        self._auto_dispatch = False
+        self.conn.stop_auto_dispatch()
+
+    def add_reconnect_listener(self, listener: Callable[[str], None]):
+        """Registers listener(reason), called after the connection has been re-established"""
+        self._reconnect_listeners.append(listener)
+
+    def publish(self, msg: lp.Message, kind: str):
+        try:
+            if self.validator is not None:
+                self.validator.validate(msg)
+            with PUBLISH_SECONDS.labels(kind=kind).time(), self._detect_connection_loss():
+                self.conn.publish(msg)
+        except Exception:
+            PUBLISH_ERRORS.labels(kind=kind).inc()
+            raise
+
+    def reply(self, request_msg: lp.Message, reply_msg: lp.Message):
+        try:
+            if self.validator is not None:
+                self.validator.validate(reply_msg)
+            with PUBLISH_SECONDS.labels(kind="reply").time(), self._detect_connection_loss():
+                self.conn.reply(request_msg, reply_msg)
+        except Exception:
+            PUBLISH_ERRORS.labels(kind="reply").inc()
+            raise
+
+    @contextmanager
+    def _detect_connection_loss(self):
+        """
+        Starts reconnecting when a call fails with a connection-class GmsecError, instead of waiting
+        for the middleware to report the loss. Rejected messages, such as content-validation
+        failures in the "full" validation mode, propagate without reconnecting. The error is tied
+        to the connection the call was made on, so a publish that fails while an earlier reconnect
+        finishes doesn't tear down the new connection.
+        """
+        generation = self._generation
+        try:
+            yield
+        except lp.GmsecError as e:
+            if is_connection_error(e):
+                self.connection_lost(e, generation)
+            raise
+
+    def connection_lost(self, reason, generation: Optional[int] = None):
+        """
+        Starts reconnecting in the background. Called from the middleware's event callback, so it
+        returns at once; errors for a connection that has already been replaced are ignored.
+        """
+        with self._state_lock:
+            if generation is not None and generation != self._generation:
+                return
+            if self.state in (self.RECONNECTING, self.CLOSED):
+                return
+            self.state = self.RECONNECTING
+        threading.Thread(target=self.reconnect, args=(reason,), name="gmsec-supervisor", daemon=True).start()
+
+    def reconnect(self, reason) -> bool:
+        """
+        Reconnects with jittered exponential backoff until connected, torn down, or
+        reconnect-max-attempts (0 for no limit) is used up. A caller that arrives while another
+        thread is reconnecting waits for that attempt instead of starting a second one.
+
+        Returns:
+            bool: Whether the connection is up.
+        """
+        generation = self._generation
+        with self._reconnect_lock:
+            if self._generation != generation or self._closed.is_set():
+                return self.connected
+
+            self.state = self.RECONNECTING
+            self.last_error = str(reason)
+            lp.log_error(f"GMSEC connection lost: {reason}")
+            lost_at = time.monotonic()
+            self._close_connection()
+
+            attempt = 0
+            while not self.max_reconnect_attempts or attempt < self.max_reconnect_attempts:
+                if self._closed.wait(self.backoff.delay(attempt)):
+                    return False
+                attempt += 1
+                try:
+                    lp.log_info(f"Attempting GMSEC reconnection (attempt {attempt})...")
+                    with CONNECT_SECONDS.labels(phase="reconnect").time():
+                        self.open_connection()
+                except Exception as e:
+                    RECONNECTS.labels(outcome="failure").inc()
+                    lp.log_error(f"Reconnect failed: {e}")
+                    self._close_connection()
+                    continue
+                if self._closed.is_set():
+                    self._close_connection()
+                    return False
+
+                RECONNECTS.labels(outcome="success").inc()
+                self.state = self.CONNECTED
+                lp.log_info(f"GMSEC reconnection successful after {time.monotonic() - lost_at:.1f}s")
+                for listener in self._reconnect_listeners:
+                    try:
+                        listener(self.last_error)
+                    except Exception as e:
+                        lp.log_error(f"Reconnect listener failed: {e}")
+                return True
+
+            self.state = self.FAILED
+            lp.log_error(f"Giving up on GMSEC reconnection after {attempt} attempts")
+            return False
+
+    def _close_connection(self):
+        try:
+            if self._auto_dispatch:
+                self.conn.stop_auto_dispatch()
+            self.conn.disconnect()
+        except Exception as e:
+            lp.log_warning(f"Error closing GMSEC connection: {e}")
 
     def teardown(self):
         """
@@ -65,6 +366,8 @@ class GmsecConnection(object):
         This method disconnects from the GMSEC Bus, stops the heartbeat generator,
         and deletes connection and heartbeat generator objects.
         """
+        self.state = self.CLOSED
+        self._closed.set()
         try:
             # Disconnect from the GMSEC Bus, and terminate subscriptions
             self.conn.disconnect()
@@ -76,6 +379,8 @@ class GmsecConnection(object):
             # Log error if the teardown process fails
             lp.log_error("Exception: " + str(e))
 
+        self.audit.close()
+
     def set_standard_fields(self, factory):
         """
         Set standard fields in the MessageFactory associated with the connection.
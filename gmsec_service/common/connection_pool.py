@@ -0,0 +1,165 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+import libgmsec_python3 as lp
+from gmsec_service.common.connection import GmsecConnection
+from gmsec_service.common.metrics import REGISTRY
+
+POOL_REPLACED = REGISTRY.counter("iss_gmsec_pool_replaced_total", "Pooled GMSEC connections replaced after failing a health check")
+
+
+class ConnectionPoolExhausted(Exception):
+    """Raised when no pooled connection becomes available within the checkout timeout"""
+
+
+class GmsecConnectionPool:
+    """
+    Fixed-size pool of GmsecConnections so concurrent publishers each use their own middleware
+    connection instead of sharing one.
+
+    Connections are created on demand up to `size`. Each connection reconnects on its own after
+    a bus outage; one whose supervisor has given up fails the health check when it is checked
+    out or returned, and is torn down so its slot is refilled with a new connection the next
+    time one is needed.
+
+    Attributes:
+        size (int): Maximum number of connections.
+        checkout_timeout (float): Seconds checkout() waits for a free connection.
+    """
+
+    def __init__(
+        self,
+        connection_factory: Callable[[], GmsecConnection],
+        size: int = 1,
+        checkout_timeout: float = 30.0,
+        health_check: Optional[Callable[[GmsecConnection], bool]] = None,
+        initial: Optional[list[GmsecConnection]] = None,
+        config: Optional[lp.Config] = None,
+    ):
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        self.connection_factory = connection_factory
+        self.size = size
+        self.checkout_timeout = checkout_timeout
+        self.health_check = health_check or (lambda gmsec: gmsec.healthy)
+        self.config = config
+
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._idle: list[GmsecConnection] = list(initial or [])
+        self._created = len(self._idle)
+        self._in_use = 0
+        self._closed = False
+
+    @classmethod
+    def from_config_file(
+        cls, config_fp: str, reconnect_listener: Optional[Callable[[str], None]] = None
+    ) -> "GmsecConnectionPool":
+        """
+        Builds a pool sized by the `publisher-pool-size` config parameter. The first connection is
+        opened immediately, both to read the config and to fail fast if the bus is unreachable.
+        `reconnect_listener` is registered on every connection the pool opens.
+        """
+
+        def open_connection() -> GmsecConnection:
+            gmsec = GmsecConnection(config_fp)
+            if reconnect_listener is not None:
+                gmsec.add_reconnect_listener(reconnect_listener)
+            return gmsec
+
+        first = open_connection()
+        size = int(first.config.get_value("publisher-pool-size", "1"))
+        checkout_timeout = float(first.config.get_value("publisher-pool-checkout-timeout", "30"))
+        lp.log_info(f"First pooled GMSEC connection took {first.startup_summary()}")
+        lp.log_info(f"Publishing over a pool of up to {size} GMSEC connections")
+        return cls(open_connection, size, checkout_timeout, initial=[first], config=first.config)
+
+    def checkout(self, timeout: Optional[float] = None) -> GmsecConnection:
+        deadline = time.monotonic() + (self.checkout_timeout if timeout is None else timeout)
+        while True:
+            with self._available:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("GMSEC connection pool is closed")
+                    if self._idle:
+                        gmsec, create = self._idle.pop(), False
+                        break
+                    if self._created < self.size:
+                        self._created += 1
+                        gmsec, create = None, True
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise ConnectionPoolExhausted(f"No GMSEC connection available within {self.checkout_timeout}s")
+                    self._available.wait(remaining)
+
+            if create:
+                try:
+                    gmsec = self.connection_factory()
+                except Exception:
+                    with self._available:
+                        self._created -= 1
+                        self._available.notify()
+                    raise
+
+            if self._is_healthy(gmsec):
+                with self._lock:
+                    self._in_use += 1
+                return gmsec
+            self._discard(gmsec)
+
+    def release(self, gmsec: GmsecConnection):
+        healthy = not self._closed and self._is_healthy(gmsec)
+        with self._available:
+            self._in_use -= 1
+            if healthy:
+                self._idle.append(gmsec)
+                self._available.notify()
+        if not healthy:
+            self._discard(gmsec)
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[GmsecConnection]:
+        gmsec = self.checkout(timeout)
+        try:
+            yield gmsec
+        finally:
+            self.release(gmsec)
+
+    def _is_healthy(self, gmsec: GmsecConnection) -> bool:
+        try:
+            return bool(self.health_check(gmsec))
+        except Exception as e:
+            logging.warning(f"GMSEC connection health check failed: {e}")
+            return False
+
+    def _discard(self, gmsec: GmsecConnection):
+        with self._available:
+            self._created -= 1
+            self._available.notify()
+        if not self._closed:
+            POOL_REPLACED.inc()
+            lp.log_warning("Replacing unhealthy pooled GMSEC connection")
+        try:
+            gmsec.teardown()
+        except Exception as e:
+            lp.log_warning(f"Error during teardown: {e}")
+
+    def in_use(self) -> int:
+        return self._in_use
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"size": self.size, "open": self._created, "in_use": self._in_use, "idle": len(self._idle)}
+
+    def close(self):
+        """Tears down idle connections; connections still checked out are torn down when released"""
+        with self._available:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._available.notify_all()
+        for gmsec in idle:
+            self._discard(gmsec)
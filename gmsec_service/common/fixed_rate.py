@@ -0,0 +1,74 @@
+import threading
+import time
+from typing import Callable, Iterator
+
+
+class FixedRateScheduler:
+    """
+    Drift-free fixed-rate ticker based on a monotonic clock.
+
+    Tick n is due at start + n * period, regardless of how long the work between ticks takes.
+    When the work overruns by one or more whole periods the policy decides what happens to the
+    missed ticks: "skip" fires only the most recent missed tick and drops the older ones,
+    "catch-up" fires all of them back-to-back until the schedule is current again.
+
+    Attributes:
+        last_lateness (float): Seconds between the most recent tick's deadline and when it fired.
+        max_lateness (float): Largest lateness seen so far.
+        ticks (int): Number of ticks fired.
+        skipped (int): Number of ticks dropped by the "skip" policy.
+    """
+
+    POLICIES = ("skip", "catch-up")
+
+    def __init__(self, period: float, policy: str = "skip", clock: Callable[[], float] = time.monotonic):
+        if period <= 0:
+            raise ValueError("period must be positive")
+        if policy not in self.POLICIES:
+            raise ValueError(f"Invalid missed tick policy '{policy}'. Must be one of {', '.join(self.POLICIES)}")
+        self.period = period
+        self.policy = policy
+        self.clock = clock
+
+        self.last_lateness = 0.0
+        self.max_lateness = 0.0
+        self.total_lateness = 0.0
+        self.ticks = 0
+        self.skipped = 0
+
+        self._stop = threading.Event()
+
+    def __iter__(self) -> Iterator[float]:
+        """Yields the lateness of each tick until stop() is called"""
+        deadline = self.clock()
+        while not self._stop.is_set():
+            now = self.clock()
+            if now < deadline:
+                self._stop.wait(deadline - now)
+                continue
+
+            lateness = now - deadline
+            self.last_lateness = lateness
+            self.max_lateness = max(self.max_lateness, lateness)
+            self.total_lateness += lateness
+            self.ticks += 1
+            yield lateness
+
+            deadline += self.period
+            if self.policy == "skip":
+                missed = int((self.clock() - deadline) // self.period)
+                if missed > 0:
+                    deadline += missed * self.period
+                    self.skipped += missed
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "ticks": self.ticks,
+            "skipped": self.skipped,
+            "last_lateness": self.last_lateness,
+            "max_lateness": self.max_lateness,
+            "mean_lateness": self.total_lateness / self.ticks if self.ticks else 0.0,
+        }
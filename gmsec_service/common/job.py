@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+from typing import Optional
 
 
 @dataclass
@@ -27,8 +28,101 @@ class JobState:
         "INVALID": 5,
     }
 
+    terminal_labels = ("COMPLETED", "FAILED")
+
+    @property
+    def is_terminal(self) -> bool:
+        return self.status_label in self.terminal_labels
+
     @classmethod
     def from_maap_status(cls, maap_status: str, job_id: str) -> "JobState":
         label = cls.status_map.get(maap_status.lower(), "INVALID")
         code = cls.status_code_map.get(label, 5)
         return cls(job_id=job_id, status_label=label, status_code=code)
+
+    @property
+    def has_failures(self) -> bool:
+        return bool(self.failed_job_ids())
+
+    def failed_job_ids(self) -> list[str]:
+        """Job ids worth re-checking before reporting a failure"""
+        return [self.job_id] if self.status_label == "FAILED" else []
+
+    def with_refreshed(self, refreshed: dict[str, "JobState"]) -> "JobState":
+        """Returns the refreshed state for this job, keyed by the job id it was looked up with"""
+        return refreshed.get(self.job_id, self)
+
+    def job_states(self) -> list["JobState"]:
+        return [self]
+
+    def response_data(self) -> dict:
+        return {"job-id": self.job_id, "job-status": self.status_label}
+
+
+@dataclass
+class ProductJobState:
+    """
+    Job submitted for one product of a multi-product SUBMIT-JOB directive. `error` explains why no
+    job could be submitted for the product.
+    """
+
+    product: str
+    job_state: JobState
+    error: Optional[str] = None
+
+    def response_data(self) -> dict:
+        data = {"product": self.product, **self.job_state.response_data()}
+        if self.error:
+            data["error"] = self.error
+        return data
+
+
+@dataclass
+class JobBatchState:
+    """
+    Jobs submitted for a multi-product SUBMIT-JOB directive, in directive order. The batch is
+    FAILED only when every product failed; otherwise it reports the least advanced status among
+    the products that did not fail, and failures are listed per product.
+    """
+
+    products: list[ProductJobState]
+
+    @property
+    def job_ids(self) -> list[str]:
+        return [product.job_state.job_id for product in self.products]
+
+    def job_states(self) -> list[JobState]:
+        return [product.job_state for product in self.products]
+
+    @property
+    def status_label(self) -> str:
+        labels = [p.job_state.status_label for p in self.products if p.job_state.status_label != "FAILED"]
+        if not labels:
+            return "FAILED"
+        return min(labels, key=lambda label: JobState.status_code_map.get(label, 5))
+
+    @property
+    def status_code(self) -> int:
+        return JobState.status_code_map.get(self.status_label, 5)
+
+    @property
+    def has_failures(self) -> bool:
+        return bool(self.failed_job_ids())
+
+    def failed_job_ids(self) -> list[str]:
+        """Failed products that have a MAAP job; products never submitted have nothing to re-check"""
+        return [job_id for p in self.products for job_id in p.job_state.failed_job_ids() if job_id != "N/A"]
+
+    def with_refreshed(self, refreshed: dict[str, JobState]) -> "JobBatchState":
+        return JobBatchState(
+            [
+                replace(p, job_state=refreshed[p.job_state.job_id]) if p.job_state.job_id in refreshed else p
+                for p in self.products
+            ]
+        )
+
+    def response_data(self) -> dict:
+        return {
+            "job-status": self.status_label,
+            "jobs": [product.response_data() for product in self.products],
+        }
@@ -0,0 +1,115 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from gmsec_service.common.job import JobState
+from gmsec_service.common.metrics import REGISTRY
+
+
+class JobStatusCache:
+    """
+    LRU cache of JobState objects keyed by job id.
+
+    Non-terminal states expire after the TTL configured for their label; terminal states
+    (see JobState.terminal_labels) never expire and are only dropped by LRU eviction. States
+    without a TTL or a real job id (e.g. INVALID, or the "N/A" placeholder returned on errors)
+    are never cached.
+
+    Attributes:
+        max_entries (int): Maximum number of cached job ids.
+        ttls (dict[str, float]): TTL in seconds per non-terminal status label.
+        hits (int): Number of lookups answered from the cache.
+        misses (int): Number of lookups that were absent or expired.
+    """
+
+    DEFAULT_TTLS = {
+        "SUBMITTED": 5.0,
+        "IN_PROGRESS": 15.0,
+    }
+
+    def __init__(
+        self,
+        max_entries: int = 4096,
+        ttls: Optional[dict[str, float]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttls = {**self.DEFAULT_TTLS, **(ttls or {})}
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: OrderedDict[str, tuple[JobState, Optional[float]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "JobStatusCache":
+        return cls(
+            max_entries=int(os.getenv("JOB_STATUS_CACHE_SIZE", "4096")),
+            ttls={
+                "SUBMITTED": float(os.getenv("JOB_STATUS_TTL_SUBMITTED", "5")),
+                "IN_PROGRESS": float(os.getenv("JOB_STATUS_TTL_IN_PROGRESS", "15")),
+            },
+        )
+
+    def get(self, job_id: str) -> Optional[JobState]:
+        with self._lock:
+            entry = self._entries.get(job_id)
+            if entry is not None:
+                job_state, expires_at = entry
+                if expires_at is None or self.clock() < expires_at:
+                    self._entries.move_to_end(job_id)
+                    self.hits += 1
+                    return job_state
+                del self._entries[job_id]
+            self.misses += 1
+            return None
+
+    def put(self, job_state: JobState):
+        if job_state.job_id == "N/A":
+            return
+
+        if job_state.is_terminal:
+            expires_at = None
+        elif self.ttls.get(job_state.status_label, 0) > 0:
+            expires_at = self.clock() + self.ttls[job_state.status_label]
+        else:
+            self.invalidate(job_state.job_id)
+            return
+
+        with self._lock:
+            self._entries[job_state.job_id] = (job_state, expires_at)
+            self._entries.move_to_end(job_state.job_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, job_id: str):
+        with self._lock:
+            self._entries.pop(job_id, None)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+job_status_cache = None
+job_status_cache_lock = threading.Lock()
+
+
+def get_job_status_cache() -> JobStatusCache:
+    global job_status_cache
+    if job_status_cache is None:
+        with job_status_cache_lock:
+            if job_status_cache is None:
+                cache = JobStatusCache.from_env()
+                REGISTRY.gauge("iss_job_status_cache_hits", "Job status lookups answered from cache").set_function(
+                    lambda: cache.hits
+                )
+                REGISTRY.gauge("iss_job_status_cache_misses", "Job status lookups not answered from cache").set_function(
+                    lambda: cache.misses
+                )
+                REGISTRY.gauge("iss_job_status_cache_size", "Cached job statuses").set_function(lambda: cache.stats()["size"])
+                job_status_cache = cache
+    return job_status_cache
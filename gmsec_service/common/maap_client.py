@@ -0,0 +1,240 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from time import sleep
+from typing import Callable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from maap.maap import MAAP, DPSJob
+
+from gmsec_service.common.metrics import REGISTRY
+
+MAAP_REQUEST_SECONDS = REGISTRY.histogram("iss_maap_request_seconds", "Latency of MAAP API calls", ("operation",))
+MAAP_REQUEST_ERRORS = REGISTRY.counter("iss_maap_request_errors_total", "Failed MAAP API calls", ("operation",))
+
+
+def authenticate_maap(max_retries=5, base_delay=1.0, backoff_factor=2.0):
+    # MAAP API uses token stored in MAAP_PGT env var
+    if not os.getenv("MAAP_PGT"):
+        raise EnvironmentError("Required environment variable 'MAAP_PGT' is not set.")
+
+    for attempt in range(1, max_retries + 1):
+        try:
+            maap = MAAP()
+            if maap.profile and maap.profile.account_info():
+                return maap
+            else:
+                raise RuntimeError("Unable to connect to MAAP with provided token.")
+        except Exception as e:
+            if attempt == max_retries:
+                raise RuntimeError(f"MAAP authentication failed after {max_retries} attempts.") from e
+
+            delay = base_delay * (backoff_factor ** (attempt - 1))
+            logging.info(f"[Retry {attempt}/{max_retries}] Authentication failed: {e}. Retrying in {delay:.1f}s...")
+            sleep(delay)
+
+
+class _SessionRequests:
+    """
+    Stand-in for the `requests` module as seen by maap-py while MaapClient calls are running.
+    Module-level calls such as `requests.get(...)` made on a thread inside a MaapClient call are
+    routed through that client's pooled keep-alive session with its timeout; calls from any
+    other thread, and everything else (exceptions, status codes, etc.), go to the real module.
+    """
+
+    def request(self, method, url, **kwargs):
+        client = getattr(_active, "client", None)
+        if client is None:
+            return requests.request(method, url, **kwargs)
+        kwargs.setdefault("timeout", client.current_timeout())
+        return client.session.request(method, url, **kwargs)
+
+    def get(self, url, params=None, **kwargs):
+        return self.request("GET", url, params=params, **kwargs)
+
+    def options(self, url, **kwargs):
+        return self.request("OPTIONS", url, **kwargs)
+
+    def head(self, url, **kwargs):
+        kwargs.setdefault("allow_redirects", False)
+        return self.request("HEAD", url, **kwargs)
+
+    def post(self, url, data=None, json=None, **kwargs):
+        return self.request("POST", url, data=data, json=json, **kwargs)
+
+    def put(self, url, data=None, **kwargs):
+        return self.request("PUT", url, data=data, **kwargs)
+
+    def patch(self, url, data=None, **kwargs):
+        return self.request("PATCH", url, data=data, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(requests, name)
+
+
+_session_requests = _SessionRequests()
+_active = threading.local()
+_patch_lock = threading.Lock()
+_patch_users = 0
+_patched_modules: list = []
+
+
+@contextmanager
+def _maap_session(client: "MaapClient"):
+    """
+    Routes maap-py's HTTP calls on this thread through `client`'s session. maap-py has no hook
+    for a session, so the `requests` global of its modules is swapped while any call is running
+    and restored once the last one finishes.
+    """
+    global _patch_users
+    with _patch_lock:
+        if _patch_users == 0:
+            _patched_modules[:] = [
+                module
+                for name, module in list(sys.modules.items())
+                if (name == "maap" or name.startswith("maap.")) and getattr(module, "requests", None) is requests
+            ]
+            for module in _patched_modules:
+                module.requests = _session_requests
+        _patch_users += 1
+
+    previous = getattr(_active, "client", None)
+    _active.client = client
+    try:
+        yield
+    finally:
+        _active.client = previous
+        with _patch_lock:
+            _patch_users -= 1
+            if _patch_users == 0:
+                for module in _patched_modules:
+                    module.requests = requests
+                _patched_modules.clear()
+
+
+class MaapClient:
+    """
+    Thread-safe MAAP client shared by all directive handlers.
+
+    Holds a single authenticated MAAP instance and routes maap-py's HTTP calls through a pooled
+    keep-alive `requests.Session`, so concurrent directives reuse connections instead of paying
+    TLS setup on every call. Every call gets a timeout, either the client default or a per-call
+    override.
+
+    Attributes:
+        pool_size (int): Maximum number of keep-alive connections kept per MAAP host.
+        timeout (float): Default timeout in seconds for each HTTP call.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 10,
+        timeout: float = 30.0,
+        maap_factory: Callable[[], MAAP] = authenticate_maap,
+    ):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.maap_factory = maap_factory
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._maap: Optional[MAAP] = None
+        self._maap_lock = threading.Lock()
+        self._local = threading.local()
+
+    @classmethod
+    def from_env(cls) -> "MaapClient":
+        return cls(
+            pool_size=int(os.getenv("MAAP_POOL_SIZE", "10")),
+            timeout=float(os.getenv("MAAP_TIMEOUT", "30")),
+        )
+
+    @property
+    def maap(self) -> MAAP:
+        if self._maap is None:
+            with self._maap_lock:
+                if self._maap is None:
+                    self._maap = self.maap_factory()
+        return self._maap
+
+    def current_timeout(self) -> float:
+        return getattr(self._local, "timeout", None) or self.timeout
+
+    @contextmanager
+    def call_timeout(self, timeout: Optional[float]):
+        """Overrides the HTTP timeout for MAAP calls made by the current thread"""
+        previous = getattr(self._local, "timeout", None)
+        self._local.timeout = timeout
+        try:
+            yield
+        finally:
+            self._local.timeout = previous
+
+    @contextmanager
+    def _instrumented(self, operation: str, timeout: Optional[float]):
+        with _maap_session(self), self.call_timeout(timeout), MAAP_REQUEST_SECONDS.labels(operation=operation).time():
+            try:
+                yield
+            except Exception:
+                MAAP_REQUEST_ERRORS.labels(operation=operation).inc()
+                raise
+
+    def get_job_status(self, job_id: str, timeout: Optional[float] = None) -> str:
+        with self._instrumented("get_job_status", timeout):
+            return self.maap.getJobStatus(job_id)
+
+    def submit_job(self, job_args: dict, timeout: Optional[float] = None) -> DPSJob:
+        with self._instrumented("submit_job", timeout):
+            return self.maap.submitJob(**job_args)
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncMaapClient:
+    """
+    Optional asyncio front end for MaapClient. Calls run on worker threads, bounded by
+    max_concurrency, and share the same pooled session as the synchronous client.
+    """
+
+    def __init__(self, client: MaapClient, max_concurrency: int = 8):
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Created on first use so it belongs to the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def get_job_status(self, job_id: str, timeout: Optional[float] = None) -> str:
+        async with self._get_semaphore():
+            return await asyncio.to_thread(self.client.get_job_status, job_id, timeout)
+
+    async def submit_job(self, job_args: dict, timeout: Optional[float] = None) -> DPSJob:
+        async with self._get_semaphore():
+            return await asyncio.to_thread(self.client.submit_job, job_args, timeout)
+
+
+maap_client = None
+maap_client_lock = threading.Lock()
+
+
+def get_maap_client() -> MaapClient:
+    global maap_client
+    if maap_client is None:
+        with maap_client_lock:
+            if maap_client is None:
+                maap_client = MaapClient.from_env()
+    return maap_client
@@ -0,0 +1,44 @@
+import threading
+from typing import Callable
+
+import libgmsec_python3 as lp
+
+
+class MessageTemplateCache:
+    """
+    Prototype messages, built once per message kind from the message factory with their subject
+    and constant fields already set. New messages are copies of the prototype, so only the
+    variable fields are added per message.
+
+    Prototypes include the factory's standard fields, so the cache lives as long as the factory
+    it was built from. With `enabled` False every message is built from the factory, which the
+    benchmarks use for comparison.
+    """
+
+    def __init__(self, factory: lp.MessageFactory, enabled: bool = True):
+        self.factory = factory
+        self.enabled = enabled
+        self._prototypes: dict[str, lp.Message] = {}
+        self._lock = threading.Lock()
+
+    def create(self, kind: str, build: Callable[[lp.MessageFactory], lp.Message]) -> lp.Message:
+        """
+        Returns a copy of the `kind` prototype, calling build(factory) to make the prototype the
+        first time the kind is requested
+        """
+        if not self.enabled:
+            return build(self.factory)
+        prototype = self._prototypes.get(kind)
+        if prototype is None:
+            with self._lock:
+                prototype = self._prototypes.get(kind)
+                if prototype is None:
+                    prototype = self._prototypes[kind] = build(self.factory)
+        return lp.Message(prototype)
+
+    def kinds(self) -> list[str]:
+        return list(self._prototypes)
+
+    def clear(self):
+        with self._lock:
+            self._prototypes.clear()
@@ -0,0 +1,199 @@
+import heapq
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from gmsec_service.common.metrics import REGISTRY
+
+
+def completed(result: Any) -> Future:
+    """Returns a Future that already holds `result`"""
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+def chain(source: Future, target: Future):
+    """Resolves `target` with the outcome of `source` once it finishes"""
+
+    def copy(done: Future):
+        if done.cancelled():
+            target.cancel()
+        elif done.exception() is not None:
+            target.set_exception(done.exception())
+        else:
+            target.set_result(done.result())
+
+    source.add_done_callback(copy)
+
+
+def then(source: Future, fn: Callable[[Any], Any]) -> Future:
+    """
+    Returns a Future for fn(result) once `source` succeeds; a Future returned by fn is chained.
+    An exception from `source` or fn is passed on.
+    """
+    target = Future()
+
+    def run(done: Future):
+        if done.exception() is not None:
+            target.set_exception(done.exception())
+            return
+        try:
+            result = fn(done.result())
+        except BaseException as e:
+            target.set_exception(e)
+            return
+        if isinstance(result, Future):
+            chain(result, target)
+        else:
+            target.set_result(result)
+
+    source.add_done_callback(run)
+    return target
+
+
+def when_all(futures: list[Future]) -> Future:
+    """Returns a Future that resolves with `futures` once every one of them has finished"""
+    finished = Future()
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def on_done(_done: Future):
+        with lock:
+            remaining[0] -= 1
+            if remaining[0]:
+                return
+        finished.set_result(futures)
+
+    if not futures:
+        finished.set_result(futures)
+    for future in futures:
+        future.add_done_callback(on_done)
+    return finished
+
+
+def gather(futures: list[Future]) -> Future:
+    """Returns a Future for the list of results of `futures`, or the first exception raised"""
+
+    def results(done: list[Future]) -> list:
+        errors = [future.exception() for future in done if future.exception() is not None]
+        if errors:
+            raise errors[0]
+        return [future.result() for future in done]
+
+    return then(when_all(futures), results)
+
+
+class RetryScheduler:
+    """
+    Runs delayed work, such as retries and re-checks, without a blocked thread per wait.
+
+    One timer thread keeps the due times in a heap and hands each due call to a small executor, so
+    a slow call does not hold up the ones behind it. call_later() returns a Future for the call's
+    result; a call that itself returns a Future is chained, so continuations can schedule further
+    work and the caller sees only the final result.
+    """
+
+    def __init__(self, workers: int = 4, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._executor = ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="retry")
+        self._heap: list = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._outstanding = 0
+        self._closed = False
+        self._timer = threading.Thread(target=self._run, name="retry-scheduler", daemon=True)
+        self._timer.start()
+
+    @classmethod
+    def from_env(cls) -> "RetryScheduler":
+        return cls(workers=int(os.getenv("RETRY_SCHEDULER_WORKERS", "4")))
+
+    def call_later(self, delay: float, fn: Callable, *args) -> Future:
+        """Runs fn(*args) after `delay` seconds and returns a Future for its result"""
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("RetryScheduler is shut down")
+            heapq.heappush(self._heap, (self.clock() + max(delay, 0.0), next(self._sequence), fn, args, future))
+            self._outstanding += 1
+            self._wakeup.notify()
+        future.add_done_callback(self._finished)
+        return future
+
+    def _finished(self, _future: Future):
+        with self._lock:
+            self._outstanding -= 1
+            if self._outstanding == 0:
+                self._wakeup.notify_all()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while True:
+                    if self._closed and not self._heap:
+                        self._executor.shutdown(wait=False)
+                        return
+                    if self._heap:
+                        wait = self._heap[0][0] - self.clock()
+                        if wait <= 0:
+                            _, _, fn, args, future = heapq.heappop(self._heap)
+                            break
+                        self._wakeup.wait(wait)
+                    else:
+                        self._wakeup.wait()
+            self._executor.submit(self._call, fn, args, future)
+
+    @staticmethod
+    def _call(fn: Callable, args: tuple, future: Future):
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            future.set_exception(e)
+            return
+        if isinstance(result, Future):
+            chain(result, future)
+        else:
+            future.set_result(result)
+
+    def pending(self) -> int:
+        """Calls scheduled or running that have not finished"""
+        with self._lock:
+            return self._outstanding
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until every scheduled call has finished"""
+        with self._wakeup:
+            return self._wakeup.wait_for(lambda: self._outstanding == 0, timeout=timeout)
+
+    def shutdown(self, wait: bool = True):
+        """Stops accepting calls; calls already scheduled still run"""
+        with self._lock:
+            self._closed = True
+            self._wakeup.notify_all()
+        if wait:
+            self._timer.join()
+            self._executor.shutdown(wait=True)
+
+
+retry_scheduler = None
+retry_scheduler_lock = threading.Lock()
+
+
+def get_retry_scheduler() -> RetryScheduler:
+    global retry_scheduler
+    if retry_scheduler is None:
+        with retry_scheduler_lock:
+            if retry_scheduler is None:
+                scheduler = RetryScheduler.from_env()
+                REGISTRY.gauge("iss_scheduled_retries", "Delayed retries and re-checks not yet finished").set_function(
+                    scheduler.pending
+                )
+                retry_scheduler = scheduler
+    return retry_scheduler
@@ -0,0 +1,47 @@
+import threading
+from concurrent.futures import Future
+from typing import Callable, Hashable
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key. The first caller for a key starts the call;
+    callers arriving while it is outstanding get the same Future, which resolves to the same
+    result (or the same exception). Once the call finishes the key is forgotten, so later callers
+    start a new call.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._futures: dict[Hashable, Future] = {}
+
+    def do_async(self, key: Hashable, start: Callable[[], Future]) -> Future:
+        """
+        Returns the outstanding Future for `key`, or calls start() and shares the Future it
+        returns with callers arriving before it finishes
+        """
+        with self._lock:
+            shared = self._futures.get(key)
+            if shared is not None:
+                return shared
+            shared = self._futures[key] = Future()
+
+        def finish(done: Future):
+            with self._lock:
+                del self._futures[key]
+            if done.exception() is not None:
+                shared.set_exception(done.exception())
+            else:
+                shared.set_result(done.result())
+
+        try:
+            future = start()
+        except BaseException as e:
+            future = Future()
+            future.set_exception(e)
+        future.add_done_callback(finish)
+        return shared
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._futures)
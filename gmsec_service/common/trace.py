@@ -0,0 +1,90 @@
+import gzip
+import json
+import queue
+import threading
+import time
+from typing import Iterator, Optional
+
+TRACE_VERSION = 1
+
+
+def _open_trace(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t")
+    return open(path, mode)
+
+
+class TraceRecorder:
+    """
+    Captures incoming directives and publish requests, with their arrival times, to a trace file
+    that benchmarks/replay.py can feed back into the services.
+
+    The file holds one compact JSON object per line: a header with the capture's wall-clock start
+    time, then one `{"t": <seconds since start>, "k": <kind>, "d": <request data>}` line per request.
+    Paths ending in `.gz` are gzip compressed. Encoding and writing happen on a background thread;
+    if it falls behind, requests beyond `max_pending` are dropped and counted.
+    """
+
+    def __init__(self, path: str, source: str, max_pending: int = 10000):
+        self.path = path
+        self.source = source
+        self.dropped = 0
+        self.started = time.time()
+
+        self._start = time.monotonic()
+        self._pending: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._write_records, name="trace-recorder", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_config(cls, config, param: str, source: str) -> Optional["TraceRecorder"]:
+        """Returns a recorder writing to the path in config parameter `param`, or None if it is unset"""
+        path = config.get_value(param, "")
+        if not path:
+            return None
+        return cls(path, source)
+
+    def record(self, kind: str, data: dict):
+        try:
+            self._pending.put_nowait({"t": round(time.monotonic() - self._start, 6), "k": kind, "d": data})
+        except queue.Full:
+            self.dropped += 1
+
+    def _write_records(self):
+        with _open_trace(self.path, "a") as out:
+            header = {"trace": TRACE_VERSION, "source": self.source, "started": self.started}
+            out.write(json.dumps(header, separators=(",", ":")) + "\n")
+            while True:
+                record = self._pending.get()
+                if record is None:
+                    return
+                out.write(json.dumps(record, separators=(",", ":")) + "\n")
+                if self._pending.empty():
+                    out.flush()
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """Writes out pending records and stops the writer thread"""
+        if self._thread is None:
+            return
+        self._pending.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+
+def read_trace(path: str) -> Iterator[tuple[float, str, str, dict]]:
+    """
+    Yields (wall-clock time, source, kind, data) for every request in a trace file. A file may hold
+    several captures back to back, e.g. across service restarts; each starts with its own header.
+    """
+    started, source = 0.0, ""
+    with _open_trace(path, "r") as trace:
+        for line in trace:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if "trace" in record:
+                if record["trace"] != TRACE_VERSION:
+                    raise ValueError(f"Unsupported trace version {record['trace']} in {path}")
+                started, source = record["started"], record["source"]
+                continue
+            yield started + record["t"], source, record["k"], record["d"]
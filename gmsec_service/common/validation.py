@@ -0,0 +1,149 @@
+import re
+import threading
+from collections import Counter, OrderedDict
+
+import libgmsec_python3 as lp
+from gmsec_service.common.metrics import REGISTRY
+
+VALIDATION_MODES = ("full", "cached")
+
+MESSAGE_VALIDATIONS = REGISTRY.counter(
+    "iss_message_validations_total", "Outbound message content validations", ("result",)
+)
+
+# FILE.1.URI and FILE.2.URI are the same field repeated
+_INDEX = re.compile(r"\.\d+(?=\.|$)")
+
+
+class MessageValidationError(Exception):
+    """Raised when an outbound message fails content validation"""
+
+
+def message_signature(msg: lp.Message) -> tuple:
+    """
+    Structural signature of a message: its schema id plus each field name, with repeated-field
+    indices folded together, its type and how many times it repeats. Messages that differ only
+    in field values share a signature.
+    """
+    fields = Counter()
+    iterator = msg.get_field_iterator()
+    while iterator.has_next():
+        field = iterator.next()
+        fields[(_INDEX.sub(".#", field.get_name()), str(field.get_type()))] += 1
+    return (msg.get_schema_id(), tuple(sorted((name, kind, count) for (name, kind), count in fields.items())))
+
+
+# Value limits of the GMSEC integer field types
+_INTEGER_RANGES = {
+    "I8": (-(2**7), 2**7 - 1),
+    "U8": (0, 2**8 - 1),
+    "I16": (-(2**15), 2**15 - 1),
+    "U16": (0, 2**16 - 1),
+    "I32": (-(2**31), 2**31 - 1),
+    "U32": (0, 2**32 - 1),
+    "I64": (-(2**63), 2**63 - 1),
+    "U64": (0, 2**64 - 1),
+}
+
+
+class FieldConstraint:
+    """
+    Value constraints a message-spec template places on one field: the permitted values of its
+    VALUE list, its PATTERN (which carries length limits), and the range of its integer type.
+    The field type itself is part of the structural signature, so it is not checked here.
+    """
+
+    def __init__(self, name: str, field_type: str, values: str = "", pattern: str = ""):
+        self.name = name
+        self.field_type = field_type.upper()
+        self.values = frozenset(value.strip() for value in values.split(",")) if values else None
+        self.pattern = re.compile(pattern) if pattern else None
+        self.range = _INTEGER_RANGES.get(self.field_type)
+
+    @classmethod
+    def from_specification(cls, field_spec) -> "FieldConstraint":
+        return cls(field_spec.get_name(), field_spec.get_type(), field_spec.get_value(), field_spec.get_pattern())
+
+    def check(self, field: lp.Field):
+        name = field.get_name()
+        value = field.get_string_value()
+        if self.values is not None and value not in self.values:
+            raise MessageValidationError(f"Field {name} value '{value}' is not one of {sorted(self.values)}")
+        if self.pattern is not None and not self.pattern.fullmatch(value):
+            raise MessageValidationError(f"Field {name} value '{value}' does not match {self.pattern.pattern}")
+        if self.range is not None:
+            low, high = self.range
+            if not low <= field.get_integer_value() <= high:
+                raise MessageValidationError(f"Field {name} value {value} is outside [{low}, {high}]")
+
+
+def template_constraints(specification) -> dict[str, dict[str, FieldConstraint]]:
+    """Field constraints of every message-spec template, by schema id and folded field name"""
+    templates = {}
+    for message_spec in specification.get_message_specifications():
+        templates[message_spec.get_schema_id()] = {
+            _INDEX.sub(".#", field_spec.get_name()): FieldConstraint.from_specification(field_spec)
+            for field_spec in message_spec.get_field_specifications()
+        }
+    return templates
+
+
+def check_values(msg: lp.Message, constraints: dict[str, FieldConstraint]):
+    """
+    Checks every field value of a message whose structure has already been fully validated
+    against the template constraints kept for that structure
+    """
+    iterator = msg.get_field_iterator()
+    while iterator.has_next():
+        field = iterator.next()
+        constraint = constraints.get(_INDEX.sub(".#", field.get_name()))
+        if constraint is not None:
+            constraint.check(field)
+
+
+class ValidationCache:
+    """
+    Validates outbound messages against the message-spec templates once per structural
+    signature. The first message with a signature gets full compliance validation, and the
+    template constraints on its fields are kept with the signature; later messages with that
+    signature only have their field values checked against those constraints. Signatures are
+    kept in LRU order, up to `max_signatures`.
+    """
+
+    def __init__(self, specification, max_signatures: int = 1024):
+        self.max_signatures = max_signatures
+        self._templates = template_constraints(specification)
+        self._validated: "OrderedDict[tuple, dict[str, FieldConstraint]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def validate(self, msg: lp.Message):
+        signature = message_signature(msg)
+        with self._lock:
+            constraints = self._validated.get(signature)
+            if constraints is not None:
+                self._validated.move_to_end(signature)
+
+        if constraints is not None:
+            try:
+                check_values(msg, constraints)
+            except MessageValidationError:
+                MESSAGE_VALIDATIONS.labels(result="failed").inc()
+                raise
+            MESSAGE_VALIDATIONS.labels(result="cached").inc()
+            return
+
+        status = msg.is_compliant()
+        if status.has_error():
+            MESSAGE_VALIDATIONS.labels(result="failed").inc()
+            raise MessageValidationError(f"Message {signature[0]} is not compliant: {status.get_reason()}")
+        MESSAGE_VALIDATIONS.labels(result="full").inc()
+
+        template = self._templates.get(signature[0], {})
+        constraints = {name: template[name] for name, _, _ in signature[1] if name in template}
+        with self._lock:
+            self._validated[signature] = constraints
+            if len(self._validated) > self.max_signatures:
+                self._validated.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._validated)
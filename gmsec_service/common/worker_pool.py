@@ -0,0 +1,118 @@
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+
+def parse_keyword_limits(raw: Optional[str]) -> dict[str, int]:
+    """
+    Parses per-keyword concurrency caps from a config string, e.g. "SUBMIT-JOB:2,JOB-STATUS:8"
+    """
+    limits = {}
+    if not raw:
+        return limits
+    for entry in raw.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        keyword, sep, limit = entry.rpartition(":")
+        if not sep or not keyword.strip():
+            raise ValueError(f"Invalid keyword limit '{entry}'. Expected KEYWORD:LIMIT")
+        limits[keyword.strip()] = int(limit)
+    return limits
+
+
+class DirectiveWorkerPool:
+    """
+    Bounded worker pool for processing directive requests concurrently.
+
+    At most `max_in_flight` tasks are accepted at once (running or waiting); `submit` blocks the
+    caller once that limit is reached so unprocessed messages stay on the bus. Keywords listed in
+    `keyword_limits` are additionally capped to that many concurrently running tasks; excess tasks
+    for a capped keyword are parked without occupying a worker thread. A task that returns an
+    unfinished Future keeps its slots until that Future is done.
+    """
+
+    def __init__(self, max_workers: int, max_in_flight: int, keyword_limits: Optional[dict[str, int]] = None):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if max_in_flight < max_workers:
+            max_in_flight = max_workers
+
+        self.max_workers = max_workers
+        self.max_in_flight = max_in_flight
+        self.keyword_limits = dict(keyword_limits or {})
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="directive")
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+        self._lock = threading.Lock()
+        self._running: dict[str, int] = {}
+        self._parked: dict[str, deque] = {}
+        self._idle = threading.Condition(self._lock)
+        self._outstanding = 0
+
+    def submit(self, keyword: Optional[str], fn: Callable, *args, timeout: Optional[float] = None) -> bool:
+        """
+        Queues fn(*args) for execution. Returns False if no in-flight slot freed up within timeout.
+        """
+        if not self._in_flight.acquire(timeout=timeout):
+            return False
+
+        with self._lock:
+            self._outstanding += 1
+            limit = self.keyword_limits.get(keyword)
+            if limit is not None and self._running.get(keyword, 0) >= limit:
+                self._parked.setdefault(keyword, deque()).append((fn, args))
+                return True
+            self._running[keyword] = self._running.get(keyword, 0) + 1
+
+        self._executor.submit(self._run, keyword, fn, args)
+        return True
+
+    def _run(self, keyword: Optional[str], fn: Callable, args: tuple):
+        while fn is not None:
+            pending = None
+            try:
+                pending = fn(*args)
+            except Exception as e:
+                logging.exception(f"Unhandled error while processing {keyword} directive: {e}")
+
+            if isinstance(pending, Future) and not pending.done():
+                # The task continues elsewhere; keep its slots until it finishes
+                pending.add_done_callback(lambda done: self._resume(keyword))
+                return
+            # Hand the freed keyword slot straight to the next parked task on this thread
+            fn, args = self._release(keyword)
+
+    def _resume(self, keyword: Optional[str]):
+        fn, args = self._release(keyword)
+        if fn is not None:
+            self._executor.submit(self._run, keyword, fn, args)
+
+    def _release(self, keyword: Optional[str]) -> tuple:
+        """Frees a finished task's slots. Returns the next parked task for the keyword, if any."""
+        self._in_flight.release()
+        with self._lock:
+            self._outstanding -= 1
+            parked = self._parked.get(keyword)
+            if parked:
+                return parked.popleft()
+            self._running[keyword] -= 1
+            if self._outstanding == 0:
+                self._idle.notify_all()
+            return None, ()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return self._outstanding
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until every accepted task has finished"""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._outstanding == 0, timeout=timeout)
+
+    def shutdown(self, wait: bool = True):
+        if wait:
+            self.wait_idle()
+        self._executor.shutdown(wait=wait)
@@ -1,45 +1,43 @@
 import json
-import os
 import logging
+import os
+import threading
 
-import yaml
-from time import sleep
-from typing import Optional
-
-from maap.maap import MAAP, DPSJob
-
-from gmsec_service.common.job import JobState
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Union
 
+from maap.maap import DPSJob
 
-def authenticate_maap(max_retries=5, base_delay=1.0, backoff_factor=2.0):
-    # MAAP API uses token stored in MAAP_PGT env var
-    if not os.getenv("MAAP_PGT"):
-        raise EnvironmentError("Required environment variable 'MAAP_PGT' is not set.")
+from gmsec_service.common.job import JobBatchState, JobState, ProductJobState
+from gmsec_service.common.job_cache import get_job_status_cache
+from gmsec_service.common.maap_client import get_maap_client
+from gmsec_service.common.retry_scheduler import completed, get_retry_scheduler, then, when_all
+from gmsec_service.common.single_flight import SingleFlight
+from gmsec_service.handlers.idempotency import SUBMIT_JOB_DUPLICATES, get_submit_job_index
+from gmsec_service.handlers.ingest_rules import get_ingest_rule_engine
 
-    for attempt in range(1, max_retries + 1):
-        try:
-            maap = MAAP()
-            if maap.profile and maap.profile.account_info():
-                return maap
-            else:
-                raise RuntimeError("Unable to connect to MAAP with provided token.")
-        except Exception as e:
-            if attempt == max_retries:
-                raise RuntimeError(f"MAAP authentication failed after {max_retries} attempts.") from e
 
-            delay = base_delay * (backoff_factor ** (attempt - 1))
-            logging.info(f"[Retry {attempt}/{max_retries}] Authentication failed: {e}. Retrying in {delay:.1f}s...")
-            sleep(delay)
+# Concurrent lookups for the same job id share one MAAP call and retry sequence
+job_status_flight = SingleFlight()
+# Concurrent resends of the same SUBMIT-JOB share the first one's submission
+submit_job_flight = SingleFlight()
 
+submit_job_executor = None
+submit_job_executor_lock = threading.Lock()
 
-maap = None
 
-
-def get_maap():
-    global maap
-    if maap is None:
-        maap = authenticate_maap()
-    return maap
+def get_submit_job_executor() -> ThreadPoolExecutor:
+    """
+    Returns the shared executor for the products of multi-product SUBMIT-JOB directives. Its
+    SUBMIT_JOB_CONCURRENCY workers bound the MAAP submissions in flight across all directives.
+    """
+    global submit_job_executor
+    if submit_job_executor is None:
+        with submit_job_executor_lock:
+            if submit_job_executor is None:
+                workers = int(os.getenv("SUBMIT_JOB_CONCURRENCY", "4"))
+                submit_job_executor = ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="submit-job")
+    return submit_job_executor
 
 
 class GmsecRequestHandler:
@@ -62,39 +60,87 @@ class GmsecRequestHandler:
             logging.warning("Unable to extract job-id from directive string.")
         return job_id
 
-    def get_job_status(self, job_id: str) -> JobState:
+    def get_job_status(self, job_id: str, refresh: bool = False) -> JobState:
         """
-        Query MAAP API to get the job status with retry logic if the job status is 'deleted'
+        Get the job status, answering from the job status cache when possible.
+        `refresh` bypasses the cached value and replaces it with a fresh MAAP lookup.
         """
-        max_retries = 3
+        return self.get_job_status_async(job_id, refresh).result()
 
+    def get_job_status_async(self, job_id: str, refresh: bool = False) -> Future:
+        """
+        Non-blocking get_job_status(). Returns a Future for the JobState; retries of the MAAP
+        lookup run on the retry scheduler instead of the calling thread.
+        """
         if job_id == "N/A":
-            return JobState.from_maap_status("failed", "N/A")
+            return completed(JobState.from_maap_status("failed", "N/A"))
+
+        cache = get_job_status_cache()
+        if not refresh:
+            job_state = cache.get(job_id)
+            if job_state is not None:
+                logging.info(f"Using cached job status '{job_state.status_label}' for job {job_id}")
+                return completed(job_state)
+
+        def fetch_and_cache() -> Future:
+            future = self.fetch_job_status_async(job_id)
+            future.add_done_callback(lambda done: done.exception() is None and cache.put(done.result()))
+            return future
+
+        return job_status_flight.do_async(job_id, fetch_and_cache)
 
-        for attempt in range(max_retries + 1):
+    def fetch_job_status_async(self, job_id: str) -> Future:
+        """
+        Query MAAP API to get the job status with retry logic if the job status is 'deleted'.
+        Returns a Future for the JobState. The first lookup runs on the calling thread; retries
+        after an error or a 'deleted' status are scheduled 2**attempt seconds later on the retry
+        scheduler. If a retry cannot be scheduled or fails unexpectedly, the Future gets its error.
+        """
+        max_retries = 3
+        result = Future()
+
+        def retry_failed(retry: Future):
+            if retry.exception() is not None and not result.done():
+                result.set_exception(retry.exception())
+
+        def schedule_retry(attempt: int):
+            try:
+                retry = get_retry_scheduler().call_later(2**attempt, attempt_lookup, attempt + 1)
+            except Exception as e:
+                result.set_exception(e)
+                return
+            retry.add_done_callback(retry_failed)
+
+        def attempt_lookup(attempt: int):
             try:
-                maap_job_status = get_maap().getJobStatus(job_id)
+                maap_job_status = get_maap_client().get_job_status(job_id)
+                deleted = not maap_job_status or maap_job_status.lower() == "deleted"
             except Exception as e:
                 logging.error(f"Attempt {attempt + 1}: Failed to get job status for {job_id}: {e}", exc_info=True)
                 if attempt < max_retries:
-                    sleep(2**attempt)
-                    continue
+                    schedule_retry(attempt)
                 else:
-                    return JobState.from_maap_status("failed", "N/A")
+                    result.set_result(JobState.from_maap_status("failed", "N/A"))
+                return
 
-            if maap_job_status and maap_job_status.lower() != "deleted":
-                break
+            if not deleted:
+                logging.info(f"Obtained job status '{maap_job_status}' for job {job_id}")
+                result.set_result(JobState.from_maap_status(maap_job_status, job_id))
+                return
 
-            logging.warning(f"Attempt {attempt + 1}: Job {job_id} returned 'deleted'. Retrying after {2**attempt}s...")
-            sleep(2**attempt)
-
-        else:
-            # Still 'deleted' after all retries
-            logging.error(f"Job {job_id} remained in 'deleted' state after {max_retries + 1} attempts.")
-            return JobState.from_maap_status("failed", "N/A")
+            if attempt < max_retries:
+                logging.warning(f"Attempt {attempt + 1}: Job {job_id} returned 'deleted'. Retrying after {2**attempt}s...")
+                schedule_retry(attempt)
+            else:
+                # Still 'deleted' after all retries
+                logging.error(f"Job {job_id} remained in 'deleted' state after {max_retries + 1} attempts.")
+                result.set_result(JobState.from_maap_status("failed", "N/A"))
 
-        logging.info(f"Obtained job status '{maap_job_status}' for job {job_id}")
-        return JobState.from_maap_status(maap_job_status, job_id)
+        try:
+            attempt_lookup(0)
+        except Exception as e:
+            result.set_exception(e)
+        return result
 
     def get_ingest_concept_id(self) -> str:
         concept_id = self.directive_string_data.get("concept_id")
@@ -102,13 +148,19 @@ class GmsecRequestHandler:
             raise ValueError("Unable to extract 'concept_id' from DIRECTIVE-STRING.")
         return concept_id
 
-    def get_ingest_product_path(self) -> str:
-        product_path = self.directive_string_data.get("products")
-        if not product_path:
+    def get_ingest_product_paths(self) -> list[str]:
+        product_paths = self.directive_string_data.get("products")
+        if not product_paths:
             raise ValueError("Unable to extract 'products' from DIRECTIVE-STRING.")
-        if len(product_path) > 1:
-            raise ValueError(f"Expected 1 product path exctracted from DIRECTIVE-STRING, found {len(product_path)}")
-        return product_path[0]
+        if isinstance(product_paths, str):
+            product_paths = [product_paths]
+        return product_paths
+
+    def get_ingest_product_path(self) -> str:
+        product_paths = self.get_ingest_product_paths()
+        if len(product_paths) > 1:
+            raise ValueError(f"Expected 1 product path exctracted from DIRECTIVE-STRING, found {len(product_paths)}")
+        return product_paths[0]
 
     def get_ingest_product_type(self) -> str:
         product_format = self.directive_string_data.get("format")
@@ -121,48 +173,141 @@ class GmsecRequestHandler:
         return product_variables
 
     def set_ingest_args(
-        self, concept_id: str, product_path: str, ingest_variables: Optional[list[str]]
+        self,
+        concept_id: str,
+        product_path: str,
+        ingest_variables: Optional[list[str]],
+        product_format: Optional[str] = None,
     ) -> dict[str, str]:
-        with open("gmsec_service/handlers/ingest_config.yaml") as f:
-            config = yaml.safe_load(f)
-
-        default_args = {**config["defaults"], "input_s3": product_path, "concept_id": concept_id}
-
-        if "LIS" in product_path:
-            if ingest_variables:
-                ingest_variables = ["SoilMoist_tavg_0" if v == "SoilMoist_tavg" else v for v in ingest_variables]
-            job_args = {**default_args, **config["variants"]["lis"]}
-        elif "gpkg" in product_path:
-            job_args = {**default_args, **config["variants"]["gpkg"]}
-        else:
-            job_args = {**default_args, **config["variants"]["base"]}
-
-        if ingest_variables:
-            job_args["variables"] = ",".join(ingest_variables)
+        return get_ingest_rule_engine().build_job_args(concept_id, product_path, product_format, ingest_variables)
 
-        return job_args
-
-    def trigger_ingest(self) -> JobState:
+    def trigger_ingest(self) -> Union[JobState, JobBatchState]:
         """
         Hit MAAP API to submit ingest job
-        Returns a JobState instance containing job id and status
+        Returns a JobState instance containing job id and status, or a JobBatchState with one job
+        per product when the directive lists more than one product
+        """
+        return self.trigger_ingest_async().result()
+
+    def trigger_ingest_async(self) -> Future:
+        """
+        Non-blocking trigger_ingest(). Returns a Future for the JobState or JobBatchState; invalid
+        directives raise ValueError at once.
         """
         concept_id = self.get_ingest_concept_id()
-        product_path = self.get_ingest_product_path()
+        product_paths = self.get_ingest_product_paths()
         product_type = self.get_ingest_product_type()
         ingest_variables = self.get_ingest_variables()
 
-        if None in [concept_id, product_path, product_type]:
+        if None in [concept_id, product_type, *product_paths]:
             raise ValueError("Missing required argument for ingest")
 
-        job_args = self.set_ingest_args(concept_id, product_path, ingest_variables)
+        if len(product_paths) == 1:
+            return self.submit_product_async(concept_id, product_paths[0], ingest_variables, product_type)
+
+        return self.trigger_ingest_batch_async(concept_id, product_paths, ingest_variables, product_type)
+
+    def trigger_ingest_batch_async(
+        self,
+        concept_id: str,
+        product_paths: list[str],
+        ingest_variables: Optional[list[str]],
+        product_type: str,
+    ) -> Future:
+        """
+        Submits one ingest job per product in parallel on the shared submit executor. A product
+        that can't be submitted is reported as FAILED with its error and doesn't affect the others.
+        """
+        logging.info(f"Submitting {len(product_paths)} ingest jobs for {concept_id}")
+        executor = get_submit_job_executor()
+        futures = [
+            # Duplicate products finish on the retry scheduler, so chain their Futures
+            then(
+                executor.submit(self.submit_product_async, concept_id, product_path, ingest_variables, product_type),
+                lambda pending: pending,
+            )
+            for product_path in product_paths
+        ]
+
+        def batch_state(done: list[Future]) -> JobBatchState:
+            products = []
+            for product_path, future in zip(product_paths, done):
+                if future.exception() is not None:
+                    logging.error(f"Unable to submit ingest job for {product_path}: {future.exception()}")
+                    products.append(
+                        ProductJobState(product_path, JobState.from_maap_status("failed", "N/A"), str(future.exception()))
+                    )
+                    continue
+                job_state = future.result()
+                error = "MAAP job submission failed" if job_state.job_id == "N/A" else None
+                products.append(ProductJobState(product_path, job_state, error))
+            return JobBatchState(products)
+
+        return then(when_all(futures), batch_state)
+
+    def submit_product_async(
+        self,
+        concept_id: str,
+        product_path: str,
+        ingest_variables: Optional[list[str]],
+        product_type: str,
+    ) -> Future:
+        """
+        Submits the ingest job for one product, answering from the SUBMIT-JOB dedupe index when
+        the same product was already submitted with the same directive arguments. The status of
+        an already submitted job is looked up without blocking; if that job FAILED, the product
+        is submitted again.
+        """
+        index = get_submit_job_index()
+        if index is None:
+            return completed(self.submit_ingest_job(concept_id, product_path, ingest_variables, product_type))
+
+        # Keyed per product, so resending a multi-product directive only submits the missing products
+        dedupe_key = index.dedupe_key({**self.directive_string_data, "products": [product_path]})
+
+        def submit_new() -> Future:
+            job_state = self.submit_ingest_job(concept_id, product_path, ingest_variables, product_type)
+            if job_state.job_id != "N/A":
+                index.record(dedupe_key, job_state.job_id)
+            return completed(job_state)
+
+        def submit_once() -> Future:
+            job_id = index.lookup(dedupe_key)
+            if job_id is None:
+                return submit_new()
+
+            def answer(job_state: JobState):
+                if job_state.job_id != job_id or job_state.status_label != "FAILED":
+                    return job_state
+                # A failed job is no answer to a resent directive; submit the product again
+                logging.info(f"Indexed job {job_id} for {concept_id} {product_path} FAILED; resubmitting")
+                index.forget(dedupe_key, job_id)
+                return get_retry_scheduler().call_later(0, submit_new)
+
+            SUBMIT_JOB_DUPLICATES.inc()
+            logging.info(f"Duplicate SUBMIT-JOB for {concept_id} {product_path}; answering with job {job_id}")
+            return then(self.get_job_status_async(job_id), answer)
+
+        return submit_job_flight.do_async(dedupe_key, submit_once)
+
+    def submit_ingest_job(
+        self,
+        concept_id: str,
+        product_path: str,
+        ingest_variables: Optional[list[str]],
+        product_type: str,
+    ) -> JobState:
+        job_args = self.set_ingest_args(concept_id, product_path, ingest_variables, product_type)
 
         try:
-            job: DPSJob = get_maap().submitJob(**job_args)
+            job: DPSJob = get_maap_client().submit_job(job_args)
         except Exception as e:
             logging.error(f"Unable to submit job {e}")
             return JobState.from_maap_status("failed", "N/A")
 
         if job.status == "success":
-            return JobState.from_maap_status("accepted", job.id)
-        return JobState.from_maap_status(job.status, job.id)
+            job_state = JobState.from_maap_status("accepted", job.id)
+        else:
+            job_state = JobState.from_maap_status(job.status, job.id)
+        get_job_status_cache().put(job_state)
+        return job_state
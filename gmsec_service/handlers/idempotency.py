@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional
+
+from gmsec_service.common.metrics import REGISTRY
+
+SUBMIT_JOB_DUPLICATES = REGISTRY.counter(
+    "iss_submit_job_duplicates_total", "SUBMIT-JOB directives answered with an already submitted job"
+)
+
+
+class SubmitJobIndex:
+    """
+    Persistent index of SUBMIT-JOB directives that have already launched a MAAP job, so a
+    directive CMSS resends is answered with the existing job instead of launching another.
+
+    Entries are keyed on a hash of the normalized directive payload and kept in a SQLite database
+    that survives restarts. An entry only matches within `window` seconds of its submission, and
+    the index holds at most `max_entries`, evicting the oldest first.
+
+    Attributes:
+        path (str): Path to the SQLite database file.
+        window (float): Seconds a submission is treated as a duplicate target.
+        max_entries (int): Maximum number of indexed submissions.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        window: float = 86400.0,
+        max_entries: int = 10000,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path
+        self.window = window
+        self.max_entries = max_entries
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS submit_jobs (
+                dedupe_key TEXT PRIMARY KEY,
+                job_id TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS submit_jobs_created_at ON submit_jobs (created_at)")
+        # Kept up to date by every change, so recording a submission doesn't count the table
+        self._count = self._db.execute("SELECT COUNT(*) FROM submit_jobs").fetchone()[0]
+        with self._lock:
+            self._evict()
+
+    @classmethod
+    def from_env(cls) -> Optional["SubmitJobIndex"]:
+        path = os.getenv("SUBMIT_JOB_INDEX_PATH", "")
+        if not path:
+            return None
+        return cls(
+            path,
+            window=float(os.getenv("SUBMIT_JOB_INDEX_WINDOW", "86400")),
+            max_entries=int(os.getenv("SUBMIT_JOB_INDEX_SIZE", "10000")),
+        )
+
+    @staticmethod
+    def dedupe_key(directive_data: dict) -> str:
+        """Hash of the directive payload, independent of key order and surrounding whitespace"""
+
+        def normalize(value):
+            if isinstance(value, dict):
+                return {key.strip(): normalize(item) for key, item in value.items()}
+            if isinstance(value, list):
+                return [normalize(item) for item in value]
+            if isinstance(value, str):
+                return value.strip()
+            return value
+
+        normalized = json.dumps(normalize(directive_data), sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(normalized.encode()).hexdigest()
+
+    def lookup(self, dedupe_key: str) -> Optional[str]:
+        """Returns the job id submitted for this key within the window, if any"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT job_id FROM submit_jobs WHERE dedupe_key = ? AND created_at >= ?",
+                (dedupe_key, self.clock() - self.window),
+            ).fetchone()
+        return row[0] if row else None
+
+    def record(self, dedupe_key: str, job_id: str):
+        with self._lock:
+            exists = self._db.execute("SELECT 1 FROM submit_jobs WHERE dedupe_key = ?", (dedupe_key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO submit_jobs (dedupe_key, job_id, created_at) VALUES (?, ?, ?)",
+                (dedupe_key, job_id, self.clock()),
+            )
+            if not exists:
+                self._count += 1
+            self._evict()
+
+    def forget(self, dedupe_key: str, job_id: str):
+        """Drops the entry for this key, unless it has since been recorded for another job"""
+        with self._lock:
+            cursor = self._db.execute(
+                "DELETE FROM submit_jobs WHERE dedupe_key = ? AND job_id = ?", (dedupe_key, job_id)
+            )
+            self._count -= cursor.rowcount
+
+    def _evict(self):
+        cursor = self._db.execute("DELETE FROM submit_jobs WHERE created_at < ?", (self.clock() - self.window,))
+        self._count -= cursor.rowcount
+        excess = self._count - self.max_entries
+        if excess > 0:
+            cursor = self._db.execute(
+                "DELETE FROM submit_jobs WHERE dedupe_key IN "
+                "(SELECT dedupe_key FROM submit_jobs ORDER BY created_at LIMIT ?)",
+                (excess,),
+            )
+            self._count -= cursor.rowcount
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._count
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+submit_job_index = None
+# Set once SUBMIT_JOB_INDEX_PATH was found unset, so later calls skip the lock and the env
+submit_job_index_disabled = False
+submit_job_index_lock = threading.Lock()
+
+
+def get_submit_job_index() -> Optional[SubmitJobIndex]:
+    """Returns the shared index, or None when SUBMIT_JOB_INDEX_PATH is not set"""
+    global submit_job_index, submit_job_index_disabled
+    if submit_job_index is None and not submit_job_index_disabled:
+        with submit_job_index_lock:
+            if submit_job_index is None and not submit_job_index_disabled:
+                submit_job_index = SubmitJobIndex.from_env()
+                submit_job_index_disabled = submit_job_index is None
+    return submit_job_index
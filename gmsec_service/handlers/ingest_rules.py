@@ -0,0 +1,190 @@
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import yaml
+
+
+# Rules applied when ingest_config.yaml has no `rules` section; matches the original routing
+LEGACY_RULES = [
+    {"variant": "lis", "match": {"contains": "LIS"}, "rewrite_variables": {"SoilMoist_tavg": "SoilMoist_tavg_0"}},
+    {"variant": "gpkg", "match": {"contains": "gpkg"}},
+    {"variant": "base"},
+]
+
+MATCH_KEYS = ("prefix", "suffix", "contains", "regex", "format", "concept_id")
+
+
+def _as_list(value) -> list[str]:
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(v) for v in value]
+    return [str(value)]
+
+
+@dataclass
+class IngestRule:
+    """
+    A compiled ingest rule. A rule matches when every configured condition matches; each condition
+    may list several alternatives, any of which is sufficient.
+    """
+
+    variant: str
+    defaults: dict
+    variant_args: dict
+    prefixes: tuple = ()
+    suffixes: tuple = ()
+    contains: tuple = ()
+    patterns: tuple = ()
+    formats: frozenset = frozenset()
+    concept_ids: frozenset = frozenset()
+    rewrite_variables: dict = field(default_factory=dict)
+
+    def matches(self, concept_id: str, product_path: str, product_format: Optional[str]) -> bool:
+        if self.prefixes and not product_path.startswith(self.prefixes):
+            return False
+        if self.suffixes and not product_path.endswith(self.suffixes):
+            return False
+        if self.contains and not any(s in product_path for s in self.contains):
+            return False
+        if self.patterns and not any(p.search(product_path) for p in self.patterns):
+            return False
+        if self.formats and (product_format or "").lower() not in self.formats:
+            return False
+        if self.concept_ids and concept_id not in self.concept_ids:
+            return False
+        return True
+
+
+def compile_rules(config: dict) -> list[IngestRule]:
+    """
+    Compiles a parsed ingest config into an ordered list of rules
+    """
+    defaults = config.get("defaults") or {}
+    variants = config.get("variants") or {}
+
+    rules = []
+    for i, raw_rule in enumerate(config.get("rules") or LEGACY_RULES):
+        variant = raw_rule.get("variant")
+        if variant not in variants:
+            raise ValueError(f"Ingest rule {i} references unknown variant '{variant}'")
+
+        match = raw_rule.get("match") or {}
+        unknown = set(match) - set(MATCH_KEYS)
+        if unknown:
+            raise ValueError(f"Ingest rule {i} has unknown match keys: {', '.join(sorted(unknown))}")
+
+        rules.append(
+            IngestRule(
+                variant=variant,
+                defaults=dict(defaults),
+                variant_args=dict(variants[variant]),
+                prefixes=tuple(_as_list(match.get("prefix"))),
+                suffixes=tuple(_as_list(match.get("suffix"))),
+                contains=tuple(_as_list(match.get("contains"))),
+                patterns=tuple(re.compile(p) for p in _as_list(match.get("regex"))),
+                formats=frozenset(f.lower() for f in _as_list(match.get("format"))),
+                concept_ids=frozenset(_as_list(match.get("concept_id"))),
+                rewrite_variables=dict(raw_rule.get("rewrite_variables") or {}),
+            )
+        )
+    return rules
+
+
+class IngestRuleEngine:
+    """
+    Routes SUBMIT-JOB products to DPS job arguments using the rules in ingest_config.yaml.
+
+    The config is parsed and compiled once. The file's mtime is checked at most every
+    `check_interval` seconds and the rules are recompiled only when it changes; a config that fails
+    to load is logged and the previous rules stay in effect.
+    """
+
+    def __init__(
+        self,
+        config_path: str,
+        check_interval: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.config_path = config_path
+        self.check_interval = check_interval
+        self.clock = clock
+
+        self.rules: list[IngestRule] = []
+        self._mtime: Optional[float] = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+        self.load()
+
+    @classmethod
+    def from_env(cls) -> "IngestRuleEngine":
+        return cls(
+            os.getenv("INGEST_CONFIG_PATH", "gmsec_service/handlers/ingest_config.yaml"),
+            check_interval=float(os.getenv("INGEST_CONFIG_CHECK_INTERVAL", "5")),
+        )
+
+    def load(self):
+        mtime = os.stat(self.config_path).st_mtime
+        with open(self.config_path) as f:
+            config = yaml.safe_load(f)
+        rules = compile_rules(config)
+
+        with self._lock:
+            self.rules = rules
+            self._mtime = mtime
+            self._last_check = self.clock()
+        logging.info(f"Loaded {len(rules)} ingest rules from {self.config_path}")
+
+    def maybe_reload(self):
+        now = self.clock()
+        if now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+
+        try:
+            if os.stat(self.config_path).st_mtime != self._mtime:
+                self.load()
+        except Exception as e:
+            logging.error(f"Unable to reload ingest config {self.config_path}, keeping previous rules: {e}")
+
+    def match(self, concept_id: str, product_path: str, product_format: Optional[str] = None) -> IngestRule:
+        self.maybe_reload()
+        for rule in self.rules:
+            if rule.matches(concept_id, product_path, product_format):
+                return rule
+        raise ValueError(f"No ingest rule matches product '{product_path}'")
+
+    def build_job_args(
+        self,
+        concept_id: str,
+        product_path: str,
+        product_format: Optional[str] = None,
+        ingest_variables: Optional[list[str]] = None,
+    ) -> dict[str, str]:
+        rule = self.match(concept_id, product_path, product_format)
+
+        job_args = {**rule.defaults, "input_s3": product_path, "concept_id": concept_id, **rule.variant_args}
+
+        if ingest_variables:
+            job_args["variables"] = ",".join(rule.rewrite_variables.get(v, v) for v in ingest_variables)
+
+        return job_args
+
+
+ingest_rule_engine = None
+ingest_rule_engine_lock = threading.Lock()
+
+
+def get_ingest_rule_engine() -> IngestRuleEngine:
+    global ingest_rule_engine
+    if ingest_rule_engine is None:
+        with ingest_rule_engine_lock:
+            if ingest_rule_engine is None:
+                ingest_rule_engine = IngestRuleEngine.from_env()
+    return ingest_rule_engine
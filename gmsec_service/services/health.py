@@ -0,0 +1,123 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class ServiceStatus:
+    def __init__(self, url, session: Optional[requests.Session] = None, timeout: float = 15):
+        self.url = url
+        self.session = session
+        self.timeout = timeout
+        self.status = None
+
+    def check_status(self):
+        try:
+            response = (self.session or requests).get(self.url, timeout=self.timeout)
+            response.raise_for_status()
+            self.status = True
+        except requests.exceptions.RequestException:
+            self.status = False
+        return self.status
+
+
+@dataclass
+class ProbeResult:
+    """
+    Last known result of a component health probe. `checked_at` is a time.monotonic() timestamp.
+    """
+
+    status: Optional[bool] = None
+    checked_at: Optional[float] = None
+    latency: Optional[float] = None
+
+    def age(self, now: Optional[float] = None) -> Optional[float]:
+        if self.checked_at is None:
+            return None
+        return (now if now is not None else time.monotonic()) - self.checked_at
+
+
+class HealthProbeEngine:
+    """
+    Probes ISS component health endpoints concurrently on a background schedule.
+
+    Every `interval` seconds all probes run in parallel over a shared pooled session, each within a
+    `timeout` second budget. Readers only see the cached results; a result older than `max_age`
+    counts as unavailable.
+
+    Attributes:
+        probes (dict[str, ServiceStatus]): Probe per component name.
+        results (dict[str, ProbeResult]): Last known result per component name.
+    """
+
+    def __init__(self, urls: dict[str, str], interval: float = 30, timeout: float = 5, max_age: Optional[float] = None):
+        self.interval = interval
+        self.timeout = timeout
+        self.max_age = max_age if max_age is not None else 3 * interval
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max(len(urls), 1), pool_maxsize=max(len(urls), 1))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.probes = {name: ServiceStatus(url, self.session, timeout) for name, url in urls.items()}
+        self.results = {name: ProbeResult() for name in urls}
+
+        self._executor = ThreadPoolExecutor(max_workers=max(len(urls), 1), thread_name_prefix="health-probe")
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Runs a first round of probes, then keeps probing in the background"""
+        self.run_once()
+        self._thread = threading.Thread(target=self._run, name="health-probes", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(self.timeout + 1)
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+    def run_once(self):
+        started = {name: time.monotonic() for name in self.probes}
+        futures = {name: self._executor.submit(probe.check_status) for name, probe in self.probes.items()}
+        deadline = time.monotonic() + self.timeout
+
+        for name, future in futures.items():
+            try:
+                status = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeoutError:
+                logging.warning(f"Health probe for {name} exceeded its {self.timeout}s budget")
+                status = False
+            except Exception as e:
+                logging.error(f"Health probe for {name} failed: {e}")
+                status = False
+
+            now = time.monotonic()
+            with self._lock:
+                self.results[name] = ProbeResult(status=status, checked_at=now, latency=now - started[name])
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.run_once()
+
+    def snapshot(self) -> dict[str, ProbeResult]:
+        with self._lock:
+            return dict(self.results)
+
+    def is_healthy(self) -> bool:
+        """Aggregate status from cached results; never blocks on the network"""
+        now = time.monotonic()
+        for name, result in self.snapshot().items():
+            age = result.age(now)
+            if not result.status or age is None or age > self.max_age:
+                return False
+        return True
@@ -1,24 +1,16 @@
 from datetime import datetime
 import logging
-import time
-import requests
+from typing import Optional
 import libgmsec_python3 as lp
 from gmsec_service.common.connection import GmsecConnection
+from gmsec_service.common.fixed_rate import FixedRateScheduler
+from gmsec_service.common.metrics import REGISTRY, start_metrics_server
+from gmsec_service.services.health import HealthProbeEngine
 
-
-class ServiceStatus:
-    def __init__(self, url):
-        self.url = url
-        self.status = None
-
-    def check_status(self):
-        try:
-            response = requests.get(self.url, timeout=15)
-            response.raise_for_status()
-            self.status = True
-        except requests.exceptions.RequestException:
-            self.status = False
-        return self.status
+HEARTBEAT_LATENESS_SECONDS = REGISTRY.histogram(
+    "iss_heartbeat_lateness_seconds", "Delay between a heartbeat's scheduled and actual publish time"
+)
+HEARTBEATS_SKIPPED = REGISTRY.gauge("iss_heartbeats_skipped", "Heartbeat ticks dropped after overruns")
 
 
 class GmsecHeartbeat:
@@ -26,6 +18,8 @@ class GmsecHeartbeat:
     Class for emitting ISS heartbeat
     """
 
+    COUNTER_MAX = 65535
+
     def __init__(self, env: str = "PROD"):
         if env == "PROD":
             config = "config/config-prod.xml"
@@ -33,10 +27,56 @@ class GmsecHeartbeat:
             config = "config/config-dev.xml"
 
         self.gmsec = GmsecConnection(config)
+        self.gmsec.add_reconnect_listener(
+            lambda reason: lp.log_info(f"Heartbeat publishing resumed after GMSEC connection loss: {reason}")
+        )
 
         self.publish_rate = int(self.gmsec.config.get_value("heartbeat-pub-rate"))
 
+        with self.gmsec.startup_phase("health_probes"):
+            self.health_probes = self.build_health_probes()
+
+        # Publish on fixed deadlines so the real period matches the advertised PUB-RATE
+        self.scheduler = FixedRateScheduler(
+            self.publish_rate, policy=self.gmsec.config.get_value("heartbeat-missed-policy", "skip")
+        )
+        lp.log_info(f"Heartbeat startup took {self.gmsec.startup_summary()}")
+
+    def build_prototype(self, factory: lp.MessageFactory) -> lp.Message:
+        prototype: lp.Message = factory.create_message("HB")
+        prototype.add_field(lp.U16Field("PUB-RATE", self.publish_rate))
+        return prototype
+
+    def build_health_probes(self) -> Optional[HealthProbeEngine]:
+        """
+        Builds the component health probes when heartbeat-probes-enabled is set. Components
+        without a configured URL are not probed.
+        """
+        config = self.gmsec.config
+        if config.get_value("heartbeat-probes-enabled", "false").lower() != "true":
+            return None
+
+        urls = {}
+        for component in ("sdap", "hysds", "titiler"):
+            url = config.get_value(f"{component}-hb-url", "")
+            if url:
+                urls[component] = url
+        if not urls:
+            return None
+
+        return HealthProbeEngine(
+            urls,
+            interval=float(config.get_value("heartbeat-probe-interval", str(self.publish_rate))),
+            timeout=float(config.get_value("heartbeat-probe-timeout", "5")),
+        )
+
     def run(self):
+        HEARTBEATS_SKIPPED.set_function(lambda: self.scheduler.skipped)
+        metrics_port = int(self.gmsec.config.get_value("metrics-port", "0"))
+        if metrics_port:
+            start_metrics_server(metrics_port)
+            lp.log_info(f"Serving metrics on port {metrics_port}")
+
         try:
             hbgen = lp.HeartbeatGenerator(
                 self.gmsec.config,
@@ -46,28 +86,15 @@ class GmsecHeartbeat:
 
             hbgen.start()
 
-            msg: lp.Message = self.gmsec.msg_factory.create_message("HB")
+            if self.health_probes:
+                self.health_probes.start()
+
             counter = 1
 
-            while True:
-                try:
-                    # Get status of SDAP
-                    # sdap_status_check = ServiceStatus(self.config.get_value("sdap-hb-url"))
-                    # sdap_status = sdap_status_check.check_status()
-                    sdap_status = True
-
-                    # Get status of HySDS
-                    # hysds_status_check = ServiceStatus(self.config.get_value("hysds-hb-url"))
-                    # hysds_status = hysds_status_check.check_status()
-                    hysds_status = True
-
-                    # Get status of titiler
-                    # titiler_status_check = ServiceStatus(self.config.get_value("titiler-hb-url"))
-                    # titiler_status = titiler_status_check.check_status()
-                    titiler_status = True
-
-                    # Get overall INFO status
-                    iass_status = all([sdap_status, hysds_status, titiler_status])
+            try:
+                for lateness in self.scheduler:
+                    # Get overall INFO status from the last SDAP, HySDS and titiler probe results
+                    iass_status = self.health_probes.is_healthy() if self.health_probes else True
                     dt_string = datetime.now().isoformat(timespec="seconds")
                     if iass_status:
                         status_msg = f"ISS - System running at {dt_string}"
@@ -76,30 +103,49 @@ class GmsecHeartbeat:
                         status_msg = f"ISS - System unavailable at {dt_string}"
                         status = False
 
+                    msg: lp.Message = self.gmsec.templates.create("HB", self.build_prototype)
                     if status:
                         msg.add_field(lp.I16Field("COMPONENT-STATUS", 1))
                     else:
                         msg.add_field(lp.I16Field("COMPONENT-STATUS", 2))
 
                     msg.add_field(lp.U16Field("COUNTER", counter))
-                    msg.add_field(lp.U16Field("PUB-RATE", self.publish_rate))
+
+                    if self.gmsec.state == GmsecConnection.FAILED:
+                        lp.log_error("Unable to reconnect to GMSEC. Stopping heartbeat.")
+                        break
+                    if not self.gmsec.connected:
+                        # The connection supervisor is reconnecting; resume on a later tick
+                        lp.log_warning(f"Skipping heartbeat {counter}: GMSEC connection is down")
+                        continue
 
                     # Publish the message
-                    self.gmsec.conn.publish(msg)
+                    try:
+                        self.gmsec.publish(msg, "heartbeat")
+                    except Exception as e:
+                        lp.log_error(f"Failed to publish heartbeat {counter}: {e}")
+                        continue
+                    HEARTBEAT_LATENESS_SECONDS.observe(lateness)
+
+                    self.gmsec.audit.record("sent", msg)
 
-                    # Output in XML what we have published
-                    lp.log_info("Publishing Message:\n" + msg.to_xml())
+                    if lateness > self.publish_rate / 2:
+                        lp.log_warning(f"Heartbeat {counter} published {lateness:.2f}s late")
 
-                    time.sleep(self.publish_rate)
-                    counter += 1
+                    # COUNTER is a U16 field; wrap around instead of overflowing
+                    counter = counter % self.COUNTER_MAX + 1
 
-                except KeyboardInterrupt:
-                    print("\nCtrl+C was pressed. Exiting...")
-                    break
+            except KeyboardInterrupt:
+                print("\nCtrl+C was pressed. Exiting...")
 
         except lp.GmsecError as e:
             lp.log_error("Exception: " + str(e))
 
+        lp.log_info(f"Heartbeat schedule stats: {self.scheduler.stats()}")
+
+        if self.health_probes:
+            self.health_probes.stop()
+
         # Tear down GMSEC
         self.gmsec.teardown()
 
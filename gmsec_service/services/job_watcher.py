@@ -0,0 +1,192 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from gmsec_service.common.job import JobState
+from gmsec_service.common.metrics import REGISTRY
+
+logger = logging.getLogger("job_watcher")
+
+JOB_WATCH_NOTIFY_MODES = ("none", "response", "log")
+
+WATCHED_JOBS = REGISTRY.gauge("iss_watched_jobs", "MAAP jobs followed by the job watcher")
+JOB_WATCH_POLLS = REGISTRY.counter("iss_job_watch_polls_total", "Job watcher MAAP lookups", ("result",))
+JOB_TRANSITIONS = REGISTRY.counter(
+    "iss_job_transitions_total", "Job state transitions reported by the job watcher", ("status",)
+)
+
+
+@dataclass
+class WatchedJob:
+    job_state: JobState
+    context: dict
+    watched_at: float
+    next_poll: float
+    interval: float
+    polls: int = 0
+
+
+class JobWatcher:
+    """
+    Background thread that follows the MAAP jobs the listener submitted and reports each state
+    transition as it happens, so CMSS doesn't have to poll to find out.
+
+    Every cycle looks up at most `batch_size` jobs that are due, all at once through `lookup`,
+    which returns a Future for a fresh JobState. A job is first polled `min_interval` seconds
+    after it is watched. The interval doubles after each poll that shows no change, up to
+    `max_interval`, so long-running jobs cost fewer MAAP queries. A transition resets it.
+    `on_transition(previous, current, context)` is called for every change. Jobs are dropped once
+    they reach a terminal state, or after `max_age` seconds.
+    """
+
+    def __init__(
+        self,
+        lookup: Callable[[str], Future],
+        on_transition: Callable[[JobState, JobState, dict], None],
+        min_interval: float = 10.0,
+        max_interval: float = 300.0,
+        batch_size: int = 20,
+        max_jobs: int = 10000,
+        max_age: float = 172800.0,
+        lookup_timeout: float = 120.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.lookup = lookup
+        self.on_transition = on_transition
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.batch_size = batch_size
+        self.max_jobs = max_jobs
+        self.max_age = max_age
+        self.lookup_timeout = lookup_timeout
+        self.clock = clock
+
+        self._jobs: dict[str, WatchedJob] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        WATCHED_JOBS.set_function(self.watched)
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="job-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def watch(self, job_state: JobState, context: Optional[dict] = None) -> bool:
+        """
+        Starts following a job. Returns False for jobs that can't change any more, jobs that were
+        never submitted, or when `max_jobs` are already watched.
+        """
+        if job_state.job_id == "N/A" or job_state.is_terminal:
+            return False
+        now = self.clock()
+        with self._lock:
+            if job_state.job_id not in self._jobs and len(self._jobs) >= self.max_jobs:
+                logger.warning(f"Not watching job {job_state.job_id}: already watching {self.max_jobs} jobs")
+                return False
+            self._jobs[job_state.job_id] = WatchedJob(
+                job_state, dict(context or {}), now, now + self.min_interval, self.min_interval
+            )
+        self._wake.set()
+        return True
+
+    def observe(self, job_state: JobState):
+        """
+        Records a state the listener has already reported, e.g. in a JOB-STATUS reply, so the
+        watcher doesn't announce it again
+        """
+        with self._lock:
+            watched = self._jobs.get(job_state.job_id)
+            if watched is None:
+                return
+            if job_state.is_terminal:
+                del self._jobs[job_state.job_id]
+            elif job_state.status_label != watched.job_state.status_label:
+                watched.job_state = job_state
+
+    def watched(self) -> int:
+        with self._lock:
+            return len(self._jobs)
+
+    def due(self) -> list[WatchedJob]:
+        """Up to `batch_size` watched jobs whose poll is due, most overdue first"""
+        now = self.clock()
+        with self._lock:
+            due = [watched for watched in self._jobs.values() if watched.next_poll <= now]
+        due.sort(key=lambda watched: watched.next_poll)
+        return due[: self.batch_size]
+
+    def poll_due(self) -> int:
+        """Polls one batch of due jobs. Returns the number of jobs polled."""
+        batch = self.due()
+        lookups = [(watched, self.lookup(watched.job_state.job_id)) for watched in batch]
+        for watched, lookup in lookups:
+            try:
+                current = lookup.result(timeout=self.lookup_timeout)
+            except Exception as e:
+                logger.error(f"Unable to poll job {watched.job_state.job_id}: {e}")
+                current = None
+            self._record_poll(watched, current)
+        return len(batch)
+
+    def _record_poll(self, watched: WatchedJob, current: Optional[JobState]):
+        previous = watched.job_state
+        now = self.clock()
+        # Lookups that gave up report job id N/A; keep the job and try again later
+        lookup_ok = current is not None and current.job_id == previous.job_id
+        changed = lookup_ok and current.status_label != previous.status_label
+        JOB_WATCH_POLLS.labels(result="ok" if lookup_ok else "failed").inc()
+
+        with self._lock:
+            if self._jobs.get(previous.job_id) is not watched:
+                return
+            watched.polls += 1
+            if changed:
+                watched.job_state = current
+                watched.interval = self.min_interval
+            else:
+                watched.interval = min(watched.interval * 2, self.max_interval)
+            watched.next_poll = now + watched.interval
+
+            expired = now - watched.watched_at >= self.max_age
+            if (changed and current.is_terminal) or expired:
+                del self._jobs[previous.job_id]
+                if expired and not changed:
+                    logger.warning(f"Stopped watching job {previous.job_id} after {self.max_age:.0f}s")
+
+        if changed:
+            JOB_TRANSITIONS.labels(status=current.status_label).inc()
+            try:
+                self.on_transition(previous, current, watched.context)
+            except Exception as e:
+                logger.error(f"Unable to report job {current.job_id} transition to {current.status_label}: {e}")
+
+    def next_due_in(self) -> Optional[float]:
+        """Seconds until the next poll is due, or None when no jobs are watched"""
+        with self._lock:
+            if not self._jobs:
+                return None
+            next_poll = min(watched.next_poll for watched in self._jobs.values())
+        return max(0.0, next_poll - self.clock())
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if self.poll_due():
+                    continue
+            except Exception as e:
+                logger.error(f"Job watcher poll failed: {e}")
+
+            wait = self.next_due_in()
+            self._wake.wait(self.max_interval if wait is None else wait)
+            self._wake.clear()
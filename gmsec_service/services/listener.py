@@ -3,12 +3,76 @@ import json
 import logging
 import time
 import html
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional, Union
 import libgmsec_python3 as lp
 from gmsec_service.common.connection import GmsecConnection
-from gmsec_service.common.job import JobState
+from gmsec_service.common.job import JobBatchState, JobState
+from gmsec_service.common.metrics import REGISTRY, start_metrics_server
+from gmsec_service.common.retry_scheduler import gather, get_retry_scheduler, then
+from gmsec_service.common.trace import TraceRecorder
+from gmsec_service.common.worker_pool import DirectiveWorkerPool, parse_keyword_limits
 from gmsec_service.handlers.directive_handler import GmsecRequestHandler
+from gmsec_service.handlers.ingest_rules import get_ingest_rule_engine
+from gmsec_service.services.job_watcher import JOB_WATCH_NOTIFY_MODES, JobWatcher
 from gmsec_service.services.publisher import GmsecLog
 
+DIRECTIVE_KEYWORDS = ("JOB-STATUS", "SUBMIT-JOB")
+RECEIVE_MODES = ("poll", "callback")
+RECEIVE_TIMEOUT_MS = 1000
+TRACE_FIELDS = ("DIRECTIVE-KEYWORD", "DIRECTIVE-STRING", "COMPONENT")
+# Seconds to wait before re-checking a FAILED job, in case the failure was transient
+FAILED_RECHECK_DELAY = 2
+# Subject for DIRECTIVE-RESPONSE messages, including those the job watcher publishes without a request
+JOB_RESPONSE_TOPIC = "ESDT.CZDT.ISS.RESP.DIR.PRODUCT-INGEST"
+
+DIRECTIVES_TOTAL = REGISTRY.counter("iss_directives_total", "Directive requests handled", ("keyword", "outcome"))
+DIRECTIVE_REPLY_SECONDS = REGISTRY.histogram(
+    "iss_directive_reply_seconds", "Time from receiving a directive to sending its reply", ("keyword",)
+)
+DIRECTIVES_IN_FLIGHT = REGISTRY.gauge("iss_directives_in_flight", "Directives accepted by the worker pool and not yet finished")
+
+
+def build_directive_callback(listener: "GmsecListener"):
+    """
+    Creates the subscription callback that dispatches directives from the GMSEC auto-dispatch
+    thread. Connection failures are handled by the GmsecConnection supervisor.
+    """
+
+    class DirectiveCallback(lp.Callback):
+        def on_message(self, conn, msg):
+            # The received message is only valid during the callback, so dispatch a copy
+            try:
+                listener.dispatch_request(lp.Message(msg), destroy=False)
+            except Exception as e:
+                lp.log_error(f"Failed to handle directive: {e}")
+
+    return DirectiveCallback()
+
+
+@dataclass
+class PendingDirective:
+    """A directive being handled, from receipt until its reply is sent or it fails"""
+
+    request_msg: lp.Message
+    keyword_label: str
+    received_at: float
+    destroy: bool
+    request_handler: Optional[GmsecRequestHandler] = None
+    finished: Future = field(default_factory=Future)
+
+
+def describe_jobs(job_status: Union[JobState, JobBatchState]) -> str:
+    if isinstance(job_status, JobBatchState):
+        return f"jobs {', '.join(job_status.job_ids)}"
+    return f"job_id {job_status.job_id}"
+
+
+def build_response_prototype(factory: lp.MessageFactory) -> lp.Message:
+    return factory.create_message("RESP.DIR")
+
 
 class GmsecListener:
     def __init__(self, env: str = "PROD"):
@@ -23,25 +87,180 @@ class GmsecListener:
 
         self.gmsec = None
         self.subscription_pattern = None
-        
+        self.reply_lock = threading.Lock()
+        self._stop = threading.Event()
+
         self.initialize_connection()
 
-    def initialize_connection(self):
-        if self.gmsec:
-            try:
-                self.gmsec.teardown()
-            except Exception as e:
-                lp.log_warning(f"Error during teardown: {e}")
+        self.worker_pool = self.build_worker_pool()
+        self.job_watch_executor: Optional[ThreadPoolExecutor] = None
+        self.job_watcher = self.build_job_watcher()
 
+        self.trace = TraceRecorder.from_config(self.gmsec.config, "listener-trace-path", "listener")
+        if self.trace is not None:
+            lp.log_info(f"Capturing directive trace to {self.trace.path}")
+
+        # Compile ingest rules up front so the first SUBMIT-JOB doesn't pay for it
+        try:
+            with self.gmsec.startup_phase("ingest_rules"):
+                get_ingest_rule_engine()
+        except Exception as e:
+            lp.log_warning(f"Unable to load ingest rules, SUBMIT-JOB directives will fail: {e}")
+
+        lp.log_info(f"Listener startup took {self.gmsec.startup_summary()}")
+
+    def build_worker_pool(self):
+        """
+        Builds the directive worker pool from the listener config. A worker count of 0 keeps
+        directive handling inline on the receive loop.
+        """
+        config = self.gmsec.config
+        workers = int(config.get_value("listener-workers", "0"))
+        if workers <= 0:
+            return None
+
+        max_in_flight = int(config.get_value("listener-max-in-flight", str(workers * 2)))
+        keyword_limits = parse_keyword_limits(config.get_value("listener-keyword-limits", ""))
+        lp.log_info(
+            f"Processing directives with {workers} workers (max in flight {max_in_flight}, keyword limits {keyword_limits})"
+        )
+        worker_pool = DirectiveWorkerPool(workers, max_in_flight, keyword_limits)
+        DIRECTIVES_IN_FLIGHT.set_function(worker_pool.in_flight)
+        return worker_pool
+
+    def build_job_watcher(self) -> Optional[JobWatcher]:
+        """
+        Builds the job watcher from the listener config. With `job-watch-notify` set to none,
+        job states are only reported when CMSS asks. Its MAAP lookups run on their own
+        `job-watch-workers` threads, so a batch of them doesn't hold up directive retries.
+        """
+        config = self.gmsec.config
+        self.job_watch_notify = config.get_value("job-watch-notify", "none").lower()
+        if self.job_watch_notify not in JOB_WATCH_NOTIFY_MODES:
+            raise ValueError(
+                f"Invalid job-watch-notify '{self.job_watch_notify}'. Must be one of {', '.join(JOB_WATCH_NOTIFY_MODES)}"
+            )
+        if self.job_watch_notify == "none":
+            return None
+
+        min_interval = float(config.get_value("job-watch-interval", "10"))
+        max_interval = float(config.get_value("job-watch-max-interval", "300"))
+        lp.log_info(f"Announcing job transitions as {self.job_watch_notify} messages (poll every {min_interval}-{max_interval}s)")
+        workers = int(config.get_value("job-watch-workers", "4"))
+        self.job_watch_executor = ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="job-watch")
+        return JobWatcher(
+            self.lookup_job_status,
+            self.on_job_transition,
+            min_interval=min_interval,
+            max_interval=max_interval,
+            batch_size=int(config.get_value("job-watch-batch-size", "20")),
+        )
+
+    def lookup_job_status(self, job_id: str) -> Future:
+        """Fresh job status lookup for the job watcher, run on the watcher's own workers"""
+        return self.job_watch_executor.submit(self.fetch_watched_job_status, job_id)
+
+    @staticmethod
+    def fetch_watched_job_status(job_id: str) -> JobState:
+        """
+        Looks a watched job up, bypassing the cache. Like a reply, a FAILED status is looked up
+        again after FAILED_RECHECK_DELAY before it is announced, in case the failure was transient.
+        """
+        request_handler = GmsecRequestHandler("JOB-STATUS", json.dumps({"job-id": job_id}))
+        job_state = request_handler.get_job_status(job_id, refresh=True)
+        if job_state.has_failures:
+            lp.log_info(f"Watched job {job_id} has FAILED status. Ensuring failure isn't transient before announcing...")
+            time.sleep(FAILED_RECHECK_DELAY)
+            job_state = request_handler.get_job_status(job_id, refresh=True)
+        return job_state
+
+    def on_job_transition(self, previous: JobState, current: JobState, context: dict):
+        lp.log_info(f"Job {current.job_id} changed from {previous.status_label} to {current.status_label}")
+        if self.job_watch_notify == "log":
+            level = "WARNING" if current.status_label == "FAILED" else "INFO"
+            log_msg = f"Job {current.job_id} changed from {previous.status_label} to {current.status_label}"
+            GmsecLog(level, log_msg, self.gmsec).publish_log()
+            return
+
+        request_msg = context.get("request")
+        if request_msg is not None and request_msg.has_field("REQUEST-ID"):
+            request_id_field = request_msg.get_field("REQUEST-ID")
+        else:
+            request_id_field = lp.U16Field("REQUEST-ID", 0)
+        response_msg = self.build_response(current, request_id_field)
+        response_msg.set_subject(JOB_RESPONSE_TOPIC)
+        if request_msg is not None and request_msg.has_field("COMPONENT"):
+            response_msg.add_field(lp.StringField("DESTINATION-COMPONENT", request_msg.get_string_value("COMPONENT"), True))
+        self.gmsec.audit.record("sent", response_msg)
+        self.gmsec.publish(response_msg, "response")
+
+    def track_jobs(self, keyword: str, job_status: Union[JobState, JobBatchState], request_msg: lp.Message):
+        """Hands jobs from a sent reply to the job watcher"""
+        if keyword == "SUBMIT-JOB":
+            # Announcements carry the request's REQUEST-ID field as sent; the request itself is
+            # destroyed once replied to, so keep a copy
+            context = {"request": lp.Message(request_msg)}
+            for job_state in job_status.job_states():
+                self.job_watcher.watch(job_state, context)
+        else:
+            for job_state in job_status.job_states():
+                self.job_watcher.observe(job_state)
+
+    def dispatch_request(self, request_msg: lp.Message, destroy: bool = True):
+        """
+        Hands a received message to the worker pool, or handles it inline if no pool is configured.
+        `destroy` is False for messages copied in a subscription callback, which the API doesn't own.
+        """
+        received_at = time.perf_counter()
+        if self.trace is not None:
+            self.trace.record(
+                "directive",
+                {field: request_msg.get_string_value(field) for field in TRACE_FIELDS if request_msg.has_field(field)},
+            )
+
+        if self.worker_pool is None:
+            self.handle_request(request_msg, received_at, destroy)
+            return
+
+        directive_keyword = None
+        if request_msg.has_field("DIRECTIVE-KEYWORD"):
+            directive_keyword = request_msg.get_string_value("DIRECTIVE-KEYWORD")
+        self.worker_pool.submit(directive_keyword, self.handle_request, request_msg, received_at, destroy)
+
+    def initialize_connection(self):
+        """
+        Connects and subscribes to directives. The subscription is re-established by the
+        connection supervisor whenever the connection is lost.
+        """
         self.gmsec = GmsecConnection(self.config)
+        self.gmsec.add_reconnect_listener(self.on_reconnect)
+        self.receive_mode = self.gmsec.config.get_value("listener-receive-mode", "poll").lower()
+        if self.receive_mode not in RECEIVE_MODES:
+            raise ValueError(f"Invalid listener-receive-mode '{self.receive_mode}'. Must be one of {', '.join(RECEIVE_MODES)}")
+
         self.subscription_pattern = self.gmsec.get_subscription_pattern(self.subscription_name)
-        self.gmsec.conn.subscribe(self.subscription_pattern)
+        with self.gmsec.startup_phase("subscribe"):
+            if self.receive_mode == "callback":
+                # The API does not take ownership of callbacks, so keep a reference for the connection's lifetime
+                self.directive_callback = build_directive_callback(self)
+                self.gmsec.subscribe(self.subscription_pattern, self.directive_callback)
+            else:
+                self.gmsec.subscribe(self.subscription_pattern)
         lp.log_info("GMSEC connection initialized and subscription set.")
 
-    def handle_request(self, request_msg: lp.Message):
+    def handle_request(self, request_msg: lp.Message, received_at: Optional[float] = None, destroy: bool = True) -> Future:
+        """
+        Handles a directive and replies once its job status is known. Lookups that have to wait,
+        such as MAAP retries or the FAILED re-check, continue on the retry scheduler, so the reply
+        may be sent after this returns. The returned Future finishes with the directive, which
+        keeps its worker pool slot held until then.
+        """
+        if received_at is None:
+            received_at = time.perf_counter()
+        directive = PendingDirective(request_msg, "UNKNOWN", received_at, destroy)
         try:
             # Received a message!
-            lp.log_info("Received Message:\n" + request_msg.to_xml())
+            self.gmsec.audit.record("received", request_msg)
 
             # Ensure required fields
             for field in ("DIRECTIVE-KEYWORD", "DIRECTIVE-STRING"):
@@ -49,109 +268,178 @@ class GmsecListener:
                     raise ValueError(f"Missing required field {field}")
 
             directive_keyword = request_msg.get_string_value("DIRECTIVE-KEYWORD")
+            directive.keyword_label = directive_keyword if directive_keyword in DIRECTIVE_KEYWORDS else "OTHER"
             raw_directive_string = request_msg.get_string_value("DIRECTIVE-STRING")
             directive_string = html.unescape(raw_directive_string)
 
-            request_handler = GmsecRequestHandler(directive_keyword, directive_string)
+            directive.request_handler = GmsecRequestHandler(directive_keyword, directive_string)
 
             if directive_keyword == "JOB-STATUS":
-                try:
-                    job_id = request_handler.get_job_id()
-                    job_status = request_handler.get_job_status(job_id)
-                except Exception as e:
-                    logging.exception(e)
+                job_id = directive.request_handler.get_job_id()
+                pending = directive.request_handler.get_job_status_async(job_id)
 
             elif directive_keyword == "SUBMIT-JOB":
                 try:
-                    job_status = request_handler.trigger_ingest()
+                    pending = directive.request_handler.trigger_ingest_async()
                 except Exception as e:
-                    logging.exception(e)
+                    pending = Future()
+                    pending.set_exception(e)
 
             else:
                 raise ValueError(f"Unsupported DIRECTIVE-KEYWORD: {directive_keyword}")
-            
+
+        except Exception:
+            self.finish_request(directive, "error")
+            raise
+
+        pending.add_done_callback(lambda done: self.on_job_status(done, directive))
+        return directive.finished
+
+    def on_job_status(self, done: Future, directive: "PendingDirective", rechecked: bool = False):
+        """Continuation of handle_request() once the job status lookup finishes"""
+        request_msg = directive.request_msg
+        outcome = "error"
+        try:
+            job_status = done.result()
+
             # Ensure job is not a transient job failure before sending response
-            if job_status.status_label == "FAILED":
-                lp.log_info(f"Job {job_status.job_id} has FAILED status. Ensuring failure isn't transient before replying...")
-                time.sleep(2)
-                job_status = request_handler.get_job_status(job_status.job_id)
+            if job_status.has_failures and not rechecked:
+                lp.log_info(f"{describe_jobs(job_status)} has FAILED status. Ensuring failure isn't transient before replying...")
+                recheck = get_retry_scheduler().call_later(
+                    FAILED_RECHECK_DELAY, self.recheck_failed, job_status, directive.request_handler
+                )
+                recheck.add_done_callback(lambda done: self.on_job_status(done, directive, rechecked=True))
+                outcome = None
+                return
 
-            lp.log_info(f"Constructing Reply: job_id {job_status.job_id} job_status {job_status.status_label}")
+            lp.log_info(f"Constructing Reply: {describe_jobs(job_status)} job_status {job_status.status_label}")
 
             # Construct a response
             response_msg = self.build_response(job_status, request_msg.get_field("REQUEST-ID"))
             if request_msg.has_field("COMPONENT"):
                 response_msg.add_field(lp.StringField("DESTINATION-COMPONENT", request_msg.get_string_value("COMPONENT"),True))
 
-            lp.log_info("Sending Response:\n" + response_msg.to_xml())
+            self.gmsec.audit.record("sent", response_msg)
 
-            self.gmsec.conn.reply(request_msg, response_msg)
+            with self.reply_lock:
+                self.gmsec.reply(request_msg, response_msg)
+                request_msg.acknowledge()
+            outcome = "replied"
 
-            request_msg.acknowledge()
+            if self.job_watcher is not None:
+                self.track_jobs(directive.keyword_label, job_status, request_msg)
 
-        finally:
-            lp.Message.destroy(request_msg)
+        except Exception as e:
+            logging.exception(e)
 
-    def build_response(self, job_status: JobState, request_id_field: lp.Field) -> lp.Message:
+        finally:
+            if outcome is not None:
+                self.finish_request(directive, outcome)
+
+    @staticmethod
+    def recheck_failed(job_status: Union[JobState, JobBatchState], request_handler: GmsecRequestHandler) -> Future:
+        """Looks the failed jobs up again, bypassing the cache, and returns a Future for the updated status"""
+        job_ids = job_status.failed_job_ids()
+        lookups = gather([request_handler.get_job_status_async(job_id, refresh=True) for job_id in job_ids])
+        return then(lookups, lambda refreshed: job_status.with_refreshed(dict(zip(job_ids, refreshed))))
+
+    def finish_request(self, directive: "PendingDirective", outcome: str):
+        DIRECTIVES_TOTAL.labels(keyword=directive.keyword_label, outcome=outcome).inc()
+        if outcome == "replied":
+            DIRECTIVE_REPLY_SECONDS.labels(keyword=directive.keyword_label).observe(
+                time.perf_counter() - directive.received_at
+            )
+        if directive.destroy:
+            lp.Message.destroy(directive.request_msg)
+        directive.finished.set_result(outcome)
+
+    def build_response(self, job_status: Union[JobState, JobBatchState], request_id_field: lp.Field) -> lp.Message:
         """
-        Builds response message from JobState object along with request message's id Field object
+        Builds response message from JobState object along with request message's id Field object.
+        A JobBatchState reply lists the job id and status of each product in DATA-STRING.
         """
-        response_data = {
-            "job-id": job_status.job_id,
-            "job-status": job_status.status_label,
-        }
+        response_data = job_status.response_data()
 
-        response_msg: lp.Message = self.gmsec.msg_factory.create_message("RESP.DIR")
+        response_msg: lp.Message = self.gmsec.templates.create("RESP.DIR", build_response_prototype)
         response_msg.add_field(request_id_field)
         response_msg.add_field(lp.I16Field("RESPONSE-STATUS", job_status.status_code))
         response_msg.add_field(lp.StringField("DATA-STRING", json.dumps(response_data)))
         return response_msg
 
+    def start(self):
+        """
+        Starts event-driven dispatch in callback mode. In poll mode directives are received by run().
+        """
+        self._stop.clear()
+        if self.job_watcher is not None:
+            self.job_watcher.start()
+        if self.receive_mode == "callback":
+            self.gmsec.start_auto_dispatch()
+
+    def stop(self):
+        """Asks run() to stop receiving; it returns once in-flight directives have finished"""
+        self._stop.set()
+
+    def receive_next(self):
+        """Waits for the next directive and dispatches it; messages already queued return at once"""
+        request_msg = self.gmsec.conn.receive(RECEIVE_TIMEOUT_MS)
+        if request_msg is not None:
+            self.dispatch_request(request_msg)
+
+    def on_reconnect(self, reason: str):
+        log_msg = f"GMSEC connection restored after error: {reason}"
+        log_publisher = GmsecLog("WARNING", log_msg, self.gmsec)
+        log_publisher.publish_log()
+
     def run(self):
+        metrics_port = int(self.gmsec.config.get_value("metrics-port", "0"))
+        if metrics_port:
+            start_metrics_server(metrics_port)
+            lp.log_info(f"Serving metrics on port {metrics_port}")
+
         log_msg = "GMSEC listener initialized. Waiting to receive directive requests."
         log_publisher = GmsecLog("INFO", log_msg, self.gmsec)
         log_publisher.publish_log()
 
-        timeout = 5000  # 5 seconds
-
-        while True:
-            try:
-                request_msg = self.gmsec.conn.receive(timeout)
+        self.start()
+        lp.log_info(f"Receiving directives in {self.receive_mode} mode")
 
-                if request_msg is not None:
-                    self.handle_request(request_msg)
+        while not self._stop.is_set():
+            if self.gmsec.state == GmsecConnection.FAILED:
+                lp.log_error("Unable to reconnect to GMSEC. Exiting container.")
+                sys.exit(1)  # Let Docker Compose restart us
 
-                time.sleep(0.5)
+            generation = self.gmsec.generation
+            try:
+                if self.receive_mode == "callback" or self.gmsec.state == GmsecConnection.RECONNECTING:
+                    # Directives arrive on the auto-dispatch thread; reconnects run in the supervisor
+                    self._stop.wait(RECEIVE_TIMEOUT_MS / 1000)
+                else:
+                    self.receive_next()
 
             except lp.GmsecError as e:
-                lp.log_error(f"GMSEC error: {e}")
-                log_publisher = GmsecLog("ERROR", f"GMSEC connection error: {e}", self.gmsec)
-                log_publisher.publish_log()
-
-                # Attempt to reconnect
-                success = False
-                retries = 0
-                max_retries = 10
-                
-                while not success and retries < max_retries:
-                    try:
-                        lp.log_info("Attempting GMSEC reconnection...")
-                        self.initialize_connection()
-                        success = True
-                        lp.log_info("GMSEC reconnection successful.")
-                    except Exception as retry_error:
-                        retries += 1
-                        lp.log_error(f"Reconnect failed: {retry_error}")
-                        time.sleep(5)
-                        
-                if not success:
-                    lp.log_error("Max reconnect attempts reached. Exiting container.")
-                    sys.exit(1)  # Let Docker Compose restart us
+                # Ignored if the connection was replaced since the receive started
+                self.gmsec.connection_lost(e, generation)
 
             except KeyboardInterrupt:
                 print("\nCtrl+C was pressed. Exiting...")
                 break
 
+        if self.receive_mode == "callback":
+            self.gmsec.stop_auto_dispatch()
+
+        if self.worker_pool is not None:
+            self.worker_pool.shutdown()
+        # Watcher lookups can schedule retries too, so stop it before draining the scheduler
+        if self.job_watcher is not None:
+            self.job_watcher.stop()
+            self.job_watch_executor.shutdown()
+        # Let directives waiting on a retry or re-check send their replies
+        get_retry_scheduler().wait_idle()
+
+        if self.trace is not None:
+            self.trace.close()
+
         self.gmsec.teardown()
 
 
@@ -0,0 +1,234 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional
+
+logger = logging.getLogger("outbox")
+
+
+class Outbox:
+    """
+    Durable local outbox for LOG and PROD messages that could not be published because the GMSEC
+    connection was down.
+
+    Messages are stored as JSON payloads in a SQLite database in WAL mode and read back in
+    insertion order. Each message is stored under the id of the message object it came from, so
+    storing the same message twice keeps one copy while identical messages that were sent
+    separately, such as a LOG repeated during an outage, are all kept. Messages that keep failing
+    to replay are moved to a dead_letter table with the last error.
+
+    Attributes:
+        path (str): Path to the SQLite database file.
+        order_window (int): Largest backlog new messages still wait behind to keep their order.
+    """
+
+    def __init__(self, path: str, order_window: int = 100):
+        self.path = path
+        self.order_window = order_window
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                message_id TEXT NOT NULL UNIQUE,
+                created_at REAL NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS dead_letter (
+                id INTEGER PRIMARY KEY,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                message_id TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                attempts INTEGER NOT NULL,
+                failed_at REAL NOT NULL,
+                error TEXT NOT NULL
+            )
+            """
+        )
+        self._depth = self._db.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def append(self, kind: str, payload: dict, message_id: str) -> bool:
+        """Stores a message. Returns False if the message with this id is already pending."""
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT OR IGNORE INTO outbox (kind, payload, message_id, created_at) VALUES (?, ?, ?, ?)",
+                (kind, json.dumps(payload), message_id, time.time()),
+            )
+            added = cursor.rowcount == 1
+            if added:
+                self._depth += 1
+            return added
+
+    def holds_order(self) -> bool:
+        """
+        Whether a new message should be stored behind the pending ones instead of published, so
+        it stays in order. Only a backlog of up to order_window messages is waited on; past that,
+        new messages are published directly and the backlog is replayed alongside them.
+        """
+        return 0 < self._depth <= self.order_window
+
+    def peek(self, limit: int) -> list[tuple[int, str, dict, int]]:
+        """Returns up to `limit` of the oldest pending messages as (id, kind, payload, attempts)"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, kind, payload, attempts FROM outbox ORDER BY id LIMIT ?", (limit,)
+            ).fetchall()
+        return [(row_id, kind, json.loads(payload), attempts) for row_id, kind, payload, attempts in rows]
+
+    def ack(self, ids: list[int]):
+        if not ids:
+            return
+        with self._lock:
+            cursor = self._db.executemany("DELETE FROM outbox WHERE id = ?", [(i,) for i in ids])
+            self._depth -= cursor.rowcount
+
+    def record_attempt(self, row_id: int):
+        with self._lock:
+            self._db.execute("UPDATE outbox SET attempts = attempts + 1 WHERE id = ?", (row_id,))
+
+    def dead_letter(self, row_id: int, error: str):
+        """Moves a message that will not be replayed again to the dead_letter table"""
+        with self._lock, self._db:
+            self._db.execute("BEGIN")
+            self._db.execute(
+                """
+                INSERT INTO dead_letter (id, kind, payload, message_id, created_at, attempts, failed_at, error)
+                SELECT id, kind, payload, message_id, created_at, attempts + 1, ?, ? FROM outbox WHERE id = ?
+                """,
+                (time.time(), error, row_id),
+            )
+            cursor = self._db.execute("DELETE FROM outbox WHERE id = ?", (row_id,))
+            self._depth -= cursor.rowcount
+
+    def dead_letters(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM dead_letter").fetchone()[0]
+
+    def depth(self) -> int:
+        return self._depth
+
+    def oldest_age(self) -> Optional[float]:
+        """Age in seconds of the oldest pending message, or None if the outbox is empty"""
+        with self._lock:
+            row = self._db.execute("SELECT MIN(created_at) FROM outbox").fetchone()
+        return None if row[0] is None else max(0.0, time.time() - row[0])
+
+    def stats(self) -> dict:
+        return {"depth": self.depth(), "oldest_age_seconds": self.oldest_age(), "dead_letters": self.dead_letters()}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class OutboxReplayer:
+    """
+    Background thread that replays outbox messages in order once publishing works again.
+
+    Messages are read in batches of `batch_size` and published at no more than `rate` messages
+    per second. `publish` returns False while the connection is down and raises if the message
+    itself failed. Either failure stops the batch so ordering is preserved, and replay backs off
+    exponentially (up to `max_backoff` seconds) until a publish succeeds or wake() is called.
+    Only raised failures count as attempts; a message is moved to the dead-letter table once it
+    has failed `max_attempts` times (0 for no limit), so it cannot hold up the rest.
+    """
+
+    def __init__(
+        self,
+        outbox: Outbox,
+        publish: Callable[[str, dict], bool],
+        rate: float = 20.0,
+        batch_size: int = 50,
+        idle_interval: float = 5.0,
+        max_backoff: float = 60.0,
+        max_attempts: int = 5,
+    ):
+        self.outbox = outbox
+        self.publish = publish
+        self.rate = rate
+        self.batch_size = batch_size
+        self.idle_interval = idle_interval
+        self.max_backoff = max_backoff
+        self.max_attempts = max_attempts
+
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="outbox-replayer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def wake(self):
+        """Ends the current backoff early, e.g. once the GMSEC connection is back"""
+        self._wake.set()
+
+    def _pause(self, seconds: float) -> bool:
+        """Waits up to `seconds`. Returns whether wake() or stop() ended the wait early"""
+        woken = self._wake.wait(seconds)
+        self._wake.clear()
+        return woken
+
+    def replay_batch(self) -> tuple[int, bool]:
+        """Replays one batch. Returns (messages published, whether a publish failed)"""
+        published = []
+        interval = 1.0 / self.rate if self.rate > 0 else 0.0
+        try:
+            for row_id, kind, payload, attempts in self.outbox.peek(self.batch_size):
+                if self._stop.is_set():
+                    break
+                try:
+                    ok = self.publish(kind, payload)
+                except Exception as e:
+                    logger.error(f"Error replaying outbox message {row_id}: {e}")
+                    if self.max_attempts and attempts + 1 >= self.max_attempts:
+                        logger.error(f"Moving outbox message {row_id} to the dead letters after {attempts + 1} attempts")
+                        self.outbox.dead_letter(row_id, str(e))
+                        continue
+                    self.outbox.record_attempt(row_id)
+                    return len(published), True
+                if not ok:
+                    # The connection is down; the message has not failed
+                    return len(published), True
+                published.append(row_id)
+                if interval:
+                    self._stop.wait(interval)
+        finally:
+            self.outbox.ack(published)
+        return len(published), False
+
+    def _run(self):
+        backoff = 1.0
+        while not self._stop.is_set():
+            if self.outbox.depth() == 0:
+                self._pause(self.idle_interval)
+                continue
+
+            count, failed = self.replay_batch()
+            if count:
+                logger.info(f"Replayed {count} outbox messages, {self.outbox.depth()} remaining")
+            if failed:
+                if self._pause(backoff):
+                    backoff = 1.0
+                else:
+                    backoff = min(backoff * 2, self.max_backoff)
+            else:
+                backoff = 1.0
@@ -1,7 +1,17 @@
 from typing import Iterable, Optional
-from gmsec_service.common.connection import GmsecConnection
+from gmsec_service.common.connection import GmsecConnection, is_connection_error
+from gmsec_service.services.outbox import Outbox
 import libgmsec_python3 as lp
 import json
+import uuid
+
+
+def is_connection_failure(gmsec: GmsecConnection, e: Exception) -> bool:
+    """
+    Whether a publish failed because the GMSEC connection is down, in which case the message can
+    be replayed once it is back. Rejected messages would fail again and are not stored.
+    """
+    return is_connection_error(e) or not gmsec.connected
 
 
 class GmsecProduct:
@@ -11,22 +21,41 @@ class GmsecProduct:
     """
 
     PRODUCT_TOPIC = "ESDT.CZDT.ISS.MSG.PROD.PRODUCT-INGEST"
+    OUTBOX_KIND = "product"
 
     def __init__(
-        self, job_id: str, concept_id: str, provenance: str, ogc: Optional[str], uris: Iterable[str], gmsec: GmsecConnection
+        self,
+        job_id: str,
+        concept_id: str,
+        provenance: str,
+        ogc: Optional[str],
+        uris: Iterable[str],
+        gmsec: GmsecConnection,
+        outbox: Optional[Outbox] = None,
     ):
         self.gmsec = gmsec
+        self.outbox = outbox
         self.concept_id = concept_id
         self.ogc = ogc
         self.URIs = uris
         self.job_id = job_id
         self.provenance = json.dumps({"provenance": "default"})
+        self.published: Optional[bool] = None
+        # Set once the message is stored in the outbox for replay
+        self.queued = False
+        # Set when publishing failed because the connection was down
+        self.connection_failed = False
+        self.message_id = uuid.uuid4().hex
+
+    @classmethod
+    def build_prototype(cls, factory: lp.MessageFactory) -> lp.Message:
+        prototype: lp.Message = factory.create_message("MSG.PROD")
+        prototype.set_subject(cls.PRODUCT_TOPIC)
+        prototype.add_field(lp.F32Field("CONTENT-VERSION", 2024))
+        return prototype
 
     def _construct_product_message(self) -> lp.Message:
-        gmsec_msg: lp.Message = self.gmsec.msg_factory.create_message("MSG.PROD")
-        gmsec_msg.set_subject(self.PRODUCT_TOPIC)
-
-        gmsec_msg.add_field(lp.F32Field("CONTENT-VERSION", 2024))
+        gmsec_msg: lp.Message = self.gmsec.templates.create("MSG.PROD", self.build_prototype)
 
         gmsec_msg.add_field(lp.StringField("PROD-NAME", self.concept_id))
         gmsec_msg.add_field(lp.StringField("JOB-ID", self.job_id))
@@ -43,14 +72,36 @@ class GmsecProduct:
             gmsec_msg.add_field(lp.StringField(f"FILE.{i}.URI", uri))
         return gmsec_msg
 
+    def to_payload(self) -> dict:
+        return {"job_id": self.job_id, "concept_id": self.concept_id, "ogc": self.ogc, "uris": list(self.URIs)}
+
+    @classmethod
+    def from_payload(cls, payload: dict, gmsec: GmsecConnection) -> "GmsecProduct":
+        return cls(payload["job_id"], payload["concept_id"], "default", payload["ogc"], payload["uris"], gmsec)
+
     def publish_product(self) -> str:
+        if self.outbox and self.outbox.holds_order():
+            # Stay in order behind a short backlog still waiting for replay
+            self.outbox.append(self.OUTBOX_KIND, self.to_payload(), self.message_id)
+            self.queued = True
+            self.published = False
+            return "Queued PRODUCT message for replay"
+
         gmsec_msg = self._construct_product_message()
-        lp.log_info("Sending PRODUCT Message:\n" + gmsec_msg.to_xml())
+        lp.log_info(f"Sending PRODUCT Message for job {self.job_id} with {len(self.URIs)} files")
+        self.gmsec.audit.record("sent", gmsec_msg)
         try:
-            self.gmsec.conn.publish(gmsec_msg)
+            self.gmsec.publish(gmsec_msg, "product")
+            self.published = True
             publish_status = "Successfully published PRODUCT message"
         except Exception as e:
+            self.published = False
+            self.connection_failed = is_connection_failure(self.gmsec, e)
             publish_status = f"Error publishing PRODUCT message: {e}"
+            if self.outbox and self.connection_failed:
+                self.outbox.append(self.OUTBOX_KIND, self.to_payload(), self.message_id)
+                self.queued = True
+                publish_status += "; queued for replay"
         return publish_status
 
 
@@ -69,11 +120,20 @@ class GmsecLog:
     }
 
     LOG_TOPIC = "ESDT.CZDT.ISS.MSG.LOG.PRODUCT-INGEST"
+    OUTBOX_KIND = "log"
 
-    def __init__(self, level: str, msg_body: str, gmsec: GmsecConnection):
+    def __init__(self, level: str, msg_body: str, gmsec: GmsecConnection, outbox: Optional[Outbox] = None):
         self.gmsec = gmsec
+        self.outbox = outbox
+        self.level_name = level
         self.level = self._convert_level_severity(level)
         self.msg_body = msg_body
+        self.published: Optional[bool] = None
+        # Set once the message is stored in the outbox for replay
+        self.queued = False
+        # Set when publishing failed because the connection was down
+        self.connection_failed = False
+        self.message_id = uuid.uuid4().hex
 
     def _convert_level_severity(self, level: str) -> int:
         """Converts log level to int value ranging 0-4"""
@@ -81,21 +141,64 @@ class GmsecLog:
             raise ValueError(f"Invalid log level. Must be one of {', '.join(self.LEVEL_SEVERITY_MAP.keys())}")
         return self.LEVEL_SEVERITY_MAP[level]
 
-    def _construct_log_message(self) -> lp.Message:
-        gmsec_msg: lp.Message = self.gmsec.msg_factory.create_message("LOG")
-        gmsec_msg.set_subject(self.LOG_TOPIC)
+    @classmethod
+    def build_prototype(cls, factory: lp.MessageFactory) -> lp.Message:
+        prototype: lp.Message = factory.create_message("LOG")
+        prototype.set_subject(cls.LOG_TOPIC)
+        prototype.add_field(lp.F32Field("CONTENT-VERSION", 2024))
+        return prototype
 
-        gmsec_msg.add_field(lp.F32Field("CONTENT-VERSION", 2024))
+    def _construct_log_message(self) -> lp.Message:
+        gmsec_msg: lp.Message = self.gmsec.templates.create("LOG", self.build_prototype)
         gmsec_msg.add_field(lp.U16Field("SEVERITY", self.level))
         gmsec_msg.add_field(lp.StringField("MSG-TEXT", self.msg_body))
         return gmsec_msg
 
+    def to_payload(self) -> dict:
+        return {"level": self.level_name, "msg_body": self.msg_body}
+
+    @classmethod
+    def from_payload(cls, payload: dict, gmsec: GmsecConnection) -> "GmsecLog":
+        return cls(payload["level"], payload["msg_body"], gmsec)
+
     def publish_log(self) -> str:
+        if self.outbox and self.outbox.holds_order():
+            # Stay in order behind a short backlog still waiting for replay
+            self.outbox.append(self.OUTBOX_KIND, self.to_payload(), self.message_id)
+            self.queued = True
+            self.published = False
+            return "Queued LOG message for replay"
+
         log_msg = self._construct_log_message()
-        lp.log_info("Sending LOG Message:\n" + log_msg.to_xml())
+        self.gmsec.audit.record("sent", log_msg)
         try:
-            self.gmsec.conn.publish(log_msg)
+            self.gmsec.publish(log_msg, "log")
+            self.published = True
             publish_status = "Successfully published LOG message"
         except Exception as e:
+            self.published = False
+            self.connection_failed = is_connection_failure(self.gmsec, e)
             publish_status = f"Error publishing LOG message: {e}"
+            if self.outbox and self.connection_failed:
+                self.outbox.append(self.OUTBOX_KIND, self.to_payload(), self.message_id)
+                self.queued = True
+                publish_status += "; queued for replay"
         return publish_status
+
+
+def publish_outbox_message(kind: str, payload: dict, gmsec: GmsecConnection) -> bool:
+    """
+    Publishes a message replayed from the outbox. Returns whether it was published, or False if
+    the connection is down; raises if the message itself was rejected.
+    """
+    if kind == GmsecProduct.OUTBOX_KIND:
+        message = GmsecProduct.from_payload(payload, gmsec)
+        publish_status = message.publish_product()
+    elif kind == GmsecLog.OUTBOX_KIND:
+        message = GmsecLog.from_payload(payload, gmsec)
+        publish_status = message.publish_log()
+    else:
+        raise ValueError(f"Unknown outbox message kind '{kind}'")
+    if not message.published and not message.connection_failed:
+        raise RuntimeError(publish_status)
+    return message.published
@@ -11,7 +11,7 @@ from pydantic import ValidationError
 sys.modules["libgmsec_python3"] = MagicMock()
 
 # Only import after mocking
-from gmsec_service.api.publisher_api import LogRequest, ProductRequest
+from gmsec_service.api.publisher_api import BatchProductRequest, LogRequest, ProductRequest
 
 
 def test_log_request_valid():
@@ -70,4 +70,20 @@ def test_empty_list_ogc():
     assert product.concept_id == "collection-abc"
     assert product.provenance == "source:dummy,parameter:dummy"
     assert len(product.uris) > 0
-    assert product.ogc is None
\ No newline at end of file
+    assert product.ogc is None
+
+
+def test_batch_product_request_valid():
+    batch = BatchProductRequest(
+        products=[
+            {"job_id": "job-1", "concept_id": "collection-abc", "ogc": [], "uris": ["s3://bucket/file1.txt"]},
+            {"job_id": "job-2", "concept_id": "collection-abc", "uris": ["s3://bucket/file2.txt"]},
+        ]
+    )
+    assert [p.job_id for p in batch.products] == ["job-1", "job-2"]
+    assert batch.products[0].ogc is None
+
+
+def test_batch_product_request_empty():
+    with pytest.raises(ValidationError):
+        BatchProductRequest(products=[])
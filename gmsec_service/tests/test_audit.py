@@ -0,0 +1,113 @@
+import json
+import sys
+from unittest.mock import MagicMock
+
+sys.modules["libgmsec_python3"] = MagicMock()
+
+import pytest  # noqa: E402
+
+from gmsec_service.common.audit import AuditWriter, MessageAudit  # noqa: E402
+
+
+class FakeField:
+    def __init__(self, name, value):
+        self.name, self.value = name, value
+
+    def get_name(self):
+        return self.name
+
+    def get_string_value(self):
+        return self.value
+
+
+class FakeMessage:
+    def __init__(self, subject, fields):
+        self.subject = subject
+        self.fields = fields
+        self.serialized = False
+
+    def get_subject(self):
+        return self.subject
+
+    def has_field(self, name):
+        return name in self.fields
+
+    def get_string_value(self, name):
+        return self.fields[name]
+
+    def get_field_iterator(self):
+        pending = [FakeField(k, v) for k, v in self.fields.items()]
+        iterator = MagicMock()
+        iterator.has_next.side_effect = lambda: bool(pending)
+        iterator.next.side_effect = lambda: pending.pop(0)
+        return iterator
+
+    def to_xml(self):
+        self.serialized = True
+        return "<MESSAGE/>"
+
+
+def read_records(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_off_mode_records_nothing(tmp_path):
+    audit = MessageAudit(mode="off", path=str(tmp_path / "audit.jsonl"))
+    msg = FakeMessage("ESDT.CZDT.ISS.MSG.LOG", {"SEVERITY": "1"})
+    audit.record("sent", msg)
+    audit.close()
+
+    assert not (tmp_path / "audit.jsonl").exists()
+
+
+def test_sampled_mode_records_key_fields_only(tmp_path):
+    path = str(tmp_path / "audit.jsonl")
+    audit = MessageAudit(mode="sampled", sample_rate=1.0, path=path)
+    audit.record("sent", FakeMessage("ESDT.CZDT.ISS.MSG.PROD", {"PROD-NAME": "c1", "FILE.1.URI": "s3://b/f"}))
+    audit.close()
+
+    [record] = read_records(path)
+    assert record["direction"] == "sent"
+    assert record["fields"] == {"PROD-NAME": "c1"}
+
+
+def test_full_mode_records_all_fields_without_xml(tmp_path):
+    path = str(tmp_path / "audit.jsonl")
+    audit = MessageAudit(mode="full", path=path)
+    msg = FakeMessage("ESDT.CZDT.ISS.MSG.PROD", {"PROD-NAME": "c1", "FILE.1.URI": "s3://b/f"})
+    audit.record("sent", msg)
+    audit.close()
+
+    [record] = read_records(path)
+    assert record["fields"] == {"PROD-NAME": "c1", "FILE.1.URI": "s3://b/f"}
+    assert not msg.serialized
+
+
+def test_audits_with_the_same_path_share_one_writer(tmp_path):
+    path = str(tmp_path / "audit.jsonl")
+    first = MessageAudit(mode="full", path=path)
+    second = MessageAudit(mode="full", path=path)
+    shared = first._writer
+    assert second._writer is shared
+
+    first.record("sent", FakeMessage("ESDT.CZDT.ISS.MSG.LOG", {"MSG-TEXT": "a"}))
+    first.close()
+    # The writer keeps running for the audit still using it
+    second.record("sent", FakeMessage("ESDT.CZDT.ISS.MSG.LOG", {"MSG-TEXT": "b"}))
+    second.close()
+
+    assert [record["fields"]["MSG-TEXT"] for record in read_records(path)] == ["a", "b"]
+    reopened = MessageAudit(mode="full", path=path)
+    assert reopened._writer is not None and reopened._writer is not shared
+    reopened.close()
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_close_does_not_block_on_a_dead_writer(tmp_path):
+    # The writer thread dies at once: the audit file can't be opened
+    writer = AuditWriter(str(tmp_path / "missing" / "audit.jsonl"), max_pending=1)
+    writer._thread.join(5)
+    writer.submit({"subject": "a"})
+
+    writer.close(timeout=None)
@@ -0,0 +1,80 @@
+import threading
+
+import pytest
+import requests
+
+from benchmarks import fake_gmsec as fake
+from benchmarks.fake_maap import FakeMaapServer, LatencyModel, build_maap_client
+
+
+def test_fake_bus_request_reply():
+    fake.reset_bus()
+    config_file = fake.ConfigFile()
+    config_file.load("benchmarks/config-bench.xml")
+    config = config_file.lookup_config("config")
+    pattern = config_file.lookup_subscription_entry("CMSS-REQUESTS-SUBSCRIPTION").get_pattern()
+
+    service = fake.Connection(config)
+    service.connect()
+    service.subscribe(pattern)
+    client = fake.Connection(config)
+    client.connect()
+
+    def serve():
+        request = service.receive(1000)
+        response = service.get_message_factory().create_message("RESP.DIR")
+        response.add_field(fake.StringField("DATA-STRING", request.get_string_value("DIRECTIVE-STRING")))
+        service.reply(request, response)
+
+    server = threading.Thread(target=serve)
+    server.start()
+    request = client.get_message_factory().create_message("REQ.DIR")
+    request.set_subject("ESDT.CZDT.CMSS.REQ.DIR.PRODUCT-INGEST.TEST")
+    request.add_field(fake.StringField("DIRECTIVE-STRING", '{"job-id": "1"}'))
+    reply = client.request(request, 1000)
+    server.join()
+
+    assert reply.get_string_value("DATA-STRING") == '{"job-id": "1"}'
+    assert reply.get_string_value("MESSAGE-TYPE") == "RESP"
+
+    # Messages on other subjects are not delivered
+    other = fake.Message(request)
+    other.set_subject("ESDT.CZDT.ISS.MSG.LOG.PRODUCT-INGEST")
+    client.publish(other)
+    assert service.receive(50) is None
+
+
+def test_fake_bus_close_interrupts_receive():
+    bus = fake.reset_bus()
+    conn = fake.Connection()
+    conn.connect()
+    bus.close()
+    with pytest.raises(KeyboardInterrupt):
+        conn.receive(1000)
+
+
+def test_fake_maap_server():
+    server = FakeMaapServer(latency=LatencyModel.parse("constant:1"), job_duration=60).start()
+    client = build_maap_client(server.url, pool_size=2, timeout=5)
+    try:
+        job = client.submit_job({"identifier": "bench"})
+        assert job.status == "success"
+        assert client.get_job_status(job.id) == "Accepted"
+        assert client.get_job_status("unknown-job") == "Succeeded"
+
+        server.error_rate = 1.0
+        with pytest.raises(requests.HTTPError):
+            client.get_job_status(job.id)
+        assert server.requests == 4
+        assert server.errors == 1
+    finally:
+        client.close()
+        server.stop()
+
+
+def test_latency_model():
+    assert LatencyModel.parse("constant:20").sample() == 0.02
+    uniform = LatencyModel.parse("uniform:10,20")
+    assert all(0.01 <= uniform.sample() <= 0.02 for _ in range(100))
+    with pytest.raises(ValueError):
+        LatencyModel.parse("gaussian:10")
@@ -0,0 +1,158 @@
+import random
+import sys
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+sys.modules.setdefault("libgmsec_python3", MagicMock())
+
+from benchmarks import fake_gmsec
+from gmsec_service.common import audit, connection, message_templates
+from gmsec_service.common.backoff import ExponentialBackoff
+from gmsec_service.common.connection import GmsecConnection
+from gmsec_service.services import publisher
+
+
+@pytest.fixture
+def fake_bus(monkeypatch):
+    for module in (audit, connection, message_templates):
+        monkeypatch.setattr(module, "lp", fake_gmsec)
+    monkeypatch.setattr(fake_gmsec.ConfigFile, "path_override", "benchmarks/config-bench.xml")
+    monkeypatch.setattr(
+        fake_gmsec.ConfigFile, "overrides", {"reconnect-initial-delay": "0.01", "reconnect-max-delay": "0.02"}
+    )
+    monkeypatch.setattr(fake_gmsec.Log, "reporting_level", 0)
+    return fake_gmsec.reset_bus()
+
+
+def test_backoff_grows_with_jitter_up_to_max_delay():
+    backoff = ExponentialBackoff(1.0, 10.0, rng=random.Random(1))
+    assert 0.5 <= backoff.delay(0) <= 1.0
+    assert 2.0 <= backoff.delay(2) <= 4.0
+    assert all(5.0 <= backoff.delay(attempt) <= 10.0 for attempt in (4, 10, 5000))
+
+
+def test_supervisor_reconnects_and_resubscribes(fake_bus):
+    gmsec = GmsecConnection("config/config-prod.xml")
+    gmsec.subscribe("ESDT.CZDT.TEST.>")
+    reconnected = threading.Event()
+    gmsec.add_reconnect_listener(lambda reason: reconnected.set())
+
+    gmsec.conn.simulate_failure("bus restarted")
+    assert reconnected.wait(5)
+    assert gmsec.state == GmsecConnection.CONNECTED
+    assert gmsec.last_error == "bus restarted"
+
+    publisher = fake_gmsec.Connection()
+    publisher.connect()
+    msg = fake_gmsec.Message()
+    msg.set_subject("ESDT.CZDT.TEST.MSG")
+    publisher.publish(msg)
+    assert gmsec.conn.receive(1000) is not None
+    gmsec.teardown()
+
+
+def test_supervisor_gives_up_after_max_attempts(fake_bus, monkeypatch):
+    monkeypatch.setitem(fake_gmsec.ConfigFile.overrides, "reconnect-max-attempts", "3")
+    gmsec = GmsecConnection("config/config-prod.xml")
+    failures = []
+
+    def refuse(self):
+        failures.append(self)
+        raise fake_gmsec.GmsecError("Connection refused")
+
+    monkeypatch.setattr(fake_gmsec.Connection, "connect", refuse)
+
+    assert not gmsec.reconnect("bus down")
+    assert gmsec.state == GmsecConnection.FAILED
+    assert not gmsec.healthy
+    assert len(failures) == 3
+
+
+def test_late_event_from_replaced_connection_is_ignored(fake_bus):
+    gmsec = GmsecConnection("config/config-prod.xml")
+    old_conn = gmsec.conn
+    assert gmsec.reconnect("first outage")
+
+    old_conn.simulate_failure("late event")
+    assert gmsec.state == GmsecConnection.CONNECTED
+    gmsec.teardown()
+    assert gmsec.state == GmsecConnection.CLOSED
+
+
+def test_reconnect_is_warm(fake_bus, monkeypatch):
+    gmsec = GmsecConnection("config/config-prod.xml")
+    factory = gmsec.msg_factory
+    assert list(gmsec.startup_timings) == ["load_config", "message_factory", "connect"]
+
+    loads = []
+    monkeypatch.setattr(fake_gmsec.ConfigFile, "load", lambda self, path: loads.append(path))
+    monkeypatch.setattr(fake_gmsec, "MessageFactory", MagicMock(side_effect=AssertionError("factory rebuilt")))
+    assert gmsec.reconnect("bus restarted")
+
+    assert gmsec.msg_factory is factory
+    assert gmsec.conn.get_message_factory() is factory
+    assert loads == []
+    gmsec.teardown()
+
+
+@pytest.mark.parametrize("mode, validate_send", [("full", "true"), ("cached", "false")])
+def test_validate_send_is_set_before_the_first_connection(fake_bus, monkeypatch, mode, validate_send):
+    monkeypatch.setitem(fake_gmsec.ConfigFile.overrides, "message-validation-mode", mode)
+    seen = []
+    connect = fake_gmsec.Connection.connect
+
+    def record_config(self):
+        seen.append(self.config.get_value("gmsec-msg-content-validate-send"))
+        connect(self)
+
+    monkeypatch.setattr(fake_gmsec.Connection, "connect", record_config)
+    gmsec = GmsecConnection("config/config-prod.xml")
+
+    assert seen == [validate_send]
+    assert (gmsec.validator is None) == (mode == "full")
+    gmsec.teardown()
+
+
+def test_failed_log_publish_starts_reconnecting(fake_bus, monkeypatch):
+    monkeypatch.setattr(publisher, "lp", fake_gmsec)
+    gmsec = GmsecConnection("config/config-prod.xml")
+    reconnected = threading.Event()
+    gmsec.add_reconnect_listener(lambda reason: reconnected.set())
+    gmsec.conn.connected = False
+
+    log = publisher.GmsecLog("INFO", "hello", gmsec)
+    assert log.publish_log().startswith("Error publishing LOG message")
+    assert reconnected.wait(5)
+    assert gmsec.state == GmsecConnection.CONNECTED
+    gmsec.teardown()
+
+
+def test_validation_reject_does_not_reconnect(fake_bus, monkeypatch):
+    gmsec = GmsecConnection("config/config-prod.xml")
+    generation = gmsec.generation
+
+    def reject(msg):
+        raise fake_gmsec.GmsecError("Message failed content validation", fake_gmsec.MSG_ERROR)
+
+    monkeypatch.setattr(gmsec.conn, "publish", reject)
+    with pytest.raises(fake_gmsec.GmsecError):
+        gmsec.publish(gmsec.msg_factory.create_message("LOG"), "log")
+
+    assert gmsec.generation == generation
+    assert gmsec.state == GmsecConnection.CONNECTED
+    gmsec.teardown()
+
+
+def test_auto_dispatch_started_during_a_reconnect_runs_on_the_new_connection(fake_bus):
+    gmsec = GmsecConnection("config/config-prod.xml")
+    reconnected = threading.Event()
+    gmsec.add_reconnect_listener(lambda reason: reconnected.set())
+
+    gmsec.conn.simulate_failure("bus restarted")
+    gmsec.start_auto_dispatch()
+
+    assert reconnected.wait(5)
+    assert gmsec.conn._dispatching.is_set()
+    gmsec.teardown()
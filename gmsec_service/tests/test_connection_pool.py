@@ -0,0 +1,83 @@
+import sys
+import threading
+from unittest.mock import MagicMock
+
+sys.modules["libgmsec_python3"] = MagicMock()
+
+import pytest
+
+from gmsec_service.common.connection_pool import ConnectionPoolExhausted, GmsecConnectionPool
+
+
+def make_pool(size=2, checkout_timeout=0.1):
+    created = []
+
+    def factory():
+        gmsec = MagicMock(healthy=True)
+        created.append(gmsec)
+        return gmsec
+
+    return GmsecConnectionPool(factory, size=size, checkout_timeout=checkout_timeout), created
+
+
+def test_connections_are_reused_and_created_up_to_size():
+    pool, created = make_pool(size=2)
+
+    with pool.connection() as first:
+        pass
+    with pool.connection() as again:
+        assert again is first
+        with pool.connection() as second:
+            assert second is not first
+            assert pool.stats() == {"size": 2, "open": 2, "in_use": 2, "idle": 0}
+            with pytest.raises(ConnectionPoolExhausted):
+                pool.checkout()
+    assert len(created) == 2
+    assert pool.in_use() == 0
+
+
+def test_unhealthy_connection_is_replaced():
+    pool, created = make_pool(size=1)
+
+    with pool.connection() as broken:
+        broken.healthy = False
+    broken.teardown.assert_called_once()
+
+    with pool.connection() as replacement:
+        assert replacement is not broken
+    assert len(created) == 2
+
+    # A connection that went bad while idle is replaced at checkout
+    replacement.healthy = False
+    with pool.connection() as fresh:
+        assert fresh is created[2]
+    replacement.teardown.assert_called_once()
+
+
+def test_waiter_is_woken_when_connection_is_released():
+    pool, _ = make_pool(size=1, checkout_timeout=5)
+    held = pool.checkout()
+    got = []
+
+    waiter = threading.Thread(target=lambda: got.append(pool.checkout()))
+    waiter.start()
+    pool.release(held)
+    waiter.join(timeout=5)
+
+    assert got == [held]
+
+
+def test_close_tears_down_idle_and_released_connections():
+    pool, _ = make_pool(size=2)
+    idle = pool.checkout()
+    busy = pool.checkout()
+    pool.release(idle)
+
+    pool.close()
+    idle.teardown.assert_called_once()
+    busy.teardown.assert_not_called()
+
+    pool.release(busy)
+    busy.teardown.assert_called_once()
+    with pytest.raises(RuntimeError):
+        pool.checkout()
@@ -0,0 +1,60 @@
+import pytest
+
+from gmsec_service.common.fixed_rate import FixedRateScheduler
+
+
+class FakeClock:
+    """Clock that only advances when the work between ticks or the scheduler's wait advances it"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def run_ticks(scheduler, clock, work_durations):
+    fired_at = []
+    scheduler._stop.wait = lambda timeout: setattr(clock, "now", clock.now + timeout)
+    for tick, _ in enumerate(scheduler):
+        fired_at.append(clock.now)
+        if tick == len(work_durations) - 1:
+            break
+        clock.now += work_durations[tick]
+    return fired_at
+
+
+def test_ticks_do_not_drift():
+    clock = FakeClock()
+    scheduler = FixedRateScheduler(5, clock=clock)
+
+    fired_at = run_ticks(scheduler, clock, [0.7, 1.3, 0.2, 0.0])
+
+    assert fired_at == [0, 5, 10, 15]
+    assert scheduler.max_lateness == 0
+
+
+def test_skip_policy_drops_missed_ticks():
+    clock = FakeClock()
+    scheduler = FixedRateScheduler(5, policy="skip", clock=clock)
+
+    fired_at = run_ticks(scheduler, clock, [12, 0, 0])
+
+    # The tick due at 5 is dropped, the one due at 10 fires late, then the schedule is current
+    assert fired_at == [0, 12, 15]
+    assert scheduler.skipped == 1
+
+
+def test_catch_up_policy_fires_missed_ticks():
+    clock = FakeClock()
+    scheduler = FixedRateScheduler(5, policy="catch-up", clock=clock)
+
+    fired_at = run_ticks(scheduler, clock, [12, 0, 0, 0])
+
+    assert fired_at == [0, 12, 12, 15]
+    assert scheduler.max_lateness == 7
+
+
+def test_invalid_policy():
+    with pytest.raises(ValueError):
+        FixedRateScheduler(5, policy="later")
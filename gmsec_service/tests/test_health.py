@@ -0,0 +1,39 @@
+import time
+from unittest.mock import MagicMock
+
+from gmsec_service.services.health import HealthProbeEngine, ProbeResult
+
+
+def make_engine(statuses, **kwargs):
+    engine = HealthProbeEngine({name: f"http://{name}" for name in statuses}, **kwargs)
+    for name, check in statuses.items():
+        engine.probes[name].check_status = check
+    return engine
+
+
+def test_probes_run_concurrently_within_budget():
+    def slow_check():
+        time.sleep(1)
+        return True
+
+    engine = make_engine({"sdap": lambda: True, "hysds": lambda: True, "titiler": slow_check}, timeout=0.2)
+
+    started = time.monotonic()
+    engine.run_once()
+
+    assert time.monotonic() - started < 0.5
+    results = engine.snapshot()
+    assert results["sdap"].status and results["hysds"].status
+    assert results["titiler"].status is False
+    assert not engine.is_healthy()
+    engine.stop()
+
+
+def test_stale_results_count_as_unavailable():
+    engine = make_engine({"sdap": MagicMock(return_value=True)}, interval=10)
+    engine.run_once()
+    assert engine.is_healthy()
+
+    engine.results["sdap"] = ProbeResult(status=True, checked_at=time.monotonic() - 31)
+    assert not engine.is_healthy()
+    engine.stop()
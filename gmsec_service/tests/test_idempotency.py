@@ -0,0 +1,121 @@
+import json
+from concurrent.futures import Future
+from unittest.mock import MagicMock
+
+from gmsec_service.common import job_cache, maap_client
+from gmsec_service.common.job import JobState
+from gmsec_service.handlers import idempotency
+from gmsec_service.handlers.directive_handler import GmsecRequestHandler
+from gmsec_service.handlers.idempotency import SubmitJobIndex
+
+DIRECTIVE = {"concept_id": "C0000000001-TEST", "products": ["s3://bucket/product.nc"], "format": "nc"}
+
+
+def test_index_survives_restart_within_window(tmp_path):
+    now = [1000.0]
+    path = str(tmp_path / "submit-jobs.db")
+    key = SubmitJobIndex.dedupe_key(DIRECTIVE)
+
+    index = SubmitJobIndex(path, window=60, clock=lambda: now[0])
+    index.record(key, "job-1")
+    index.close()
+
+    reopened = SubmitJobIndex(path, window=60, clock=lambda: now[0])
+    assert reopened.lookup(key) == "job-1"
+    now[0] += 61
+    assert reopened.lookup(key) is None
+
+
+def test_dedupe_key_ignores_key_order_and_whitespace():
+    reordered = {"format": "nc ", "products": [" s3://bucket/product.nc"], "concept_id": "C0000000001-TEST"}
+    assert SubmitJobIndex.dedupe_key(reordered) == SubmitJobIndex.dedupe_key(DIRECTIVE)
+    assert SubmitJobIndex.dedupe_key({**DIRECTIVE, "format": "zarr"}) != SubmitJobIndex.dedupe_key(DIRECTIVE)
+
+
+def test_index_evicts_oldest_beyond_max_entries(tmp_path):
+    now = [0.0]
+    index = SubmitJobIndex(str(tmp_path / "submit-jobs.db"), max_entries=2, clock=lambda: now[0])
+    for job_id in ("job-1", "job-2", "job-3"):
+        now[0] += 1
+        index.record(job_id, job_id)
+
+    assert len(index) == 2
+    assert index.lookup("job-1") is None
+    assert index.lookup("job-3") == "job-3"
+
+
+def test_index_count_follows_rerecords_forgets_and_restarts(tmp_path):
+    path = str(tmp_path / "submit-jobs.db")
+    index = SubmitJobIndex(path, max_entries=2)
+    index.record("a", "job-1")
+    index.record("a", "job-2")
+    index.record("b", "job-3")
+    index.forget("b", "job-3")
+    assert len(index) == 1
+    index.close()
+
+    reopened = SubmitJobIndex(path, max_entries=2)
+    reopened.record("c", "job-4")
+    reopened.record("d", "job-5")
+    assert len(reopened) == 2
+    assert reopened.lookup("a") is None
+
+
+def test_disabled_index_is_not_rebuilt(monkeypatch):
+    monkeypatch.setattr(idempotency, "submit_job_index", None)
+    monkeypatch.setattr(idempotency, "submit_job_index_disabled", False)
+    monkeypatch.delenv("SUBMIT_JOB_INDEX_PATH", raising=False)
+    assert idempotency.get_submit_job_index() is None
+
+    monkeypatch.setattr(SubmitJobIndex, "from_env", MagicMock(side_effect=AssertionError("env read again")))
+    assert idempotency.get_submit_job_index() is None
+
+
+def test_resent_submit_job_returns_existing_job(tmp_path, monkeypatch):
+    monkeypatch.setattr(idempotency, "submit_job_index", SubmitJobIndex(str(tmp_path / "submit-jobs.db")))
+    monkeypatch.setattr(job_cache, "job_status_cache", None)
+    submit = MagicMock(return_value=JobState.from_maap_status("accepted", "job-1"))
+    monkeypatch.setattr(GmsecRequestHandler, "submit_ingest_job", submit)
+    maap = MagicMock()
+    maap.getJobStatus.return_value = "Running"
+    monkeypatch.setattr(maap_client, "maap_client", maap_client.MaapClient(maap_factory=lambda: maap))
+
+    first = GmsecRequestHandler("SUBMIT-JOB", json.dumps(DIRECTIVE)).trigger_ingest()
+    resent = GmsecRequestHandler("SUBMIT-JOB", json.dumps(DIRECTIVE, indent=2)).trigger_ingest()
+
+    submit.assert_called_once()
+    assert resent.job_id == first.job_id == "job-1"
+    assert resent.status_label == "IN_PROGRESS"
+
+
+def test_resent_submit_job_looks_the_job_up_without_blocking(tmp_path, monkeypatch):
+    monkeypatch.setattr(idempotency, "submit_job_index", SubmitJobIndex(str(tmp_path / "submit-jobs.db")))
+    idempotency.submit_job_index.record(SubmitJobIndex.dedupe_key(DIRECTIVE), "job-1")
+    lookup = Future()
+    monkeypatch.setattr(GmsecRequestHandler, "get_job_status_async", lambda self, job_id, refresh=False: lookup)
+
+    pending = GmsecRequestHandler("SUBMIT-JOB", json.dumps(DIRECTIVE)).trigger_ingest_async()
+
+    assert not pending.done()
+    lookup.set_result(JobState.from_maap_status("running", "job-1"))
+    assert pending.result(timeout=1).job_id == "job-1"
+
+
+def test_resent_submit_job_resubmits_a_failed_job(tmp_path, monkeypatch):
+    index = SubmitJobIndex(str(tmp_path / "submit-jobs.db"))
+    monkeypatch.setattr(idempotency, "submit_job_index", index)
+    monkeypatch.setattr(job_cache, "job_status_cache", None)
+    submit = MagicMock(
+        side_effect=[JobState.from_maap_status("accepted", "job-1"), JobState.from_maap_status("accepted", "job-2")]
+    )
+    monkeypatch.setattr(GmsecRequestHandler, "submit_ingest_job", submit)
+    maap = MagicMock()
+    maap.getJobStatus.return_value = "Failed"
+    monkeypatch.setattr(maap_client, "maap_client", maap_client.MaapClient(maap_factory=lambda: maap))
+
+    GmsecRequestHandler("SUBMIT-JOB", json.dumps(DIRECTIVE)).trigger_ingest()
+    resent = GmsecRequestHandler("SUBMIT-JOB", json.dumps(DIRECTIVE)).trigger_ingest()
+
+    assert submit.call_count == 2
+    assert resent.job_id == "job-2"
+    assert index.lookup(SubmitJobIndex.dedupe_key(DIRECTIVE)) == "job-2"
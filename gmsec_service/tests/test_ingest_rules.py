@@ -0,0 +1,55 @@
+import os
+import shutil
+
+import pytest
+import yaml
+
+from gmsec_service.handlers.ingest_rules import IngestRuleEngine
+
+EXAMPLE_CONFIG = "gmsec_service/handlers/ingest_config.example.yaml"
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / "ingest_config.yaml"
+    shutil.copy(EXAMPLE_CONFIG, path)
+    return str(path)
+
+
+def test_lis_products_rewrite_variables(config_path):
+    engine = IngestRuleEngine(config_path)
+    job_args = engine.build_job_args(
+        "daily_flood_prediction",
+        "s3://czdt-nfss/output_data/SURFACEMODEL/202509/LIS_HIST_202509150300.d01.nc",
+        "netcdf",
+        ["SoilMoist_tavg", "TotalPrecip_tavg"],
+    )
+    assert job_args["identifier"] == "LIS_DAILY_WORKFLOW"
+    assert job_args["variables"] == "SoilMoist_tavg_0,TotalPrecip_tavg"
+    assert job_args["queue"] == "queue-name"
+
+
+def test_fallback_to_base_variant(config_path):
+    engine = IngestRuleEngine(config_path)
+    job_args = engine.build_job_args("collection", "s3://bucket/file.nc", "netcdf", None)
+    assert job_args["identifier"] == "gmsec_ingest"
+    assert job_args["input_s3"] == "s3://bucket/file.nc"
+    assert "variables" not in job_args
+
+
+def test_reload_on_mtime_change(config_path):
+    clock = [0.0]
+    engine = IngestRuleEngine(config_path, check_interval=5, clock=lambda: clock[0])
+
+    with open(config_path) as f:
+        config = yaml.safe_load(f)
+    config["rules"].insert(0, {"variant": "gpkg", "match": {"suffix": ".tif"}})
+    with open(config_path, "w") as f:
+        yaml.safe_dump(config, f)
+    stat = os.stat(config_path)
+    os.utime(config_path, (stat.st_atime, stat.st_mtime + 10))
+
+    # Not re-checked until the interval elapses
+    assert engine.match("c", "s3://bucket/file.tif").variant == "base"
+    clock[0] = 6
+    assert engine.match("c", "s3://bucket/file.tif").variant == "gpkg"
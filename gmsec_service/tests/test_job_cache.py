@@ -0,0 +1,44 @@
+from gmsec_service.common.job import JobState
+from gmsec_service.common.job_cache import JobStatusCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_non_terminal_states_expire():
+    clock = FakeClock()
+    cache = JobStatusCache(ttls={"IN_PROGRESS": 10}, clock=clock)
+    cache.put(JobState.from_maap_status("running", "job-1"))
+
+    assert cache.get("job-1").status_label == "IN_PROGRESS"
+    clock.now = 11
+    assert cache.get("job-1") is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 0}
+
+
+def test_terminal_states_kept_until_evicted():
+    clock = FakeClock()
+    cache = JobStatusCache(max_entries=2, clock=clock)
+    cache.put(JobState.from_maap_status("succeeded", "job-1"))
+    cache.put(JobState.from_maap_status("failed", "job-2"))
+
+    clock.now = 10**6
+    assert cache.get("job-1").status_label == "COMPLETED"
+
+    # job-2 is now least recently used
+    cache.put(JobState.from_maap_status("succeeded", "job-3"))
+    assert cache.get("job-2") is None
+    assert cache.get("job-1") is not None
+
+
+def test_placeholder_and_invalid_states_not_cached():
+    cache = JobStatusCache()
+    cache.put(JobState.from_maap_status("failed", "N/A"))
+    cache.put(JobState.from_maap_status("unknown", "job-1"))
+
+    assert cache.stats()["size"] == 0
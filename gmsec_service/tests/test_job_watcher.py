@@ -0,0 +1,90 @@
+from gmsec_service.common.job import JobState
+from gmsec_service.common.retry_scheduler import completed
+from gmsec_service.services.job_watcher import JobWatcher
+
+
+class FakeMaap:
+    """Job statuses by job id, looked up the way the listener's lookup does"""
+
+    def __init__(self, statuses):
+        self.statuses = statuses
+        self.lookups = []
+
+    def lookup(self, job_id):
+        self.lookups.append(job_id)
+        return completed(JobState.from_maap_status(self.statuses[job_id], job_id))
+
+
+def build_watcher(maap, now, transitions, **kwargs):
+    return JobWatcher(
+        maap.lookup,
+        lambda previous, current, context: transitions.append((previous.status_label, current.status_label, context)),
+        min_interval=10,
+        max_interval=40,
+        clock=lambda: now[0],
+        **kwargs,
+    )
+
+
+def test_transitions_are_reported_until_terminal():
+    now = [0.0]
+    maap = FakeMaap({"job-1": "accepted"})
+    transitions = []
+    watcher = build_watcher(maap, now, transitions)
+
+    assert watcher.watch(JobState.from_maap_status("accepted", "job-1"), {"request-id": 7})
+    assert watcher.poll_due() == 0
+
+    now[0] = 10
+    maap.statuses["job-1"] = "running"
+    watcher.poll_due()
+    now[0] = 20
+    maap.statuses["job-1"] = "succeeded"
+    watcher.poll_due()
+
+    assert transitions == [
+        ("SUBMITTED", "IN_PROGRESS", {"request-id": 7}),
+        ("IN_PROGRESS", "COMPLETED", {"request-id": 7}),
+    ]
+    assert watcher.watched() == 0
+
+
+def test_unchanged_jobs_back_off_to_max_interval():
+    now = [0.0]
+    maap = FakeMaap({"job-1": "running"})
+    watcher = build_watcher(maap, now, [])
+    watcher.watch(JobState.from_maap_status("running", "job-1"))
+
+    poll_times = []
+    for second in range(0, 200):
+        now[0] = second
+        if watcher.poll_due():
+            poll_times.append(second)
+
+    # Intervals of 10, 20, 40, 40, ...
+    assert poll_times[:5] == [10, 30, 70, 110, 150]
+
+
+def test_batches_are_capped_and_observed_states_are_not_announced():
+    now = [0.0]
+    maap = FakeMaap({f"job-{i}": "running" for i in range(5)})
+    transitions = []
+    watcher = build_watcher(maap, now, transitions, batch_size=2)
+    for i in range(5):
+        watcher.watch(JobState.from_maap_status("accepted", f"job-{i}"))
+    watcher.observe(JobState.from_maap_status("running", "job-0"))
+    watcher.observe(JobState.from_maap_status("succeeded", "job-1"))
+
+    now[0] = 10
+    assert watcher.poll_due() == 2
+    assert watcher.poll_due() == 2
+    assert watcher.poll_due() == 0
+    assert [current for _, current, _ in transitions] == ["IN_PROGRESS"] * 3
+    assert "job-1" not in maap.lookups
+
+
+def test_jobs_that_cannot_change_are_not_watched():
+    watcher = build_watcher(FakeMaap({}), [0.0], [])
+    assert not watcher.watch(JobState.from_maap_status("failed", "N/A"))
+    assert not watcher.watch(JobState.from_maap_status("succeeded", "job-1"))
+    assert watcher.watched() == 0
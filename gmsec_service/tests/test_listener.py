@@ -0,0 +1,187 @@
+import json
+import sys
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+sys.modules.setdefault("libgmsec_python3", MagicMock())
+
+from benchmarks import fake_gmsec
+from gmsec_service.common import audit, connection, job_cache, maap_client, message_templates
+from gmsec_service.common.job import JobState
+from gmsec_service.handlers import idempotency
+from gmsec_service.handlers.directive_handler import GmsecRequestHandler
+from gmsec_service.services import listener as listener_module
+from gmsec_service.services import publisher
+
+
+@pytest.fixture
+def fake_bus(monkeypatch):
+    """Runs the listener against the in-process fake GMSEC bus and a mocked MAAP"""
+    for module in (audit, connection, message_templates, listener_module, publisher):
+        monkeypatch.setattr(module, "lp", fake_gmsec)
+    monkeypatch.setattr(fake_gmsec.ConfigFile, "path_override", "benchmarks/config-bench.xml")
+    monkeypatch.setattr(fake_gmsec.Log, "reporting_level", 0)
+
+    maap = MagicMock()
+    maap.getJobStatus.return_value = "Succeeded"
+    monkeypatch.setattr(maap_client, "maap_client", maap_client.MaapClient(maap_factory=lambda: maap))
+    monkeypatch.setattr(job_cache, "job_status_cache", None)
+    return fake_gmsec.reset_bus()
+
+
+@pytest.mark.parametrize("receive_mode", ["poll", "callback"])
+def test_listener_replies_and_stops(fake_bus, monkeypatch, receive_mode):
+    monkeypatch.setattr(fake_gmsec.ConfigFile, "overrides", {"listener-receive-mode": receive_mode})
+    listener = listener_module.GmsecListener("PROD")
+    thread = threading.Thread(target=listener.run)
+    thread.start()
+
+    client = fake_gmsec.Connection(listener.gmsec.config)
+    client.connect()
+    request = client.get_message_factory().create_message("REQ.DIR")
+    request.set_subject("ESDT.CZDT.CMSS.REQ.DIR.PRODUCT-INGEST.TEST")
+    request.add_field(fake_gmsec.U16Field("REQUEST-ID", 7))
+    request.add_field(fake_gmsec.StringField("DIRECTIVE-KEYWORD", "JOB-STATUS"))
+    request.add_field(fake_gmsec.StringField("DIRECTIVE-STRING", '{"job-id": "job-1"}'))
+
+    reply = client.request(request, 5000)
+
+    listener.stop()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+    assert reply is not None
+    assert reply.get_integer_value("REQUEST-ID") == 7
+    assert json.loads(reply.get_string_value("DATA-STRING")) == {"job-id": "job-1", "job-status": "COMPLETED"}
+    # Replies carry the same fields as before the RESP.DIR prototype was cached
+    assert not reply.has_field("CONTENT-VERSION")
+
+
+def test_listener_rejects_unknown_receive_mode(fake_bus, monkeypatch):
+    monkeypatch.setattr(fake_gmsec.ConfigFile, "overrides", {"listener-receive-mode": "interrupt"})
+    with pytest.raises(ValueError):
+        listener_module.GmsecListener("PROD")
+
+
+def test_listener_recovers_after_connection_loss(fake_bus, monkeypatch):
+    monkeypatch.setattr(
+        fake_gmsec.ConfigFile,
+        "overrides",
+        {"listener-receive-mode": "callback", "reconnect-initial-delay": "0.01", "reconnect-max-delay": "0.02"},
+    )
+    listener = listener_module.GmsecListener("PROD")
+    reconnected = threading.Event()
+    listener.gmsec.add_reconnect_listener(lambda reason: reconnected.set())
+    thread = threading.Thread(target=listener.run)
+    thread.start()
+
+    listener.gmsec.conn.simulate_failure("broker restarted")
+    assert reconnected.wait(5)
+
+    client = fake_gmsec.Connection(listener.gmsec.config)
+    client.connect()
+    request = client.get_message_factory().create_message("REQ.DIR")
+    request.set_subject("ESDT.CZDT.CMSS.REQ.DIR.PRODUCT-INGEST.TEST")
+    request.add_field(fake_gmsec.U16Field("REQUEST-ID", 8))
+    request.add_field(fake_gmsec.StringField("DIRECTIVE-KEYWORD", "JOB-STATUS"))
+    request.add_field(fake_gmsec.StringField("DIRECTIVE-STRING", '{"job-id": "job-2"}'))
+    reply = client.request(request, 5000)
+
+    listener.stop()
+    thread.join(timeout=5)
+    assert reply is not None
+    assert reply.get_integer_value("REQUEST-ID") == 8
+
+
+def test_stale_receive_error_does_not_reconnect_again(fake_bus, monkeypatch):
+    monkeypatch.setattr(
+        fake_gmsec.ConfigFile,
+        "overrides",
+        {"listener-receive-mode": "poll", "reconnect-initial-delay": "0.01", "reconnect-max-delay": "0.02"},
+    )
+    listener = listener_module.GmsecListener("PROD")
+    reconnects = []
+    listener.gmsec.add_reconnect_listener(reconnects.append)
+
+    def receive(timeout):
+        # The supervisor replaces the connection while this receive is blocked on the old one
+        assert listener.gmsec.reconnect("broker restarted")
+        listener.stop()
+        raise fake_gmsec.GmsecError("Connection has not been initialized", fake_gmsec.CONNECTION_ERROR)
+
+    monkeypatch.setattr(listener.gmsec.conn, "receive", receive)
+    listener.run()
+
+    assert reconnects == ["broker restarted"]
+
+
+def test_failed_job_is_rechecked_before_replying(fake_bus, monkeypatch):
+    monkeypatch.setattr(listener_module, "FAILED_RECHECK_DELAY", 0.05)
+    listener = listener_module.GmsecListener("PROD")
+    maap_client.maap_client.maap.getJobStatus.side_effect = ["Failed", "Running"]
+    thread = threading.Thread(target=listener.run)
+    thread.start()
+
+    client = fake_gmsec.Connection(listener.gmsec.config)
+    client.connect()
+    request = client.get_message_factory().create_message("REQ.DIR")
+    request.set_subject("ESDT.CZDT.CMSS.REQ.DIR.PRODUCT-INGEST.TEST")
+    request.add_field(fake_gmsec.U16Field("REQUEST-ID", 9))
+    request.add_field(fake_gmsec.StringField("DIRECTIVE-KEYWORD", "JOB-STATUS"))
+    request.add_field(fake_gmsec.StringField("DIRECTIVE-STRING", '{"job-id": "job-3"}'))
+    reply = client.request(request, 5000)
+
+    listener.stop()
+    thread.join(timeout=5)
+    assert reply is not None
+    assert json.loads(reply.get_string_value("DATA-STRING")) == {"job-id": "job-3", "job-status": "IN_PROGRESS"}
+
+
+def test_job_watcher_announces_submitted_job_transitions(fake_bus, monkeypatch):
+    monkeypatch.setattr(
+        fake_gmsec.ConfigFile, "overrides", {"job-watch-notify": "response", "job-watch-interval": "0.05"}
+    )
+    monkeypatch.setattr(idempotency, "submit_job_index", None)
+    monkeypatch.setenv("SUBMIT_JOB_INDEX_PATH", "")
+    monkeypatch.setattr(
+        GmsecRequestHandler,
+        "submit_ingest_job",
+        lambda self, *args: JobState.from_maap_status("accepted", "job-4"),
+    )
+    maap_client.maap_client.maap.getJobStatus.return_value = "Running"
+    listener = listener_module.GmsecListener("PROD")
+    thread = threading.Thread(target=listener.run)
+    thread.start()
+
+    client = fake_gmsec.Connection(listener.gmsec.config)
+    client.connect()
+    client.subscribe(listener_module.JOB_RESPONSE_TOPIC)
+    request = client.get_message_factory().create_message("REQ.DIR")
+    request.set_subject("ESDT.CZDT.CMSS.REQ.DIR.PRODUCT-INGEST.TEST")
+    request.add_field(fake_gmsec.I32Field("REQUEST-ID", 70000))
+    request.add_field(fake_gmsec.StringField("DIRECTIVE-KEYWORD", "SUBMIT-JOB"))
+    request.add_field(
+        fake_gmsec.StringField("DIRECTIVE-STRING", '{"concept_id": "C1-TEST", "products": ["s3://b/a.nc"], "format": "nc"}')
+    )
+    reply = client.request(request, 5000)
+    announcement = client.receive(5000)
+
+    listener.stop()
+    thread.join(timeout=5)
+    assert json.loads(reply.get_string_value("DATA-STRING")) == {"job-id": "job-4", "job-status": "SUBMITTED"}
+    assert announcement is not None
+    # The request's REQUEST-ID is copied with its type
+    assert announcement.get_field("REQUEST-ID").get_type() == "I32Field"
+    assert announcement.get_integer_value("REQUEST-ID") == 70000
+    assert json.loads(announcement.get_string_value("DATA-STRING")) == {"job-id": "job-4", "job-status": "IN_PROGRESS"}
+
+
+def test_watched_job_failure_is_rechecked_before_announcing(fake_bus, monkeypatch):
+    monkeypatch.setattr(listener_module, "FAILED_RECHECK_DELAY", 0)
+    maap_client.maap_client.maap.getJobStatus.side_effect = ["Failed", "Running"]
+
+    job_state = listener_module.GmsecListener.fetch_watched_job_status("job-5")
+
+    assert job_state.status_label == "IN_PROGRESS"
+    assert maap_client.maap_client.maap.getJobStatus.call_count == 2
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock
+
+import maap.maap
+import requests
+
+from gmsec_service.common.maap_client import AsyncMaapClient, MaapClient
+
+
+class RequestingMaap:
+    """MAAP stand-in that calls the `requests` module the way maap-py does"""
+
+    def getJobStatus(self, job_id):
+        return maap.maap.requests.get(f"https://maap.example/api/dps/job/{job_id}/status")
+
+    def submitJob(self, **job_args):
+        return maap.maap.requests.post("https://maap.example/api/dps/job", json=job_args)
+
+
+def test_session_requests_use_pool_and_timeouts():
+    client = MaapClient(pool_size=2, timeout=12.0, maap_factory=RequestingMaap)
+    client.session.request = MagicMock()
+
+    client.get_job_status("1")
+    assert client.session.request.call_args.kwargs["timeout"] == 12.0
+
+    client.submit_job({}, timeout=3.0)
+    assert client.session.request.call_args.args == ("POST", "https://maap.example/api/dps/job")
+    assert client.session.request.call_args.kwargs["timeout"] == 3.0
+
+
+def test_maap_modules_are_only_patched_during_calls():
+    client = MaapClient(maap_factory=RequestingMaap)
+    seen = []
+    client.session.request = MagicMock(side_effect=lambda *args, **kwargs: seen.append(maap.maap.requests))
+
+    client.get_job_status("1")
+
+    assert seen and seen[0] is not requests
+    # Non-request attributes still resolve to the requests module
+    assert seen[0].exceptions.RequestException is requests.exceptions.RequestException
+    assert maap.maap.requests is requests
+
+
+def test_maap_instance_created_once():
+    factory = MagicMock()
+    client = MaapClient(maap_factory=factory)
+
+    client.get_job_status("job-1")
+    client.get_job_status("job-2")
+
+    factory.assert_called_once()
+    assert client.maap.getJobStatus.call_count == 2
+
+
+def test_async_client_bounds_concurrent_calls():
+    client = MaapClient(timeout=7.0, maap_factory=RequestingMaap)
+    lock = threading.Lock()
+    running = [0]
+    peak = [0]
+    timeouts = []
+
+    def request(method, url, **kwargs):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+            timeouts.append(kwargs["timeout"])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+        return url.rsplit("/", 2)[-2]
+
+    client.session.request = request
+    async_client = AsyncMaapClient(client, max_concurrency=2)
+
+    async def lookup_all():
+        return await asyncio.gather(*(async_client.get_job_status(f"job-{i}") for i in range(6)))
+
+    assert asyncio.run(lookup_all()) == [f"job-{i}" for i in range(6)]
+    assert peak[0] <= 2
+    assert timeouts == [7.0] * 6
@@ -0,0 +1,33 @@
+import sys
+from unittest.mock import MagicMock
+
+sys.modules.setdefault("libgmsec_python3", MagicMock())
+
+from benchmarks import fake_gmsec
+from gmsec_service.common import message_templates
+from gmsec_service.common.message_templates import MessageTemplateCache
+
+
+def test_messages_are_independent_copies_of_one_prototype(monkeypatch):
+    monkeypatch.setattr(message_templates, "lp", fake_gmsec)
+    factory = fake_gmsec.MessageFactory()
+    factory.set_standard_fields([fake_gmsec.StringField("SYSTEM", "CZDT")])
+    cache = MessageTemplateCache(factory)
+
+    def build(factory):
+        prototype = factory.create_message("LOG")
+        prototype.set_subject("ESDT.CZDT.ISS.MSG.LOG.TEST")
+        prototype.add_field(fake_gmsec.F32Field("CONTENT-VERSION", 2024))
+        return prototype
+
+    build_spy = MagicMock(side_effect=build)
+    first = cache.create("LOG", build_spy)
+    first.add_field(fake_gmsec.StringField("MSG-TEXT", "first"))
+    second = cache.create("LOG", build_spy)
+
+    build_spy.assert_called_once()
+    assert cache.kinds() == ["LOG"]
+    assert second.get_subject() == "ESDT.CZDT.ISS.MSG.LOG.TEST"
+    assert second.get_string_value("SYSTEM") == "CZDT"
+    assert second.has_field("CONTENT-VERSION")
+    assert not second.has_field("MSG-TEXT")
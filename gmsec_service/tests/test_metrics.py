@@ -0,0 +1,39 @@
+import urllib.request
+
+from gmsec_service.common.metrics import MetricsRegistry, start_metrics_server
+
+
+def test_render_prometheus_text():
+    registry = MetricsRegistry()
+    directives = registry.counter("iss_directives_total", "Directive requests handled", ("keyword",))
+    latency = registry.histogram("iss_maap_request_seconds", "MAAP latency", buckets=(0.1, 1.0))
+    depth = registry.gauge("iss_outbox_depth", "Outbox depth")
+
+    directives.labels(keyword="JOB-STATUS").inc()
+    directives.labels(keyword="JOB-STATUS").inc()
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5)
+    depth.set_function(lambda: 3)
+
+    text = registry.render()
+
+    assert "# TYPE iss_directives_total counter" in text
+    assert 'iss_directives_total{keyword="JOB-STATUS"} 2.0' in text
+    assert 'iss_maap_request_seconds_bucket{le="0.1"} 1' in text
+    assert 'iss_maap_request_seconds_bucket{le="1.0"} 2' in text
+    assert 'iss_maap_request_seconds_bucket{le="+Inf"} 3' in text
+    assert "iss_maap_request_seconds_count 3" in text
+    assert "iss_outbox_depth 3" in text
+    assert registry.counter("iss_directives_total", "Directive requests handled", ("keyword",)) is directives
+
+
+def test_metrics_server():
+    registry = MetricsRegistry()
+    registry.counter("iss_gmsec_reconnects_total", "Reconnects").inc()
+    server = start_metrics_server(0, registry, host="127.0.0.1")
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_port}/metrics") as response:
+            assert "iss_gmsec_reconnects_total 1.0" in response.read().decode()
+    finally:
+        server.shutdown()
@@ -0,0 +1,142 @@
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+sys.modules.setdefault("libgmsec_python3", MagicMock())
+
+from benchmarks import fake_gmsec
+from gmsec_service.common import connection
+from gmsec_service.services.outbox import Outbox, OutboxReplayer
+from gmsec_service.services.publisher import GmsecLog
+
+
+@pytest.fixture(autouse=True)
+def fake_errors(monkeypatch):
+    """Classifies publish errors with the fake GMSEC error classes"""
+    monkeypatch.setattr(connection, "lp", fake_gmsec)
+
+
+def test_outbox_keeps_repeated_messages(tmp_path):
+    outbox = Outbox(str(tmp_path / "outbox.db"))
+
+    assert outbox.append("log", {"level": "INFO", "msg_body": "a"}, "msg-1")
+    assert not outbox.append("log", {"level": "INFO", "msg_body": "a"}, "msg-1")
+    # The same LOG sent again is a separate message
+    assert outbox.append("log", {"level": "INFO", "msg_body": "a"}, "msg-2")
+    assert outbox.append("log", {"level": "INFO", "msg_body": "b"}, "msg-3")
+    assert outbox.depth() == 3
+    assert outbox.oldest_age() >= 0
+
+    # Survives reopening
+    outbox.close()
+    outbox = Outbox(str(tmp_path / "outbox.db"))
+    assert [payload["msg_body"] for _, _, payload, _ in outbox.peek(10)] == ["a", "a", "b"]
+
+
+def test_message_behind_a_backlog_is_queued(tmp_path):
+    outbox = Outbox(str(tmp_path / "outbox.db"))
+    outbox.append("log", {"level": "INFO", "msg_body": "a"}, "msg-1")
+    gmsec = MagicMock()
+
+    log = GmsecLog("INFO", "b", gmsec, outbox)
+    log.publish_log()
+
+    gmsec.publish.assert_not_called()
+    assert log.queued and not log.published
+    assert outbox.depth() == 2
+
+
+def test_message_behind_a_long_backlog_is_published(tmp_path):
+    outbox = Outbox(str(tmp_path / "outbox.db"), order_window=1)
+    outbox.append("log", {"level": "INFO", "msg_body": "a"}, "msg-1")
+    outbox.append("log", {"level": "INFO", "msg_body": "b"}, "msg-2")
+    gmsec = MagicMock()
+
+    log = GmsecLog("INFO", "c", gmsec, outbox)
+    log.publish_log()
+
+    gmsec.publish.assert_called_once()
+    assert log.published and not log.queued
+    assert outbox.depth() == 2
+
+
+def test_rejected_message_is_not_stored(tmp_path):
+    outbox = Outbox(str(tmp_path / "outbox.db"))
+    gmsec = MagicMock()
+    gmsec.publish.side_effect = ValueError("failed validation")
+
+    log = GmsecLog("INFO", "a", gmsec, outbox)
+    log.publish_log()
+
+    assert not log.published and not log.queued
+    assert outbox.depth() == 0
+
+
+def test_message_is_stored_while_the_connection_is_down(tmp_path):
+    outbox = Outbox(str(tmp_path / "outbox.db"))
+    gmsec = MagicMock()
+    gmsec.publish.side_effect = RuntimeError("connection lost")
+    gmsec.connected = False
+
+    log = GmsecLog("INFO", "a", gmsec, outbox)
+    log.publish_log()
+
+    assert log.queued and log.connection_failed
+    assert outbox.depth() == 1
+
+
+def test_replay_stops_at_first_failure(tmp_path):
+    outbox = Outbox(str(tmp_path / "outbox.db"))
+    for body in ("a", "b", "c"):
+        outbox.append("log", {"level": "INFO", "msg_body": body}, body)
+
+    replayed = []
+
+    def publish(kind, payload):
+        if payload["msg_body"] == "b":
+            replayed.append("fail")
+            raise RuntimeError("rejected")
+        replayed.append(payload["msg_body"])
+        return True
+
+    replayer = OutboxReplayer(outbox, publish, rate=0)
+    assert replayer.replay_batch() == (1, True)
+    assert outbox.depth() == 2
+
+    replayer.publish = lambda kind, payload: replayed.append(payload["msg_body"]) or True
+    assert replayer.replay_batch() == (2, False)
+    assert replayed == ["a", "fail", "b", "c"]
+    assert outbox.depth() == 0
+    assert outbox.dead_letters() == 0
+
+
+def test_replay_waits_out_a_connection_outage_without_counting_attempts(tmp_path):
+    outbox = Outbox(str(tmp_path / "outbox.db"))
+    outbox.append("log", {"level": "INFO", "msg_body": "a"}, "a")
+    replayer = OutboxReplayer(outbox, lambda kind, payload: False, rate=0, max_attempts=1)
+
+    assert replayer.replay_batch() == (0, True)
+    assert [attempts for _, _, _, attempts in outbox.peek(10)] == [0]
+    assert outbox.dead_letters() == 0
+
+
+def test_repeatedly_rejected_message_is_dead_lettered(tmp_path):
+    outbox = Outbox(str(tmp_path / "outbox.db"))
+    for body in ("a", "b"):
+        outbox.append("log", {"level": "INFO", "msg_body": body}, body)
+    replayed = []
+
+    def publish(kind, payload):
+        if payload["msg_body"] == "a":
+            raise RuntimeError("rejected")
+        replayed.append(payload["msg_body"])
+        return True
+
+    replayer = OutboxReplayer(outbox, publish, rate=0, max_attempts=2)
+    assert replayer.replay_batch() == (0, True)
+    assert replayer.replay_batch() == (1, False)
+
+    assert replayed == ["b"]
+    assert outbox.depth() == 0
+    assert outbox.stats()["dead_letters"] == 1
@@ -0,0 +1,43 @@
+import threading
+
+import pytest
+
+from gmsec_service.api.publish_queue import PublishQueue, PublishQueueFull
+
+
+def test_queued_publish_reports_outcome():
+    publish_queue = PublishQueue(max_size=10, workers=2)
+    publish_queue.start()
+
+    ok = publish_queue.submit("log", lambda: ("Successfully published LOG message", True, False))
+    outboxed = publish_queue.submit("log", lambda: ("Error publishing LOG message: down; queued for replay", False, True))
+    failed = publish_queue.submit("product", lambda: ("Error publishing PRODUCT message: rejected", False, False))
+    publish_queue.stop(timeout=5)
+
+    assert publish_queue.status(ok)["status"] == "published"
+    assert publish_queue.status(outboxed)["status"] == "outboxed"
+    assert publish_queue.status(failed)["status"] == "failed"
+    assert publish_queue.status("unknown") is None
+
+
+def test_full_queue_rejects_with_retry_after():
+    publish_queue = PublishQueue(max_size=1, workers=1, retry_after=7)
+    started, release = threading.Event(), threading.Event()
+    publish_queue.start()
+
+    def blocked_publish():
+        started.set()
+        release.wait()
+        return "done", True, False
+
+    publish_queue.submit("log", blocked_publish)
+    # Once the worker holds the first publish, one more fits in the queue
+    started.wait(5)
+    publish_queue.submit("log", lambda: ("done", True, False))
+
+    with pytest.raises(PublishQueueFull) as exc_info:
+        publish_queue.submit("log", lambda: ("done", True, False))
+    assert exc_info.value.retry_after == 7
+
+    release.set()
+    publish_queue.stop(timeout=5)
@@ -0,0 +1,62 @@
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+sys.modules.setdefault("libgmsec_python3", MagicMock())
+
+from fastapi.testclient import TestClient
+
+from benchmarks import fake_gmsec
+from gmsec_service.api import publisher_api
+from gmsec_service.api.publish_queue import PublishQueue
+from gmsec_service.common import connection
+from gmsec_service.common.connection_pool import GmsecConnectionPool
+
+LOG = {"level": "info", "msg_body": "hello"}
+
+
+@pytest.fixture
+def busy_pool(monkeypatch):
+    """A one-connection pool whose only connection is checked out"""
+    pool = GmsecConnectionPool(MagicMock, size=1, checkout_timeout=0.01)
+    gmsec = pool.checkout()
+    monkeypatch.setattr(publisher_api, "connection_pool", pool)
+    monkeypatch.setattr(publisher_api, "pool_retry_after", 3)
+    yield pool
+    pool.release(gmsec)
+
+
+def test_exhausted_pool_returns_503_with_retry_after(busy_pool):
+    response = TestClient(publisher_api.app).post("/log", json=LOG)
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "3"
+
+
+def test_queued_publish_does_not_check_out_a_connection(busy_pool, monkeypatch):
+    publish_queue = PublishQueue(max_size=10, workers=1)
+    monkeypatch.setattr(publisher_api, "publish_queue", publish_queue)
+
+    response = TestClient(publisher_api.app).post("/log", json=LOG)
+
+    assert response.status_code == 202
+    assert response.json()["status"] == "queued"
+
+
+def test_batch_reports_each_product(monkeypatch):
+    monkeypatch.setattr(connection, "lp", fake_gmsec)
+    gmsec = MagicMock()
+    gmsec.publish.side_effect = [None, RuntimeError("bus down"), None]
+    monkeypatch.setattr(publisher_api, "connection_pool", GmsecConnectionPool(lambda: gmsec, size=1))
+    products = [
+        {"job_id": f"job-{i}", "concept_id": "C0000000001-TEST", "uris": [f"s3://bucket/{i}.nc"]} for i in range(3)
+    ]
+
+    response = TestClient(publisher_api.app).post("/products/batch", json={"products": products})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["published"], body["queued"], body["failed"]) == (2, 0, 1)
+    assert [result["published"] for result in body["results"]] == [True, False, True]
+    assert "bus down" in body["results"][1]["status"]
@@ -0,0 +1,100 @@
+import threading
+from concurrent.futures import Future
+from unittest.mock import MagicMock, patch
+
+from gmsec_service.common import retry_scheduler
+from gmsec_service.common.job_cache import JobStatusCache
+from gmsec_service.common.retry_scheduler import RetryScheduler, gather
+from gmsec_service.handlers.directive_handler import GmsecRequestHandler
+
+
+class RecordingScheduler(RetryScheduler):
+    """Runs every call at once and records the delays it was asked for"""
+
+    def __init__(self):
+        super().__init__(workers=2)
+        self.delays = []
+
+    def call_later(self, delay, fn, *args):
+        self.delays.append(delay)
+        return super().call_later(0, fn, *args)
+
+
+def test_calls_run_in_due_order_without_blocking_the_caller():
+    scheduler = RetryScheduler(workers=1)
+    order = []
+    late = scheduler.call_later(0.05, order.append, "late")
+    early = scheduler.call_later(0.01, order.append, "early")
+
+    assert not late.done()
+    early.result(timeout=1)
+    late.result(timeout=1)
+    assert order == ["early", "late"]
+    assert scheduler.wait_idle(timeout=1)
+    assert scheduler.pending() == 0
+    scheduler.shutdown()
+
+
+def test_returned_future_is_chained():
+    scheduler = RetryScheduler()
+    inner = Future()
+    outer = scheduler.call_later(0, lambda: inner)
+
+    threading.Timer(0.02, inner.set_result, ("done",)).start()
+    assert outer.result(timeout=1) == "done"
+    assert gather([outer, scheduler.call_later(0, lambda: 2)]).result(timeout=1) == ["done", 2]
+    scheduler.shutdown()
+
+
+def test_deleted_job_is_retried_on_the_scheduler(monkeypatch):
+    scheduler = RecordingScheduler()
+    monkeypatch.setattr(retry_scheduler, "retry_scheduler", scheduler)
+    maap_client = MagicMock()
+    maap_client.get_job_status.side_effect = ["deleted", "deleted", "running"]
+    handler = GmsecRequestHandler("JOB-STATUS", '{"job-id": "job-1"}')
+
+    with patch("gmsec_service.handlers.directive_handler.get_maap_client", return_value=maap_client), patch(
+        "gmsec_service.handlers.directive_handler.get_job_status_cache", return_value=JobStatusCache()
+    ):
+        job_state = handler.get_job_status_async("job-1").result(timeout=1)
+
+    assert job_state.status_label == "IN_PROGRESS"
+    assert scheduler.delays == [1, 2]
+    scheduler.shutdown()
+
+
+def test_retry_that_cannot_be_scheduled_fails_the_lookup(monkeypatch):
+    scheduler = RecordingScheduler()
+    monkeypatch.setattr(retry_scheduler, "retry_scheduler", scheduler)
+    maap_client = MagicMock()
+
+    def lookup_then_shut_down(job_id):
+        # The scheduler shuts down while the first retry is running
+        if scheduler.delays:
+            scheduler.shutdown(wait=False)
+        raise ConnectionError("MAAP unavailable")
+
+    maap_client.get_job_status.side_effect = lookup_then_shut_down
+    handler = GmsecRequestHandler("JOB-STATUS", '{"job-id": "job-1"}')
+
+    with patch("gmsec_service.handlers.directive_handler.get_maap_client", return_value=maap_client):
+        error = handler.fetch_job_status_async("job-1").exception(timeout=5)
+
+    assert isinstance(error, RuntimeError)
+    assert maap_client.get_job_status.call_count == 2
+
+
+def test_failed_retry_fails_the_lookup(monkeypatch):
+    scheduler = MagicMock()
+    retry = Future()
+    retry.set_exception(RuntimeError("retry failed"))
+    scheduler.call_later.return_value = retry
+    monkeypatch.setattr(retry_scheduler, "retry_scheduler", scheduler)
+    maap_client = MagicMock()
+    maap_client.get_job_status.return_value = "deleted"
+    handler = GmsecRequestHandler("JOB-STATUS", '{"job-id": "job-1"}')
+
+    with patch("gmsec_service.handlers.directive_handler.get_maap_client", return_value=maap_client):
+        future = handler.fetch_job_status_async("job-1")
+
+    assert str(future.exception(timeout=1)) == "retry failed"
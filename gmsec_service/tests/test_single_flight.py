@@ -0,0 +1,49 @@
+import threading
+import time
+from concurrent.futures import Future
+from unittest.mock import MagicMock, patch
+
+from gmsec_service.common.job_cache import JobStatusCache
+from gmsec_service.common.single_flight import SingleFlight
+from gmsec_service.handlers.directive_handler import GmsecRequestHandler
+
+
+def run_concurrently(fn, count):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(fn())) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_calls_share_one_result():
+    flight = SingleFlight()
+    calls = []
+
+    def slow_lookup():
+        calls.append(1)
+        future = Future()
+        threading.Timer(0.05, future.set_result, (object(),)).start()
+        return future
+
+    results = run_concurrently(lambda: flight.do_async("job-1", slow_lookup).result(timeout=1), 8)
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert flight.in_flight() == 0
+
+
+def test_concurrent_job_status_lookups_coalesce():
+    maap_client = MagicMock()
+    maap_client.get_job_status.side_effect = lambda job_id: time.sleep(0.05) or "running"
+    handler = GmsecRequestHandler("JOB-STATUS", '{"job-id": "job-1"}')
+
+    with patch("gmsec_service.handlers.directive_handler.get_maap_client", return_value=maap_client), patch(
+        "gmsec_service.handlers.directive_handler.get_job_status_cache", return_value=JobStatusCache()
+    ):
+        results = run_concurrently(lambda: handler.get_job_status("job-1"), 6)
+
+    assert maap_client.get_job_status.call_count == 1
+    assert {result.status_label for result in results} == {"IN_PROGRESS"}
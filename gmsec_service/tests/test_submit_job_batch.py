@@ -0,0 +1,77 @@
+import json
+import threading
+from unittest.mock import MagicMock
+
+from gmsec_service.common import job_cache, maap_client
+from gmsec_service.common.job import JobBatchState, JobState, ProductJobState
+from gmsec_service.handlers import directive_handler, idempotency
+from gmsec_service.handlers.directive_handler import GmsecRequestHandler
+from gmsec_service.handlers.idempotency import SubmitJobIndex
+
+PRODUCTS = ["s3://bucket/a.nc", "s3://bucket/b.nc", "s3://bucket/c.nc"]
+DIRECTIVE = {"concept_id": "C0000000001-TEST", "products": PRODUCTS, "format": "nc"}
+
+
+def fake_submit(failing=()):
+    """submit_ingest_job stand-in that records the products it was called for"""
+    submitted = []
+    lock = threading.Lock()
+
+    def submit(self, concept_id, product_path, ingest_variables, product_type):
+        if product_path in failing:
+            raise ValueError(f"No ingest rule matches product '{product_path}'")
+        with lock:
+            submitted.append(product_path)
+            return JobState.from_maap_status("accepted", f"job-{product_path[-4]}")
+
+    return submit, submitted
+
+
+def test_multi_product_directive_reports_each_product(monkeypatch):
+    monkeypatch.setattr(idempotency, "submit_job_index", None)
+    monkeypatch.setenv("SUBMIT_JOB_INDEX_PATH", "")
+    submit, submitted = fake_submit(failing={"s3://bucket/b.nc"})
+    monkeypatch.setattr(GmsecRequestHandler, "submit_ingest_job", submit)
+
+    batch = GmsecRequestHandler("SUBMIT-JOB", json.dumps(DIRECTIVE)).trigger_ingest()
+
+    assert sorted(submitted) == ["s3://bucket/a.nc", "s3://bucket/c.nc"]
+    assert batch.status_label == "SUBMITTED"
+    data = batch.response_data()
+    assert [job["product"] for job in data["jobs"]] == PRODUCTS
+    assert data["jobs"][0] == {"product": "s3://bucket/a.nc", "job-id": "job-a", "job-status": "SUBMITTED"}
+    assert data["jobs"][1]["job-status"] == "FAILED"
+    assert "No ingest rule" in data["jobs"][1]["error"]
+
+
+def test_batch_fails_only_when_every_product_fails():
+    failed = ProductJobState("s3://bucket/a.nc", JobState.from_maap_status("failed", "N/A"), "submission failed")
+    running = ProductJobState("s3://bucket/b.nc", JobState.from_maap_status("running", "job-b"))
+    accepted = ProductJobState("s3://bucket/c.nc", JobState.from_maap_status("accepted", "job-c"))
+
+    assert JobBatchState([failed]).status_label == "FAILED"
+    assert JobBatchState([failed, running]).status_label == "IN_PROGRESS"
+    assert JobBatchState([running, accepted]).status_code == 1
+    # Products that were never submitted have no MAAP job to re-check
+    assert not JobBatchState([failed, running]).has_failures
+
+
+def test_resent_batch_only_submits_missing_products(tmp_path, monkeypatch):
+    monkeypatch.setattr(idempotency, "submit_job_index", SubmitJobIndex(str(tmp_path / "submit-jobs.db")))
+    monkeypatch.setattr(job_cache, "job_status_cache", None)
+    maap = MagicMock()
+    maap.getJobStatus.return_value = "Accepted"
+    monkeypatch.setattr(maap_client, "maap_client", maap_client.MaapClient(maap_factory=lambda: maap))
+    monkeypatch.setattr(directive_handler, "submit_job_executor", None)
+    monkeypatch.setenv("SUBMIT_JOB_CONCURRENCY", "2")
+    submit, submitted = fake_submit(failing={"s3://bucket/b.nc"})
+    monkeypatch.setattr(GmsecRequestHandler, "submit_ingest_job", submit)
+
+    GmsecRequestHandler("SUBMIT-JOB", json.dumps(DIRECTIVE)).trigger_ingest()
+    retry, retried = fake_submit()
+    monkeypatch.setattr(GmsecRequestHandler, "submit_ingest_job", retry)
+    resent = GmsecRequestHandler("SUBMIT-JOB", json.dumps(DIRECTIVE)).trigger_ingest()
+
+    assert retried == ["s3://bucket/b.nc"]
+    assert resent.job_ids == ["job-a", "job-b", "job-c"]
+    assert directive_handler.get_submit_job_executor()._max_workers == 2
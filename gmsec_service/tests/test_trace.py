@@ -0,0 +1,47 @@
+import sys
+from unittest.mock import MagicMock
+
+sys.modules["libgmsec_python3"] = MagicMock()
+
+from gmsec_service.api import publisher_api
+from gmsec_service.common.trace import TraceRecorder, read_trace
+
+
+def test_trace_round_trip(tmp_path):
+    path = str(tmp_path / "trace.jsonl.gz")
+
+    recorder = TraceRecorder(path, "listener")
+    recorder.record("directive", {"DIRECTIVE-KEYWORD": "JOB-STATUS", "DIRECTIVE-STRING": '{"job-id": "1"}'})
+    recorder.record("directive", {"DIRECTIVE-KEYWORD": "JOB-STATUS", "DIRECTIVE-STRING": '{"job-id": "2"}'})
+    recorder.close()
+
+    # A restarted service appends a second capture to the same file
+    restarted = TraceRecorder(path, "listener")
+    restarted.record("directive", {"DIRECTIVE-KEYWORD": "SUBMIT-JOB", "DIRECTIVE-STRING": "{}"})
+    restarted.close()
+
+    requests = list(read_trace(path))
+    assert [data["DIRECTIVE-STRING"] for _, _, _, data in requests] == ['{"job-id": "1"}', '{"job-id": "2"}', "{}"]
+    assert all(source == "listener" and kind == "directive" for _, source, kind, _ in requests)
+    assert requests[0][0] <= requests[1][0]
+    assert requests[2][0] >= restarted.started
+
+
+def test_trace_disabled_without_path():
+    config = MagicMock()
+    config.get_value.return_value = ""
+    assert TraceRecorder.from_config(config, "listener-trace-path", "listener") is None
+
+
+def test_publisher_api_captures_requests(tmp_path):
+    path = str(tmp_path / "publisher.jsonl")
+    publisher_api.trace_recorder = TraceRecorder(path, "publisher")
+    try:
+        publisher_api.capture_request("log", publisher_api.LogRequest(level="info", msg_body="captured"))
+    finally:
+        publisher_api.trace_recorder.close()
+        publisher_api.trace_recorder = None
+
+    [(_, source, kind, data)] = read_trace(path)
+    assert (source, kind) == ("publisher", "log")
+    assert data == {"level": "INFO", "msg_body": "captured"}
@@ -0,0 +1,98 @@
+import sys
+from unittest.mock import MagicMock
+
+sys.modules.setdefault("libgmsec_python3", MagicMock())
+
+import pytest
+
+from benchmarks import fake_gmsec
+from gmsec_service.common.validation import MessageValidationError, ValidationCache, message_signature
+
+PROD_TEMPLATE = [
+    fake_gmsec.FieldSpecification("PROD-NAME", "STRING", pattern=r".{1,20}"),
+    fake_gmsec.FieldSpecification("NUM-OF-FILES", "U16"),
+    fake_gmsec.FieldSpecification("FILE.1.URI", "STRING"),
+]
+LOG_TEMPLATE = [fake_gmsec.FieldSpecification("SEVERITY", "U16", value="0,1,2,3,4")]
+
+
+@pytest.fixture(autouse=True)
+def templates(monkeypatch):
+    monkeypatch.setattr(fake_gmsec.Specification, "templates", {"MSG.PROD": PROD_TEMPLATE, "MSG.LOG": LOG_TEMPLATE})
+
+
+def build_cache(**kwargs) -> ValidationCache:
+    return ValidationCache(fake_gmsec.Specification(), **kwargs)
+
+
+def product_message(uris, name="C0000000001-TEST"):
+    msg = fake_gmsec.MessageFactory().create_message("MSG.PROD")
+    msg.add_field(fake_gmsec.StringField("PROD-NAME", name))
+    msg.add_field(fake_gmsec.U16Field("NUM-OF-FILES", len(uris)))
+    for i, uri in enumerate(uris, 1):
+        msg.add_field(fake_gmsec.StringField(f"FILE.{i}.URI", uri))
+    msg.is_compliant = MagicMock(return_value=fake_gmsec.Status())
+    return msg
+
+
+def test_signature_ignores_values_but_not_structure():
+    one = product_message(["s3://bucket/a.nc", "s3://bucket/b.nc"])
+    other_values = product_message(["s3://bucket/c.nc", "s3://bucket/d.nc"])
+    more_files = product_message(["s3://bucket/a.nc", "s3://bucket/b.nc", "s3://bucket/c.nc"])
+
+    assert message_signature(one) == message_signature(other_values)
+    assert message_signature(one) != message_signature(more_files)
+    assert ("FILE.#.URI", "StringField", 2) in message_signature(one)[1]
+
+
+def test_only_first_message_of_a_structure_is_fully_validated():
+    cache = build_cache(max_signatures=1)
+    first = product_message(["s3://bucket/a.nc"])
+    second = product_message(["s3://bucket/b.nc"])
+    different = product_message(["s3://bucket/a.nc", "s3://bucket/b.nc"])
+
+    cache.validate(first)
+    cache.validate(second)
+    first.is_compliant.assert_called_once()
+    second.is_compliant.assert_not_called()
+
+    # Empty values are left to the template, as in full validation
+    cache.validate(product_message([""]))
+
+    # A new structure evicts the least recently used signature
+    cache.validate(different)
+    different.is_compliant.assert_called_once()
+    assert len(cache) == 1
+
+
+def test_non_compliant_message_is_not_cached():
+    cache = build_cache()
+    bad = product_message(["s3://bucket/a.nc"])
+    bad.is_compliant.return_value = fake_gmsec.Status("PROD-NAME too long", error=True)
+
+    with pytest.raises(MessageValidationError):
+        cache.validate(bad)
+    assert len(cache) == 0
+
+
+def test_cached_structure_values_are_checked_against_the_template():
+    cache = build_cache()
+    cache.validate(product_message(["s3://bucket/a.nc"]))
+
+    over_long = product_message(["s3://bucket/b.nc"], name="C0000000001-TEST-WITH-A-LONG-NAME")
+    with pytest.raises(MessageValidationError, match="PROD-NAME"):
+        cache.validate(over_long)
+    over_long.is_compliant.assert_not_called()
+
+    def log_message(severity):
+        msg = fake_gmsec.MessageFactory().create_message("MSG.LOG")
+        msg.add_field(fake_gmsec.U16Field("SEVERITY", severity))
+        msg.is_compliant = MagicMock(return_value=fake_gmsec.Status())
+        return msg
+
+    cache.validate(log_message(1))
+    cache.validate(log_message(4))
+    out_of_enum = log_message(7)
+    with pytest.raises(MessageValidationError, match="SEVERITY"):
+        cache.validate(out_of_enum)
+    out_of_enum.is_compliant.assert_not_called()
@@ -0,0 +1,66 @@
+import threading
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from gmsec_service.common.worker_pool import DirectiveWorkerPool, parse_keyword_limits
+
+
+def test_parse_keyword_limits():
+    assert parse_keyword_limits("SUBMIT-JOB:2, JOB-STATUS:8") == {"SUBMIT-JOB": 2, "JOB-STATUS": 8}
+    assert parse_keyword_limits("") == {}
+    with pytest.raises(ValueError):
+        parse_keyword_limits("SUBMIT-JOB")
+
+
+def test_keyword_limit_caps_concurrency():
+    pool = DirectiveWorkerPool(max_workers=4, max_in_flight=8, keyword_limits={"SUBMIT-JOB": 1})
+    lock = threading.Lock()
+    running = {"now": 0, "peak": 0}
+
+    def task():
+        with lock:
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+        time.sleep(0.02)
+        with lock:
+            running["now"] -= 1
+
+    for _ in range(5):
+        pool.submit("SUBMIT-JOB", task)
+
+    assert pool.wait_idle(timeout=5)
+    assert running["peak"] == 1
+    pool.shutdown()
+
+
+def test_in_flight_limit_applies_backpressure():
+    pool = DirectiveWorkerPool(max_workers=1, max_in_flight=1)
+    release = threading.Event()
+
+    assert pool.submit("JOB-STATUS", release.wait)
+    assert not pool.submit("JOB-STATUS", lambda: None, timeout=0.05)
+
+    release.set()
+    assert pool.wait_idle(timeout=5)
+    assert pool.in_flight() == 0
+    pool.shutdown()
+
+
+def test_task_returning_a_future_keeps_its_slots_until_done():
+    pool = DirectiveWorkerPool(max_workers=2, max_in_flight=2, keyword_limits={"SUBMIT-JOB": 1})
+    reply = Future()
+    ran = threading.Event()
+
+    assert pool.submit("SUBMIT-JOB", lambda: reply)
+    assert pool.submit("SUBMIT-JOB", ran.set)
+    assert not pool.wait_idle(timeout=0.05)
+    assert pool.in_flight() == 2
+    assert not ran.is_set()
+    assert not pool.submit("JOB-STATUS", lambda: None, timeout=0.05)
+
+    reply.set_result("replied")
+    assert ran.wait(timeout=5)
+    assert pool.wait_idle(timeout=5)
+    pool.shutdown()